@@ -23,6 +23,8 @@ class Core(CommandObject, metaclass=ABCMeta):
     qtile: Qtile
     idle_inhibitor_manager: IdleInhibitorManager[Any]
     idle_notifier: IdleNotifier
+    # The event (or its name) being handled, reported when the loop stalls
+    current_event: Any = None
 
     @property
     @abstractmethod
@@ -7,7 +7,7 @@ from copy import copy
 
 import cairocffi
 
-from libqtile import pangocffi, utils
+from libqtile import pangocffi, tracing, utils
 from libqtile.images import Img
 from libqtile.log_utils import logger
 from libqtile.utils import ColorsType
@@ -172,6 +172,7 @@ class Drawer:
             the Y position of the origin in the source surface
         """
         if self._enabled:
+            span = tracing.begin("Drawer.draw", "draw") if tracing.enabled else None
             self._draw(
                 offsetx=offsetx,
                 offsety=offsety,
@@ -185,6 +186,8 @@ class Drawer:
                 ctx = cairocffi.Context(self.last_surface)
                 ctx.set_source_surface(self.surface)
                 ctx.paint()
+            if span is not None:
+                tracing.end(span)
 
         self._reset_surface()
 
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import typing
 from abc import ABCMeta, abstractmethod
+from collections.abc import Callable
+from operator import attrgetter
 from typing import Any
 
 from libqtile import config, hook
@@ -17,6 +19,15 @@ if typing.TYPE_CHECKING:
 
 
 class _Window(CommandObject, metaclass=ABCMeta):
+    # The keys of info() which can be read without building all of it
+    _info_getters: dict[str, Callable[[Any], Any]] = {
+        "x": attrgetter("x"),
+        "y": attrgetter("y"),
+        "width": attrgetter("width"),
+        "height": attrgetter("height"),
+        "id": attrgetter("wid"),
+    }
+
     def __init__(self):
         self.borderwidth: int = 0
         self.name: str = "<no name>"
@@ -239,6 +250,17 @@ class Window(_Window, metaclass=ABCMeta):
 
     qtile: Qtile
 
+    _info_getters = {
+        **_Window._info_getters,
+        "name": attrgetter("name"),
+        "group": lambda win: win.group.name if win.group else None,
+        "wm_class": lambda win: win.get_wm_class(),
+        "floating": attrgetter("floating"),
+        "maximized": attrgetter("maximized"),
+        "minimized": attrgetter("minimized"),
+        "fullscreen": attrgetter("fullscreen"),
+    }
+
     # If float_x or float_y are None, the window has never been placed
     float_x: int | None
     float_y: int | None
@@ -636,6 +658,12 @@ class Static(_Window, metaclass=ABCMeta):
     width: Any
     height: Any
 
+    _info_getters = {
+        **_Window._info_getters,
+        "name": attrgetter("name"),
+        "wm_class": lambda win: win.get_wm_class(),
+    }
+
     def __repr__(self):
         return f"{self.__class__.__name__!s}(name={self.name!r}, wid={self.wid:d})"
 
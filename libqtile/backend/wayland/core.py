@@ -48,7 +48,7 @@ from collections.abc import Generator
 from pathlib import Path
 from typing import Any
 
-from libqtile import config, hook
+from libqtile import config, hook, tracing
 from libqtile.backend import base
 from libqtile.backend.wayland import inputs
 from libqtile.backend.wayland.idle_inhibit import IdleInhibitorManager
@@ -103,27 +103,49 @@ def log_cb(importance: int, formatted_str: ffi.CData) -> None:
 @ffi.def_extern()
 def keyboard_key_cb(keysym: int, mask: int, userdata: ffi.CData) -> int:
     core = ffi.from_handle(userdata)
-    if core.handle_keyboard_key(keysym, mask):
-        return 1
-    return 0
+    core.current_event = "keyboard_key"
+    span = tracing.begin("handle_keyboard_key", "wayland") if tracing.enabled else None
+    try:
+        if core.handle_keyboard_key(keysym, mask):
+            return 1
+        return 0
+    finally:
+        core.current_event = None
+        if span is not None:
+            tracing.end(span)
 
 
 @ffi.def_extern()
 def manage_view_cb(view: ffi.CData, userdata: ffi.CData) -> None:
     core = ffi.from_handle(userdata)
-    core.handle_manage_view(view)
+    core.current_event = "manage_view"
+    try:
+        core.handle_manage_view(view)
+    finally:
+        core.current_event = None
 
 
 @ffi.def_extern()
 def unmanage_view_cb(view: ffi.CData, userdata: ffi.CData) -> None:
     core = ffi.from_handle(userdata)
-    core.handle_unmanage_view(view)
+    core.current_event = "unmanage_view"
+    try:
+        core.handle_unmanage_view(view)
+    finally:
+        core.current_event = None
 
 
 @ffi.def_extern()
 def cursor_motion_cb(userdata: ffi.CData) -> None:
     core = ffi.from_handle(userdata)
-    core.handle_cursor_motion()
+    core.current_event = "cursor_motion"
+    span = tracing.begin("handle_cursor_motion", "wayland") if tracing.enabled else None
+    try:
+        core.handle_cursor_motion()
+    finally:
+        core.current_event = None
+        if span is not None:
+            tracing.end(span)
 
 
 @ffi.def_extern()
@@ -131,9 +153,16 @@ def cursor_button_cb(
     button: int, mask: int, pressed: bool, x: int, y: int, userdata: ffi.CData
 ) -> int:
     core = ffi.from_handle(userdata)
-    if core.handle_cursor_button(button, mask, pressed, x, y):
-        return 1
-    return 0
+    core.current_event = "cursor_button"
+    span = tracing.begin("handle_cursor_button", "wayland") if tracing.enabled else None
+    try:
+        if core.handle_cursor_button(button, mask, pressed, x, y):
+            return 1
+        return 0
+    finally:
+        core.current_event = None
+        if span is not None:
+            tracing.end(span)
 
 
 @ffi.def_extern()
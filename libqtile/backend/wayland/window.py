@@ -3,7 +3,7 @@ from __future__ import annotations
 import typing
 
 import libqtile.backend.base.window as base
-from libqtile import hook, utils
+from libqtile import hook, tracing, utils
 from libqtile.backend.base import FloatStates
 from libqtile.backend.base.window import WindowType
 from libqtile.backend.wayland.drawer import Drawer
@@ -130,7 +130,9 @@ class Base(base._Window):
 
     @x.setter
     def x(self, x: int) -> None:
-        self._ptr.x = x
+        if x != self._ptr.x:
+            self._ptr.x = x
+            self.qtile.mark_changed(self)
 
     @property
     def y(self) -> int:
@@ -138,7 +140,9 @@ class Base(base._Window):
 
     @y.setter
     def y(self, y: int) -> None:
-        self._ptr.y = y
+        if y != self._ptr.y:
+            self._ptr.y = y
+            self.qtile.mark_changed(self)
 
     @property
     def width(self) -> int:
@@ -146,7 +150,9 @@ class Base(base._Window):
 
     @width.setter
     def width(self, width: int) -> None:
-        self._ptr.width = width
+        if width != self._ptr.width:
+            self._ptr.width = width
+            self.qtile.mark_changed(self)
 
     @property
     def height(self) -> int:
@@ -154,7 +160,9 @@ class Base(base._Window):
 
     @height.setter
     def height(self, height: int) -> None:
-        self._ptr.height = height
+        if height != self._ptr.height:
+            self._ptr.height = height
+            self.qtile.mark_changed(self)
 
     @property
     def urgent(self) -> bool:
@@ -188,6 +196,7 @@ class Base(base._Window):
         margin: int | list[int] | None = None,
         respect_hints: bool = False,
     ) -> None:
+        span = tracing.begin("Window.place", "wayland") if tracing.enabled else None
         # Adjust the placement to account for layout margins, if there are any.
         # TODO: is respect_hints only for X11?
         assert ffi is not None
@@ -255,6 +264,8 @@ class Base(base._Window):
         self.bordercolor = bordercolor
         self.borderwidth = borderwidth
         self._ptr.place(self._ptr, x, y, width, height, c_layers, n, int(above))
+        if span is not None:
+            tracing.end(span)
 
     @expose_command()
     def focus(self, warp: bool = True) -> None:
@@ -321,6 +332,7 @@ class Internal(Base, base.Internal):
             # It will be present during config reloads; absent during shutdown as this
             # will follow graceful_shutdown
             del self.qtile.windows_map[self.wid]
+            self.qtile.selector_cache.invalidate()
 
     @expose_command()
     def info(self) -> dict:
@@ -502,6 +514,7 @@ class Window(Base, base.Window):
         win.unhide()
         win.place(x, y, width, height, 0, None)
         self.qtile.windows_map[self.wid] = win
+        self.qtile.selector_cache.invalidate()
 
         # TODO: pointer constraints
 
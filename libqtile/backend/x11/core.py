@@ -10,7 +10,7 @@ import xcffib.xproto
 import xcffib.xtest
 from xcffib.xproto import EventMask
 
-from libqtile import config, hook, utils
+from libqtile import config, hook, tracing, utils
 from libqtile.backend import base
 from libqtile.backend.base.idle_inhibit import IdleInhibitorManager, Inhibitor
 from libqtile.backend.x11 import window, xcbq
@@ -40,6 +40,32 @@ EVENT_TO_HANDLER = {
     xcffib.xproto.UnmapNotifyEvent: "handle_UnmapNotify",
 }
 
+# The events that carry the server time they were generated at
+_TIMESTAMP_EVENTS = {
+    xcffib.xproto.ButtonPressEvent,
+    xcffib.xproto.ButtonReleaseEvent,
+    xcffib.xproto.EnterNotifyEvent,
+    xcffib.xproto.KeyPressEvent,
+    xcffib.xproto.KeyReleaseEvent,
+    xcffib.xproto.LeaveNotifyEvent,
+    xcffib.xproto.MotionNotifyEvent,
+    xcffib.xproto.PropertyNotifyEvent,
+}
+
+# The events which change the stacking order of the top-level windows
+_STACKING_EVENTS = {
+    xcffib.xproto.ConfigureNotifyEvent,
+    xcffib.xproto.CreateNotifyEvent,
+    xcffib.xproto.DestroyNotifyEvent,
+    xcffib.xproto.ReparentNotifyEvent,
+}
+
+# The focus changed at a time we don't know
+_FOCUS_EVENTS = {
+    xcffib.xproto.FocusInEvent,
+    xcffib.xproto.FocusOutEvent,
+}
+
 _IGNORED_EVENTS = {
     xcffib.xproto.CreateNotifyEvent,
     xcffib.xproto.FocusInEvent,
@@ -109,6 +135,8 @@ class Core(base.Core):
             | EventMask.ButtonPress
         )
         self._root.set_attribute(eventmask=self.eventmask)
+        # now that the events tell about the changes of the stacking order
+        self.conn.stacking = xcbq.StackingOrder(self._root.query_tree())
 
         self._root.set_property(
             "_NET_SUPPORTED", [self.conn.atoms[x] for x in xcbq.SUPPORTED_ATOMS]
@@ -167,6 +195,17 @@ class Core(base.Core):
 
         self.last_focused: window.Window | None = None
 
+        # The client lists last written, and the pending write of the updated
+        # lists
+        self._client_list: list[int] | None = None
+        self._client_list_stacking: list[int] | None = None
+        self._client_lists_handle: asyncio.Handle | None = None
+
+        # The connection and window used by get_valid_timestamp() when no
+        # event told the server time
+        self._timestamp_conn: xcbq.Connection | None = None
+        self._timestamp_window: window.XWindow | None = None
+
         self.idle_inhibitor_manager: IdleInhibitorManager[Inhibitor] = IdleInhibitorManager(self)
         self.idle_notifier = IdleNotifier(self)
 
@@ -180,8 +219,14 @@ class Core(base.Core):
                 self._root.wid,
                 self.conn.atoms["_NET_SUPPORTING_WM_CHECK"],
             ).check()
+        if self._client_lists_handle is not None:
+            self._client_lists_handle.cancel()
+            self._client_lists_handle = None
         if hasattr(self, "qtile"):
             delattr(self, "qtile")
+        if self._timestamp_conn is not None:
+            self._timestamp_conn.finalize()
+            self._timestamp_conn = None
         self.conn.finalize()
 
     def get_output_info(self) -> list[config.Output]:
@@ -208,6 +253,21 @@ class Core(base.Core):
         self.fd = self.conn.conn.get_file_descriptor()
         asyncio.get_running_loop().add_reader(self.fd, self._xpoll)
 
+    def _border_colors(self) -> Iterator[str]:
+        """The border colors of the layouts of all groups"""
+        assert self.qtile is not None
+        for group in self.qtile.groups:
+            for layout in (*group.layouts, group.floating_layout):
+                options = {**layout._variable_defaults, **layout._user_config}
+                for name in options:
+                    if not name.startswith("border_"):
+                        continue
+                    colors = getattr(layout, name)
+                    if isinstance(colors, str):
+                        yield colors
+                    elif isinstance(colors, list):
+                        yield from (color for color in colors if isinstance(color, str))
+
     def remove_listener(self) -> None:
         """Remove the listener from the given event loop"""
         if self.fd is not None:
@@ -222,6 +282,10 @@ class Core(base.Core):
 
         self.wmname = getattr(self.qtile.config, "wmname", "qtile")
 
+        # Allocate the border colors at once rather than one by one when
+        # they are first painted
+        self.conn.prefetch_colors(self._border_colors())
+
         # Ensure that properties are initialised at startup
         self.update_client_lists()
 
@@ -246,8 +310,29 @@ class Core(base.Core):
             return
 
         # Qtile just started - scan for clients
-        for wid in self._root.query_tree():
-            item = window.XWindow(self.conn, wid)
+        items = [window.XWindow(self.conn, wid) for wid in self._root.query_tree()]
+        # Most children of the root aren't clients to manage, so only fetch the
+        # properties of those which are mapped
+        window.prefetch(items, properties=())
+        window.prefetch([item for item in items if self._is_mapped_client(item)])
+        try:
+            self._manage_existing(items)
+        finally:
+            for item in items:
+                item.clear_prefetched()
+
+    @staticmethod
+    def _is_mapped_client(item: window.XWindow) -> bool:
+        try:
+            attrs = item.get_attributes()
+        except (xcffib.xproto.WindowError, xcffib.xproto.AccessError):
+            return False
+        return attrs.map_state != xcffib.xproto.MapState.Unmapped and not attrs.override_redirect
+
+    def _manage_existing(self, items: list[window.XWindow]) -> None:
+        assert self.qtile is not None
+
+        for item in items:
             try:
                 attrs = item.get_attributes()
                 state = item.get_wm_state()
@@ -308,10 +393,26 @@ class Core(base.Core):
         """Handle an X11 event by forwarding it to the right target"""
         targets = self._get_target_chain(event)
         logger.debug("X11 event: %s (targets: %s)", event.__class__.__name__, targets)
-        for target in targets:
-            ret = target(event)
-            if not ret:
-                break
+        self.current_event = event
+        span = (
+            tracing.begin("handle_event", "x11", {"event": event.__class__.__name__})
+            if tracing.enabled
+            else None
+        )
+        if event.__class__ is xcffib.xproto.PropertyNotifyEvent:
+            # drop the outdated property before the handlers read it again
+            win = self.qtile.windows_map.get(event.window)
+            if win is not None and hasattr(win, "window"):
+                win.window.invalidate_property(event.atom)
+        try:
+            for target in targets:
+                ret = target(event)
+                if not ret:
+                    break
+        finally:
+            self.current_event = None
+            if span is not None:
+                tracing.end(span)
 
     def _xpoll(self) -> None:
         """Poll the connection and dispatch incoming events"""
@@ -323,6 +424,13 @@ class Core(base.Core):
                 if not event:
                     break
 
+                if event.__class__ in _TIMESTAMP_EVENTS:
+                    self.conn.timestamp = event.time  # type: ignore[attr-defined]
+                elif event.__class__ in _FOCUS_EVENTS:
+                    self.conn.timestamp = xcffib.CurrentTime
+                elif event.__class__ in _STACKING_EVENTS:
+                    self._update_stacking(event)
+
                 if event.__class__ in _IGNORED_EVENTS:
                     continue
 
@@ -426,61 +534,109 @@ class Core(base.Core):
         """Get a valid timestamp, i.e. not CurrentTime, for X server.
 
         It may be used in cases where CurrentTime is unacceptable for X server."""
+        # the time of the latest event, e.g. the key press or the click that
+        # is being handled, unless the focus changed since
+        if self.conn.timestamp != xcffib.CurrentTime:
+            self.conn.stats["timestamp_round_trips_skipped"] += 1
+            return self.conn.timestamp
+
         # do a zero length append to get the time offset as suggested by ICCCM
         # https://tronche.com/gui/x/icccm/sec-2.html#s-2.1
         # we do this on a separate connection since we can't receive events
         # without returning control to the event loop, which we can't do
         # because the event loop (via some window event) wants to know the
-        # current time.
-        conn = None
+        # current time. The connection is kept for the next time.
+        if self._timestamp_conn is None:
+            self._timestamp_conn = xcbq.Connection(self._display_name)
+            self._timestamp_window = self._timestamp_conn.create_window(-1, -1, 1, 1)
+            self._timestamp_window.set_attribute(eventmask=EventMask.PropertyChange)
+        conn = self._timestamp_conn
+        assert self._timestamp_window is not None
+        wid = self._timestamp_window.wid
         try:
-            conn = xcbq.Connection(self._display_name)
-            conn.default_screen.root.set_attribute(eventmask=EventMask.PropertyChange)
             conn.conn.core.ChangePropertyChecked(
                 xcffib.xproto.PropMode.Append,
-                self._root.wid,
-                self.conn.atoms["WM_CLASS"],
-                self.conn.atoms["STRING"],
+                wid,
+                conn.atoms["WM_CLASS"],
+                conn.atoms["STRING"],
                 8,
                 0,
                 "",
             ).check()
             while True:
                 event = conn.conn.wait_for_event()
-                if event.__class__ != xcffib.xproto.PropertyNotifyEvent:
-                    continue
-                return event.time
-        finally:
-            if conn is not None:
-                conn.finalize()
+                if event.__class__ == xcffib.xproto.PropertyNotifyEvent and event.window == wid:
+                    self.conn.timestamp = event.time
+                    return event.time
+        except xcffib.ConnectionException:
+            # e.g. the server restarted, connect again the next time
+            conn.disconnect()
+            self._timestamp_conn = None
+            self._timestamp_window = None
+            raise
 
     @property
     def display_name(self) -> str:
         """The name of the connected display"""
         return self._display_name
 
+    def _update_stacking(self, event) -> None:
+        """Apply the changes of the stacking order told by the server"""
+        assert self.qtile is not None
+        stacking = self.conn.stacking
+        root = self._root.wid
+        if isinstance(event, xcffib.xproto.ConfigureNotifyEvent):
+            if event.event != root:
+                return
+            stacking.place_above(event.window, event.above_sibling)
+        elif isinstance(event, xcffib.xproto.CreateNotifyEvent):
+            if event.parent == root:
+                stacking.add(event.window)
+        elif isinstance(event, xcffib.xproto.ReparentNotifyEvent):
+            if event.parent == root:
+                stacking.add(event.window)
+            else:
+                stacking.remove(event.window)
+        else:
+            stacking.remove(event.window)
+        if isinstance(self.qtile.windows_map.get(event.window), window.Window):
+            self.update_client_lists()
+
     def update_client_lists(self) -> None:
         """Updates the _NET_CLIENT_LIST and _NET_CLIENT_LIST_STACKING properties
 
         This is needed for third party tasklists and drag and drop of tabs in
-        chrome
+        chrome. The properties are written once the event loop is done with
+        the current callbacks, or when the core is flushed, so that the
+        updates are coalesced.
         """
         assert self.qtile
+        if self._client_lists_handle is None:
+            self._client_lists_handle = self.qtile.call_soon(self._write_client_lists)
+        else:
+            self.conn.stats["client_lists_coalesced"] += 1
+
+    def _write_client_lists(self) -> None:
+        assert self.qtile
+        if self._client_lists_handle is not None:
+            self._client_lists_handle.cancel()
+            self._client_lists_handle = None
+
         # Regular top-level managed windows, i.e. excluding Static, Internal and Systray Icons
         wids = [wid for wid, c in self.qtile.windows_map.items() if isinstance(c, window.Window)]
-        self._root.set_property("_NET_CLIENT_LIST", wids)
+        if wids != self._client_list:
+            self._root.set_property("_NET_CLIENT_LIST", wids)
+            self._client_list = wids
 
-        # We rely on the stacking order from the X server
+        # The stacking order is tracked rather than queried from the X server
         stacked_wids = []
-        for wid in self._root.query_tree():
+        for wid in self.conn.stacking:
             win = self.qtile.windows_map.get(wid)
-            if not win:
-                continue
-
             if isinstance(win, window.Window) and win.group:
                 stacked_wids.append(wid)
-
-        self._root.set_property("_NET_CLIENT_LIST_STACKING", stacked_wids)
+        if stacked_wids != self._client_list_stacking:
+            self._root.set_property("_NET_CLIENT_LIST_STACKING", stacked_wids)
+            self._client_list_stacking = stacked_wids
 
     def update_desktops(self, groups, index: int) -> None:
         """Set the current desktops of the window manager
@@ -760,6 +916,19 @@ class Core(base.Core):
         assert self.qtile is not None
 
         xwin = window.XWindow(self.conn, event.window)
+        # e.g. created while the SubstructureNotify events were disabled
+        if event.parent == self._root.wid and xwin.wid not in self.conn.stacking:
+            self.conn.stacking.add(xwin.wid)
+        if xwin.wid not in self.qtile.windows_map:
+            window.prefetch([xwin])
+        try:
+            self._manage_mapped(xwin)
+        finally:
+            xwin.clear_prefetched()
+
+    def _manage_mapped(self, xwin: window.XWindow) -> None:
+        assert self.qtile is not None
+
         try:
             attrs = xwin.get_attributes()
             internal = xwin.get_property("QTILE_INTERNAL")
@@ -925,6 +1094,8 @@ class Core(base.Core):
                 qtile.focus_screen(screen.index, warp=False)
 
     def flush(self):
+        if self._client_lists_handle is not None:
+            self._write_client_lists()
         self.conn.flush()
 
     def get_mouse_position(self) -> tuple[int, int]:
@@ -951,3 +1122,19 @@ class Core(base.Core):
     @expose_command
     def idle_notify_activity(self) -> None:
         self._fake_input(xcbq.XCB_MOTION_NOTIFY, 0, 0, 0)
+
+    @expose_command()
+    def request_stats(self, reset: bool = False) -> dict[str, int]:
+        """
+        Get the counters of the X requests and round trips that were saved,
+        e.g. by not sending the geometry of windows that didn't change
+
+        Parameters
+        ==========
+        reset :
+            Reset the counters after getting them.
+        """
+        stats = dict(self.conn.stats)
+        if reset:
+            self.conn.stats.clear()
+        return stats
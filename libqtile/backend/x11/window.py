@@ -9,7 +9,7 @@ import xcffib.xproto
 from xcffib.wrappers import GContextID, PixmapID
 from xcffib.xproto import EventMask, SetMode
 
-from libqtile import bar, hook, utils
+from libqtile import bar, hook, tracing, utils
 from libqtile.backend import base
 from libqtile.backend.base import FloatStates
 from libqtile.backend.x11 import xcbq
@@ -90,15 +90,132 @@ def _geometry_setter(attr):
             logger.error("!!!! setting %s to a non-int %s; please report this!", attr, value)
             logger.error("".join(stack_trace[:-1]))
             value = int(value)
+        old = getattr(self, attr_name)
         setattr(self, attr_name, value)
+        # e.g. floating windows are moved without being laid out
+        if old is not None and old != value and attr != "depth":
+            self.qtile.mark_changed(self)
 
     return f
 
 
+# The properties that are read when a window is managed, with their types,
+# which prefetch() fetches at once
+MANAGE_PROPERTIES = (
+    ("QTILE_INTERNAL", "CARDINAL"),
+    ("WM_STATE", xcffib.xproto.GetPropertyType.Any),
+    ("WM_HINTS", xcffib.xproto.GetPropertyType.Any),
+    ("WM_NORMAL_HINTS", xcffib.xproto.GetPropertyType.Any),
+    ("WM_CLASS", "STRING"),
+    ("WM_WINDOW_ROLE", "STRING"),
+    ("WM_TRANSIENT_FOR", "WINDOW"),
+    ("WM_PROTOCOLS", "ATOM"),
+    ("_NET_WM_VISIBLE_NAME", "UTF8_STRING"),
+    ("_NET_WM_NAME", "UTF8_STRING"),
+    (xcffib.xproto.Atom.WM_NAME, "UTF8_STRING"),
+    (xcffib.xproto.Atom.WM_NAME, xcffib.xproto.GetPropertyType.Any),
+    ("_NET_WM_WINDOW_TYPE", "ATOM"),
+    ("_NET_WM_STATE", "ATOM"),
+    ("_NET_WM_DESKTOP", "CARDINAL"),
+    ("_NET_WM_PID", "CARDINAL"),
+    ("_NET_WM_STRUT_PARTIAL", "CARDINAL"),
+    ("_NET_WM_ICON", "CARDINAL"),
+)
+
+
+def prefetch(windows, properties=MANAGE_PROPERTIES):
+    """Fetch what is read when managing the windows, in a single round trip
+
+    The attributes, geometry and the given (property, type) pairs of all the
+    windows are requested before waiting for any of the replies. Each window
+    then answers with those replies until its clear_prefetched() method is
+    called, or for as long as it caches its properties. The PropertyChange
+    events selected meanwhile are kept only for the windows that are managed.
+    """
+    pending = []
+    for win in windows:
+        core = win.conn.conn.core
+        atoms = win.conn.atoms
+        if properties:
+            # so that the changes made after the properties are read are notified
+            win.set_attribute(eventmask=EventMask.PropertyChange)
+            win._prefetch_mask = True
+        cookies = {
+            "attributes": core.GetWindowAttributes(win.wid),
+            "geometry": core.GetGeometry(win.wid),
+        }
+        for prop, type in properties:
+            key = (
+                atoms[prop] if isinstance(prop, str) else prop,
+                atoms[type] if isinstance(type, str) else type,
+            )
+            cookies[key] = core.GetProperty(False, win.wid, key[0], key[1], 0, (2**32) - 1)
+        pending.append((win, cookies))
+
+    for win, cookies in pending:
+        replies = {}
+        for key, cookie in cookies.items():
+            try:
+                replies[key] = cookie.reply()
+            except (
+                xcffib.xproto.WindowError,
+                xcffib.xproto.AccessError,
+                xcffib.xproto.DrawableError,
+            ):
+                # left to the request made on demand, which handles the error
+                pass
+        win._prefetched = {
+            key: replies.pop(key) for key in ("attributes", "geometry") if key in replies
+        }
+        if win._properties is None:
+            win._properties = {}
+        win._properties.update(replies)
+
+
 class XWindow:
     def __init__(self, conn, wid):
         self.conn = conn
         self.wid = wid
+        # The attributes and geometry fetched by prefetch()
+        self._prefetched = None
+        # The GetProperty replies, by property and type atoms. They are only
+        # kept when the window notifies the changes of its properties, so
+        # that they are dropped by invalidate_property() once outdated.
+        self._properties = None
+        self.cache_properties = False
+        # Whether prefetch() selected the PropertyChange events
+        self._prefetch_mask = False
+        # The depth, border width and size of the border pixmaps last used
+        self._border_size = None
+
+    def enable_property_cache(self):
+        """Keep the properties, once the window selected PropertyChange events"""
+        self.cache_properties = True
+        if self._properties is None:
+            self._properties = {}
+
+    def invalidate_property(self, atom):
+        """Drop the replies for the property, e.g. when it changed"""
+        if self._properties:
+            for key in [key for key in self._properties if key[0] == atom]:
+                del self._properties[key]
+
+    def clear_prefetched(self):
+        self._prefetched = None
+        if not self.cache_properties:
+            self._properties = None
+            if self._prefetch_mask:
+                # the window wasn't managed, which would have kept the events
+                self.set_attribute(eventmask=EventMask.NoEvent)
+        self._prefetch_mask = False
+
+    def _get_prefetched(self, key):
+        if self._prefetched is None:
+            return None
+        reply = self._prefetched.get(key)
+        if reply is not None:
+            self.conn.stats["round_trips_prefetched"] += 1
+        return reply
 
     def _property_string(self, r):
         """Extract a string from a window property reply message"""
@@ -120,6 +237,8 @@ class XWindow:
         self.conn.conn.core.SetInputFocus(
             xcffib.xproto.InputFocus.PointerRoot, self.wid, xcffib.xproto.Time.CurrentTime
         )
+        # the focus now changed later than the latest event
+        self.conn.timestamp = xcffib.CurrentTime
 
     def warp_pointer(self, x, y):
         """Warps the pointer to the location `x`, `y` on the window"""
@@ -243,8 +362,10 @@ class XWindow:
             return self._property_utf8(r)
 
     def get_geometry(self):
-        q = self.conn.conn.core.GetGeometry(self.wid)
-        return q.reply()
+        r = self._get_prefetched("geometry")
+        if r is None:
+            r = self.conn.conn.core.GetGeometry(self.wid).reply()
+        return r
 
     def get_wm_desktop(self):
         r = self.get_property("_NET_WM_DESKTOP", "CARDINAL", unpack=int)
@@ -290,6 +411,8 @@ class XWindow:
         # since 1.12, uses switches to pack things sensibly
         if float(".".join(xcffib.__xcb_proto_version__.split(".")[0:2])) < 1.12:
             values = [i & 0xFFFFFFFF for i in values]
+        if "stackmode" in kwargs:
+            self.conn.stacking.restack(self.wid, kwargs["stackmode"], kwargs.get("sibling"))
         return self.conn.conn.core.ConfigureWindow(self.wid, mask, values)
 
     def set_attribute(self, **kwargs):
@@ -345,6 +468,8 @@ class XWindow:
         except xcffib.xproto.WindowError:
             logger.debug("X error in SetProperty (wid=%r, prop=%r), ignoring", self.wid, name)
 
+        self.invalidate_property(self.conn.atoms[name])
+
     def get_property(self, prop, type=None, unpack=None):
         """Return the contents of a property as a GetPropertyReply
 
@@ -357,20 +482,24 @@ class XWindow:
             else:
                 type, _ = xcbq.PropertyMap[prop]
 
-        try:
-            r = self.conn.conn.core.GetProperty(
-                False,
-                self.wid,
-                self.conn.atoms[prop] if isinstance(prop, str) else prop,
-                self.conn.atoms[type] if isinstance(type, str) else type,
-                0,
-                (2**32) - 1,
-            ).reply()
-        except (xcffib.xproto.WindowError, xcffib.xproto.AccessError):
-            logger.debug("X error in GetProperty (wid=%r, prop=%r), ignoring", self.wid, prop)
-            if unpack:
-                return []
-            return None
+        prop_atom = self.conn.atoms[prop] if isinstance(prop, str) else prop
+        type_atom = self.conn.atoms[type] if isinstance(type, str) else type
+        key = (prop_atom, type_atom)
+        r = self._properties.get(key) if self._properties is not None else None
+        if r is not None:
+            self.conn.stats["get_property_cached"] += 1
+        else:
+            try:
+                r = self.conn.conn.core.GetProperty(
+                    False, self.wid, prop_atom, type_atom, 0, (2**32) - 1
+                ).reply()
+            except (xcffib.xproto.WindowError, xcffib.xproto.AccessError):
+                logger.debug("X error in GetProperty (wid=%r, prop=%r), ignoring", self.wid, prop)
+                if unpack:
+                    return []
+                return None
+            if self._properties is not None:
+                self._properties[key] = r
 
         if not r.value_len:
             if unpack:
@@ -396,7 +525,10 @@ class XWindow:
         self.conn.conn.core.UnmapWindowUnchecked(self.wid)
 
     def get_attributes(self):
-        return self.conn.conn.core.GetWindowAttributes(self.wid).reply()
+        r = self._get_prefetched("attributes")
+        if r is None:
+            r = self.conn.conn.core.GetWindowAttributes(self.wid).reply()
+        return r
 
     def query_tree(self):
         return self.conn.conn.core.QueryTree(self.wid).reply().children
@@ -416,6 +548,22 @@ class XWindow:
 
         if len(colors) > borderwidth:
             colors = colors[:borderwidth]
+        # the same pixmap is set again when e.g. the focus goes back and forth,
+        # until the window is resized
+        size = (depth, borderwidth, width, height)
+        if self._border_size is not None and self._border_size != size:
+            self.conn.evict_border_pixmaps(self._border_size)
+        self._border_size = size
+        key = (depth, tuple(colors), borderwidth, width, height)
+        border = self.conn.border_pixmap(key)
+        if border is None:
+            border = self._create_borderpixmap(depth, colors, borderwidth, width, height)
+            self.conn.cache_border_pixmap(key, border)
+        self.conn.conn.core.ChangeWindowAttributes(
+            self.wid, xcffib.xproto.CW.BorderPixmap, [border]
+        )
+
+    def _create_borderpixmap(self, depth, colors, borderwidth, width, height):
         core = self.conn.conn.core
         outer_w = width + borderwidth * 2
         outer_h = height + borderwidth * 2
@@ -438,21 +586,22 @@ class XWindow:
                     )
                     core.PolyFillRectangle(pixmap, gc, 1, [rect])
                     coord += borderwidths[i]
-                self._set_borderpixmap(depth, pixmap, gc, borderwidth, width, height)
+                return self._copy_borderpixmap(depth, pixmap, gc, borderwidth, width, height)
 
-    def _set_borderpixmap(self, depth, pixmap, gc, borderwidth, width, height):
+    def _copy_borderpixmap(self, depth, pixmap, gc, borderwidth, width, height):
+        """Create the border pixmap, which is freed once evicted from the cache"""
         core = self.conn.conn.core
         outer_w = width + borderwidth * 2
         outer_h = height + borderwidth * 2
-        with PixmapID(self.conn.conn) as border:
-            core.CreatePixmap(depth, border, self.wid, outer_w, outer_h)
-            most_w = outer_w - borderwidth
-            most_h = outer_h - borderwidth
-            core.CopyArea(pixmap, border, gc, borderwidth, borderwidth, 0, 0, most_w, most_h)
-            core.CopyArea(pixmap, border, gc, 0, 0, most_w, most_h, borderwidth, borderwidth)
-            core.CopyArea(pixmap, border, gc, borderwidth, 0, 0, most_h, most_w, borderwidth)
-            core.CopyArea(pixmap, border, gc, 0, borderwidth, most_w, 0, borderwidth, most_h)
-            core.ChangeWindowAttributes(self.wid, xcffib.xproto.CW.BorderPixmap, [border])
+        border = self.conn.conn.generate_id()
+        core.CreatePixmap(depth, border, self.wid, outer_w, outer_h)
+        most_w = outer_w - borderwidth
+        most_h = outer_h - borderwidth
+        core.CopyArea(pixmap, border, gc, borderwidth, borderwidth, 0, 0, most_w, most_h)
+        core.CopyArea(pixmap, border, gc, 0, 0, most_w, most_h, borderwidth, borderwidth)
+        core.CopyArea(pixmap, border, gc, borderwidth, 0, 0, most_h, most_w, borderwidth)
+        core.CopyArea(pixmap, border, gc, 0, borderwidth, most_w, 0, borderwidth, most_h)
+        return border
 
 
 class _Window:
@@ -464,6 +613,8 @@ class _Window:
         self.hidden = False
         self.icons = {}
         window.set_attribute(eventmask=self._window_mask)
+        if self._window_mask & EventMask.PropertyChange:
+            window.enable_property_cache()
         self._group = None
 
         try:
@@ -495,6 +646,12 @@ class _Window:
         self.previous_layer = (False, False, True, False, False, False)
 
         self.bordercolor = None
+        # The geometry and borders last sent to the server by place() and
+        # paint_borders(), to skip the requests that wouldn't change anything
+        self._applied_geometry: tuple[int, int, int, int] | None = None
+        self._applied_borders: tuple | None = None
+        # Whether the client asked to be configured, and is owed a ConfigureNotify
+        self._configure_requested = False
         self.state = NormalState
         self._float_state = FloatStates.NOT_FLOATING
         self._demands_attention = False
@@ -833,19 +990,7 @@ class _Window:
             client.
         """
 
-        # TODO: self.x/y/height/width are updated BEFORE
-        # place is called, so there's no way to know if only
-        # the position is changed, so we are sending
-        # the ConfigureNotify every time place is called
-        #
-        # # if position change and size don't
-        # # send a configure notify. See ICCCM 4.2.3
-        # send_notify = False
-        # if (self.x != x or self.y != y) and \
-        #    (self.width == width and self.height == height):
-        #       send_notify = True
-        # #for now, we just:
-        send_notify = True
+        span = tracing.begin("Window.place", "x11") if tracing.enabled else None
 
         # Adjust the placement to account for layout margins, if there are any.
         if margin is not None:
@@ -897,15 +1042,35 @@ class _Window:
         self.width = width
         self.height = height
 
-        self.window.configure(x=x, y=y, width=width, height=height)
+        # self.x/y/width/height may be changed before place is called, so the
+        # geometry last sent to the server is what tells if anything changed
+        geometry = (self.x, self.y, self.width, self.height)
+        applied = self._applied_geometry
+        stats = self.window.conn.stats
+        if geometry != applied:
+            self.window.configure(x=x, y=y, width=width, height=height)
+            self._applied_geometry = geometry
+        else:
+            stats["configure_skipped"] += 1
 
         if above:
             self.change_layer(up=True)
 
         self.paint_borders(bordercolor, borderwidth)
 
-        if send_notify:
+        # The server sends a real ConfigureNotify when the window is resized,
+        # but a synthetic one is needed when it is only moved, or when a
+        # configure request of the client is not honoured. See ICCCM 4.1.5.
+        moved = applied is None or geometry[:2] != applied[:2]
+        resized = applied is None or geometry[2:] != applied[2:]
+        if self._configure_requested or applied is None or (moved and not resized):
             self.send_configure_notify(x, y, width, height)
+        else:
+            stats["configure_notify_skipped"] += 1
+        self._configure_requested = False
+
+        if span is not None:
+            tracing.end(span)
 
     def get_layering_information(self) -> tuple[bool, bool, bool, bool, bool, bool]:
         """
@@ -1204,6 +1369,16 @@ class _Window:
     def paint_borders(self, color, width):
         self.borderwidth = width
         self.bordercolor = color
+        borders = (
+            tuple(color) if isinstance(color, list) else color,
+            width,
+            self.width,
+            self.height,
+        )
+        if borders == self._applied_borders:
+            self.window.conn.stats["paint_borders_skipped"] += 1
+            return
+        self._applied_borders = borders
         self.window.configure(borderwidth=width)
         self.window.paint_borders(self.depth, color, width, self.width, self.height)
 
@@ -1523,6 +1698,7 @@ class Internal(_Window, base.Internal):
             # It will be present during config reloads; absent during shutdown as this
             # will follow graceful_shutdown
             del self.qtile.windows_map[self.wid]
+            self.qtile.selector_cache.invalidate()
             with contextlib.suppress(xcffib.ConnectionException):
                 self.qtile.core.conn.conn.core.DestroyWindow(self.window.wid)
 
@@ -1614,6 +1790,7 @@ class Static(_Window, base.Static):
         if self.conf_height is None and e.value_mask & cw.Height:
             self.height = e.height
 
+        self._configure_requested = True
         self.place(
             self.x,
             self.y,
@@ -1889,6 +2066,7 @@ class Window(_Window, base.Window):
             self.group.remove(self)
         s = Static(self.window, self.qtile, screen, x, y, width, height)
         self.qtile.windows_map[self.window.wid] = s
+        self.qtile.selector_cache.invalidate()
         self.qtile.core.update_client_lists()
         hook.fire("client_managed", s)
 
@@ -2073,6 +2251,7 @@ class Window(_Window, base.Window):
             width, height, x, y = self.width, self.height, self.x, self.y
 
         if self.group and self.group.screen:
+            self._configure_requested = True
             self.place(
                 x,
                 y,
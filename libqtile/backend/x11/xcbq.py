@@ -3,6 +3,7 @@ A minimal EWMH-aware OO layer over xcffib. This is NOT intended to be
 complete - it only implements the subset of functionalty needed by qtile.
 """
 
+import collections
 import contextlib
 import functools
 import operator
@@ -388,22 +389,30 @@ class Colormap:
         Flexible color allocation.
         """
         try:
-            return self.conn.conn.core.AllocNamedColor(self.cid, len(color), color).reply()
+            return self.alloc_named_color(color).reply()
         except xcffib.xproto.NameError:
+            return self.alloc_rgb_color(color).reply()
 
-            def x8to16(i):
-                return 0xFFFF * (i & 0xFF) // 0xFF
+    def alloc_named_color(self, color):
+        """Send the allocation of a color by name, returning the request's cookie"""
+        return self.conn.conn.core.AllocNamedColor(self.cid, len(color), color)
 
-            try:
-                color = hex(color)
-            except ValueError:
-                logger.error("Colormap failed to allocate %s", color)
-                color = "#ff0000"
+    def alloc_rgb_color(self, color):
+        """Send the allocation of a color by RGB value, returning the request's cookie"""
+
+        def x8to16(i):
+            return 0xFFFF * (i & 0xFF) // 0xFF
+
+        try:
+            color = hex(color)
+        except ValueError:
+            logger.error("Colormap failed to allocate %s", color)
+            color = "#ff0000"
 
-            r = x8to16(int(color[-6] + color[-5], 16))
-            g = x8to16(int(color[-4] + color[-3], 16))
-            b = x8to16(int(color[-2] + color[-1], 16))
-            return self.conn.conn.core.AllocColor(self.cid, r, g, b).reply()
+        r = x8to16(int(color[-6] + color[-5], 16))
+        g = x8to16(int(color[-4] + color[-3], 16))
+        b = x8to16(int(color[-2] + color[-1], 16))
+        return self.conn.conn.core.AllocColor(self.cid, r, g, b)
 
 
 class Xinerama:
@@ -498,6 +507,78 @@ class XFixes:
         self.conn.xfixes.ext.SelectSelectionInput(window.wid, _selection, self.selection_mask)
 
 
+class StackingOrder:
+    """The stacking order of the children of the root window, bottom first
+
+    It is updated from the restacks requested by qtile as they are sent, and
+    from the events of the server, which also tell about the windows that
+    restack themselves or are created or destroyed.
+    """
+
+    def __init__(self, wids=()):
+        self._wids = list(wids)
+
+    def __iter__(self):
+        return iter(self._wids)
+
+    def __contains__(self, wid):
+        return wid in self._wids
+
+    def add(self, wid):
+        """Add a new window, which is created on top"""
+        self.remove(wid)
+        self._wids.append(wid)
+
+    def remove(self, wid):
+        if wid in self._wids:
+            self._wids.remove(wid)
+
+    def restack(self, wid, stackmode, sibling=None):
+        """Apply a ConfigureWindow request"""
+        if wid not in self._wids or (sibling is not None and sibling not in self._wids):
+            return
+        if stackmode == xcffib.xproto.StackMode.Above:
+            if sibling is None:
+                self.add(wid)
+            else:
+                self.place_above(wid, sibling)
+        elif stackmode == xcffib.xproto.StackMode.Below:
+            self._wids.remove(wid)
+            index = 0 if sibling is None else self._wids.index(sibling)
+            self._wids.insert(index, wid)
+        # the other modes depend on the geometry, the events will tell
+
+    def place_above(self, wid, sibling):
+        """Place the window just above the sibling, or at the bottom if it is
+        None, as told by ConfigureNotify events"""
+        if wid not in self._wids or wid == sibling:
+            return
+        self._wids.remove(wid)
+        if not sibling:
+            self._wids.insert(0, wid)
+        elif sibling in self._wids:
+            self._wids.insert(self._wids.index(sibling) + 1, wid)
+        else:
+            # we don't know that window yet, leave it for the next events
+            self._wids.append(wid)
+
+
+# How many pixels the cached border pixmaps may use in total, i.e. 16 MiB at
+# 32 bits per pixel, or the focused and unfocused borders of two full HD
+# windows
+BORDER_PIXMAPS_AREA = 1 << 22
+
+
+def _border_pixmap_size(key):
+    depth, _, borderwidth, width, height = key
+    return depth, borderwidth, width, height
+
+
+def _border_pixmap_area(key):
+    _, _, borderwidth, width, height = key
+    return (width + borderwidth * 2) * (height + borderwidth * 2)
+
+
 class Connection:
     _extmap = {
         "xinerama": Xinerama,
@@ -529,6 +610,22 @@ class Connection:
         self.refresh_modmap()
 
         self._cmaps = {}
+        self._color_pixels: dict[str, int] = {}
+        # The border pixmaps of windows, least recently used first, by depth,
+        # colors, border width and window size, with their total area
+        self._border_pixmaps: collections.OrderedDict[tuple, int] = collections.OrderedDict()
+        self._border_pixmaps_area = 0
+
+        # The stacking order of the top-level windows, which is tracked by the
+        # window manager's connection
+        self.stacking = StackingOrder()
+
+        # Counters of the requests and round trips that were saved
+        self.stats: collections.Counter[str] = collections.Counter()
+
+        # The server time of the latest event received, as long as it is a
+        # valid timestamp for focus requests, or CurrentTime
+        self.timestamp = xcffib.CurrentTime
 
     def colormap(self, desired_depth):
         if desired_depth in self._cmaps:
@@ -691,10 +788,61 @@ class Connection:
                 xcffib.xproto.Time.CurrentTime,
             )
 
-    @functools.lru_cache
     def color_pixel(self, name):
-        pixel = self.screens[0].default_colormap.alloc_color(name).pixel
-        return pixel | 0xFF << 24
+        pixel = self._color_pixels.get(name)
+        if pixel is not None:
+            self.stats["alloc_color_skipped"] += 1
+            return pixel
+        pixel = self.screens[0].default_colormap.alloc_color(name).pixel | 0xFF << 24
+        self._color_pixels[name] = pixel
+        return pixel
+
+    def border_pixmap(self, key):
+        """The cached border pixmap for the key, or None"""
+        pixmap = self._border_pixmaps.get(key)
+        if pixmap is not None:
+            self._border_pixmaps.move_to_end(key)
+            self.stats["border_pixmaps_reused"] += 1
+        return pixmap
+
+    def cache_border_pixmap(self, key, pixmap):
+        """Keep a border pixmap, freeing the least recently used ones once
+        they use more than BORDER_PIXMAPS_AREA pixels
+
+        The server keeps the pixmaps set as the border of a window for as long
+        as they are used, so they can be freed at any time.
+        """
+        self._border_pixmaps[key] = pixmap
+        self._border_pixmaps_area += _border_pixmap_area(key)
+        while self._border_pixmaps_area > BORDER_PIXMAPS_AREA and len(self._border_pixmaps) > 1:
+            old_key, old_pixmap = self._border_pixmaps.popitem(last=False)
+            self._border_pixmaps_area -= _border_pixmap_area(old_key)
+            self.conn.core.FreePixmap(old_pixmap)
+
+    def evict_border_pixmaps(self, size):
+        """Free the border pixmaps of the given depth, border width, width and
+        height, e.g. once the window using them was resized"""
+        for key in [key for key in self._border_pixmaps if _border_pixmap_size(key) == size]:
+            self._border_pixmaps_area -= _border_pixmap_area(key)
+            self.conn.core.FreePixmap(self._border_pixmaps.pop(key))
+
+    def prefetch_colors(self, names):
+        """
+        Allocate the pixels of the colors that aren't cached yet, sending all
+        the requests before waiting for any of the replies.
+        """
+        colormap = self.screens[0].default_colormap
+        names = [name for name in dict.fromkeys(names) if name not in self._color_pixels]
+        named = [(name, colormap.alloc_named_color(name)) for name in names]
+        # colors that aren't known by name to the server are given as RGB values
+        by_value = []
+        for name, cookie in named:
+            try:
+                self._color_pixels[name] = cookie.reply().pixel | 0xFF << 24
+            except xcffib.xproto.NameError:
+                by_value.append((name, colormap.alloc_rgb_color(name)))
+        for name, cookie in by_value:
+            self._color_pixels[name] = cookie.reply().pixel | 0xFF << 24
 
 
 class Painter:
@@ -5,7 +5,7 @@ import typing
 from collections import defaultdict
 from typing import Any
 
-from libqtile import configurable, hook
+from libqtile import configurable, hook, tracing
 from libqtile.command.base import CommandObject, ItemT, expose_command
 from libqtile.log_utils import logger
 from libqtile.utils import ColorsType, has_transparency, is_valid_colors
@@ -640,6 +640,7 @@ class Bar(Gap, configurable.Configurable, CommandObject):
 
     def _actual_draw(self) -> None:
         self._draw_queued = False
+        span = tracing.begin("Bar._actual_draw", "draw") if tracing.enabled else None
         self._resize(self.length, self.widgets)
         # We draw the border before the widgets
         if any(self.border_width):
@@ -726,6 +727,9 @@ class Bar(Gap, configurable.Configurable, CommandObject):
             x, y, w, h = rect
             self.drawer.draw(offsetx=x, offsety=y, height=h, width=w, src_x=x, src_y=y)
 
+        if span is not None:
+            tracing.end(span)
+
     @expose_command()
     def info(self) -> dict[str, Any]:
         return dict(
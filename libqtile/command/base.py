@@ -10,6 +10,7 @@ import inspect
 import sys
 import traceback
 from collections.abc import Callable
+from typing import Any
 
 from libqtile.command.graph import SelectorType
 from libqtile.log_utils import logger
@@ -88,6 +89,29 @@ class CommandException(Exception):
     """Error raised while executing a command"""
 
 
+class SelectorCache:
+    """Cache of the objects that selector paths resolve to
+
+    Only the paths where every item is selected explicitly, from an item class
+    the selecting object lists in `_cached_items`, are cached: these resolve
+    to the same object until items of those classes are added or removed, at
+    which point the cache must be invalidated.
+    """
+
+    def __init__(self) -> None:
+        self._objects: dict[tuple[tuple[str, str | int | None], ...], CommandObject] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self) -> None:
+        """Forget all of the cached objects"""
+        self._objects.clear()
+
+    def info(self) -> dict[str, int]:
+        """The number of cached objects and the hit and miss counters"""
+        return {"size": len(self._objects), "hits": self.hits, "misses": self.misses}
+
+
 class CommandObject(metaclass=abc.ABCMeta):
     """Base class for objects that expose commands
 
@@ -98,19 +122,32 @@ class CommandObject(metaclass=abc.ABCMeta):
     (c.f. docstring for `.items()` and `.select()`).
     """
 
+    # Set on the root of the command graph to cache the resolved selectors
+    selector_cache: SelectorCache | None = None
+
+    # The item classes which, selected explicitly, resolve to the same object
+    # until the selector cache is invalidated
+    _cached_items: frozenset[str] = frozenset()
+
+    # The keys of info() which can be read without building all of it, for
+    # the objects which have an info() command
+    _info_getters: dict[str, Callable[[Any], Any]] = {}
+
+    # Set on each class by __new__
+    _commands: dict[str, Callable]
+    _command_names: list[str]
+    _command_docs: dict[str, str]
+
     def __new__(cls, *args, **kwargs):
-        # Check which level of command object has been parsed
-        # This test ensures inherited classes don't stop additional
-        # methods from being exposed.
-        # For example, if widget.TextBox has already been parsed, a subsequent
-        # call to initialise a new TextBox will return here. However, if a user
-        # subclasses TextBox for a new widget then that new widget will still
-        # be parsed here to check for new commands.
-        if getattr(cls, "_command_object", "") == cls.__name__:
-            super().__new__(cls)
+        # The command table of a class is built the first time it is
+        # instantiated, and then reused by all of its instances. The check is
+        # on the class's own namespace so that subclasses still get parsed,
+        # e.g. if a user subclasses TextBox for a new widget then that new
+        # widget will get its own table with any additional commands.
+        if "_commands" in cls.__dict__:
+            return super().__new__(cls)
 
         commands = {}
-        cmd_s = set()
 
         # We need to iterate over the class's inherited classes in reverse order
         # We reverse the order so the exposed command will always be the latest
@@ -133,21 +170,11 @@ class CommandObject(metaclass=abc.ABCMeta):
                     setattr(cls, mapping, method)
                     commands[mapping] = method
 
-        if cmd_s:
-            names = ", ".join(cmd_s)
-            msg = (
-                f"The use of the 'cmd_' prefix to expose commands via IPC "
-                f"is deprecated. Methods should use the "
-                f"@expose_command() decorator instead. "
-                f"Please update: {names}"
-            )
-            logger.warning("Deprecation Warning: %s", msg)
-
-        # Record the object as being parsed.
-        cls._command_object = cls.__name__
-
-        # Store list of exposed commands
+        # Store the exposed commands, their sorted names for listing and the
+        # documentation, which is generated the first time it is requested
         cls._commands = commands
+        cls._command_names = sorted(commands)
+        cls._command_docs = {}
 
         return super().__new__(cls)
 
@@ -159,7 +186,26 @@ class CommandObject(metaclass=abc.ABCMeta):
 
         Raises SelectError if the object does not exist.
         """
+        cache = self.selector_cache
+        if cache is None or not selectors:
+            return self._select_path(selectors)[0]
+
+        path = tuple((name, selector) for name, selector in selectors)
+        obj = cache._objects.get(path)
+        if obj is not None:
+            cache.hits += 1
+            return obj
+
+        cache.misses += 1
+        obj, cacheable = self._select_path(selectors)
+        if cacheable:
+            cache._objects[path] = obj
+        return obj
+
+    def _select_path(self, selectors: list[SelectorType]) -> tuple[CommandObject, bool]:
+        """Walk the selectors, also returning whether the resolution can be cached"""
         obj: CommandObject = self
+        cacheable = True
         for name, selector in selectors:
             root, items = obj.items(name)
             # if non-root object and no selector given
@@ -175,8 +221,9 @@ class CommandObject(metaclass=abc.ABCMeta):
             maybe_obj = obj._select(name, selector)
             if maybe_obj is None:
                 raise SelectError("", name, selectors)
+            cacheable = cacheable and selector is not None and name in obj._cached_items
             obj = maybe_obj
-        return obj
+        return obj, cacheable
 
     @expose_command()
     def items(self, name: str) -> tuple[bool, list[str | int] | None]:
@@ -232,6 +279,21 @@ class CommandObject(metaclass=abc.ABCMeta):
         """
         return self._commands.get(name)
 
+    def info_fields(self, fields: list[str] | None = None) -> dict[str, Any]:
+        """Return the given keys of info(), or all of it when fields is None
+
+        info() is only built when some of the keys can't be read with
+        _info_getters. Unknown keys are left out.
+        """
+        info: Callable[[], dict[str, Any]] = self.info  # type: ignore[attr-defined]
+        if fields is None:
+            return info()
+        getters = self._info_getters
+        if all(field in getters for field in fields):
+            return {field: getters[field](self) for field in fields}
+        full = info()
+        return {field: full[field] for field in fields if field in full}
+
     @allow_when_locked
     @expose_command()
     def commands(self) -> list[str]:
@@ -240,7 +302,7 @@ class CommandObject(metaclass=abc.ABCMeta):
 
         Used by __qsh__ for command completion and online help
         """
-        return sorted([cmd for cmd in self._commands])
+        return list(self._command_names)
 
     @expose_command()
     def doc(self, name) -> str:
@@ -248,14 +310,24 @@ class CommandObject(metaclass=abc.ABCMeta):
 
         Used by __qsh__ to provide online help.
         """
-        if name in self.commands():
-            command = self.command(name)
-            assert command
-            signature = self._get_command_signature(command)
-            spec = name + signature
-            htext = inspect.getdoc(command) or ""
-            return spec + "\n" + htext
-        raise CommandError(f"No such command: {name}")
+        command = self.command(name)
+        if command is None:
+            raise CommandError(f"No such command: {name}")
+
+        # Only the documentation of the class's own commands is cached, as
+        # objects like ScreenSplit also resolve the commands of other objects
+        if self._commands.get(name) is not command:
+            return self._format_doc(name, command)
+        doc = self._command_docs.get(name)
+        if doc is None:
+            doc = self._command_docs[name] = self._format_doc(name, command)
+        return doc
+
+    def _format_doc(self, name: str, command: Callable) -> str:
+        signature = self._get_command_signature(command)
+        spec = name + signature
+        htext = inspect.getdoc(command) or ""
+        return spec + "\n" + htext
 
     def _get_command_signature(self, command: Callable) -> str:
         signature = inspect.signature(command)
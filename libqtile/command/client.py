@@ -9,6 +9,8 @@ clients to do this interaction.
 
 from __future__ import annotations
 
+import contextlib
+from collections.abc import Iterator
 from typing import Any
 
 from libqtile.command.base import SelectError
@@ -20,7 +22,12 @@ from libqtile.command.graph import (
     GraphType,
     SelectorType,
 )
-from libqtile.command.interface import CommandInterface, IPCCommandInterface
+from libqtile.command.interface import (
+    AsyncIPCCommandInterface,
+    BatchCommandInterface,
+    CommandInterface,
+    IPCCommandInterface,
+)
 from libqtile.ipc import Client, find_sockfile
 
 
@@ -50,7 +57,7 @@ class CommandClient:
             specified, the command graph root is used.
         """
         if command is None:
-            command = IPCCommandInterface(Client(find_sockfile()))
+            command = IPCCommandInterface(Client(find_sockfile(), persistent=True))
         self._command = command
         self._current_node = current_node if current_node is not None else CommandGraphRoot()
 
@@ -99,13 +106,32 @@ class CommandClient:
         -------
         The output returned from the function call.
         """
-        if name not in self.commands:
+        if not self._command.has_command(self._current_node, name):
             raise SelectError("Not valid child or command", name, self._current_node.selectors)
 
         call = self._current_node.call(name, lifted=lifted)
 
         return self._command.execute(call, args, kwargs)
 
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[CommandBatch]:
+        """Execute all of the calls made in the block together
+
+        The calls made on the returned client are queued and then executed in
+        order, in a single round trip, when the block exits.  The status and
+        result of each call is then available from its ``results``::
+
+            with client.batch() as batch:
+                batch.navigate("group", "b").call("toscreen")
+                batch.call("next_layout")
+            print(batch.results)
+        """
+        batch = CommandBatch(
+            BatchCommandInterface(self._command), current_node=self._current_node
+        )
+        yield batch
+        batch.flush()
+
     @property
     def children(self) -> list[str]:
         """Get the children of the current location in the command graph"""
@@ -139,6 +165,21 @@ class CommandClient:
         return self.__class__(self._command, current_node=self._current_node.parent)
 
 
+class CommandBatch(CommandClient):
+    """A command client that queues its calls, see ``CommandClient.batch()``"""
+
+    _command: BatchCommandInterface
+
+    @property
+    def results(self) -> list[tuple[int, Any]]:
+        """The status and result of each call, once the batch is executed"""
+        return self._command.results
+
+    def flush(self) -> list[tuple[int, Any]]:
+        """Execute the queued calls"""
+        return self._command.flush()
+
+
 class InteractiveCommandClient:
     """
     A command graph client that can be used to easily resolve elements interactively
@@ -163,7 +204,7 @@ class InteractiveCommandClient:
             specified, the command graph root is used.
         """
         if command is None:
-            command = IPCCommandInterface(Client(find_sockfile()))
+            command = IPCCommandInterface(Client(find_sockfile(), persistent=True))
         self._command = command
         self._current_node = current_node if current_node is not None else CommandGraphRoot()
 
@@ -269,6 +310,195 @@ class InteractiveCommandClient:
         return _normalize_item(object_type, item)
 
 
+class AsyncCommandClient:
+    """The object that resolves the commands, from a running event loop"""
+
+    def __init__(
+        self,
+        command: AsyncIPCCommandInterface | None = None,
+        *,
+        current_node: CommandGraphNode | None = None,
+    ) -> None:
+        """A client that resolves calls through the async command interface
+
+        Exposes the same API as :class:`CommandClient`, with the methods that
+        talk to qtile being coroutines. All of the clients navigated from this
+        one share its connection, over which any number of calls can be
+        awaited concurrently::
+
+            client = AsyncCommandClient()
+
+            async def info(wid):
+                return await (await client.navigate("window", wid)).call("info")
+
+            windows = await client.call("windows")
+            infos = await asyncio.gather(*(info(w["id"]) for w in windows))
+
+        Parameters
+        ----------
+        command: AsyncIPCCommandInterface
+            The object that is used to resolve command graph calls, as well as
+            navigate the command graph.
+        current_node: CommandGraphNode
+            The current node that is pointed to in the command graph.  If not
+            specified, the command graph root is used.
+        """
+        if command is None:
+            command = AsyncIPCCommandInterface(Client(find_sockfile(), persistent=True))
+        self._command = command
+        self._current_node = current_node if current_node is not None else CommandGraphRoot()
+
+    async def navigate(self, name: str, selector: str | None) -> AsyncCommandClient:
+        """Resolve the given object in the command graph
+
+        See :meth:`CommandClient.navigate`.
+        """
+        if name not in self.children:
+            raise SelectError("Not valid child", name, self._current_node.selectors)
+
+        normalized_selector = _normalize_item(name, selector) if selector is not None else None
+        if normalized_selector is not None:
+            if not await self._command.has_item(self._current_node, name, normalized_selector):
+                raise SelectError(
+                    "Item not available in object", name, self._current_node.selectors
+                )
+
+        next_node = self._current_node.navigate(name, normalized_selector)
+        return self.__class__(self._command, current_node=next_node)
+
+    async def call(self, name: str, *args, lifted=True, **kwargs) -> Any:
+        """Resolve and invoke the call into the command graph
+
+        See :meth:`CommandClient.call`.
+        """
+        if not await self._command.has_command(self._current_node, name):
+            raise SelectError("Not valid child or command", name, self._current_node.selectors)
+
+        call = self._current_node.call(name, lifted=lifted)
+
+        return await self._command.execute(call, args, kwargs)
+
+    @property
+    def children(self) -> list[str]:
+        """Get the children of the current location in the command graph"""
+        return self._current_node.children
+
+    @property
+    def selectors(self) -> list[SelectorType]:
+        return self._current_node.selectors
+
+    async def commands(self) -> list[str]:
+        """Get the commands available on the current object"""
+        command_call = self._current_node.call("commands")
+        return await self._command.execute(command_call, (), {})
+
+    async def items(self, name: str) -> tuple[bool, list[str | int]]:
+        """Get the available items"""
+        items_call = self._current_node.call("items")
+        return await self._command.execute(items_call, (name,), {})
+
+    @property
+    def root(self) -> AsyncCommandClient:
+        """Get the root of the command graph"""
+        return self.__class__(self._command)
+
+    @property
+    def parent(self) -> AsyncCommandClient:
+        """Get the parent of the current client"""
+        if self._current_node.parent is None:
+            raise SelectError("", "", self._current_node.selectors)
+        return self.__class__(self._command, current_node=self._current_node.parent)
+
+    async def close(self) -> None:
+        """Close the connection shared by the clients"""
+        await self._command.close()
+
+
+class AsyncInteractiveCommandClient:
+    """
+    A command graph client that can be used to easily resolve elements from a
+    running event loop
+    """
+
+    def __init__(
+        self,
+        command: AsyncIPCCommandInterface | None = None,
+        *,
+        current_node: GraphType | None = None,
+    ) -> None:
+        """An interactive client that resolves calls through the async interface
+
+        Exposes the command graph API like :class:`InteractiveCommandClient`,
+        with the calls returning coroutines::
+
+            c = AsyncInteractiveCommandClient()
+            await c.group["b"].toscreen()
+            infos = await asyncio.gather(*(c.window[wid].info() for wid in wids))
+
+        Navigating the graph doesn't talk to qtile: the objects and the
+        command are only resolved by qtile when the call is awaited, raising
+        a CommandError if any of them doesn't exist. As any attribute is a
+        command, the connection is closed through the command interface.
+
+        Parameters
+        ----------
+        command: AsyncIPCCommandInterface
+            The object that is used to resolve command graph calls.
+        current_node: CommandGraphNode
+            The current node that is pointed to in the command graph.  If not
+            specified, the command graph root is used.
+        """
+        if command is None:
+            command = AsyncIPCCommandInterface(Client(find_sockfile(), persistent=True))
+        self._command = command
+        self._current_node = current_node if current_node is not None else CommandGraphRoot()
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        """When the client has navigated to a command, execute it"""
+        if not isinstance(self._current_node, CommandGraphCall):
+            raise SelectError("Invalid call", "", self._current_node.selectors)
+
+        return await self._command.execute(self._current_node, args, kwargs)
+
+    def __getattr__(self, name: str) -> AsyncInteractiveCommandClient:
+        """Get the child object, or the command, with the given name"""
+        # Python's help() command will try to look up __name__ and __origin__ so we
+        # need to handle these explicitly otherwise they'll result in a SelectError
+        # which help() does not expect.
+        if name in ["__name__", "__origin__"]:
+            raise AttributeError
+
+        if isinstance(self._current_node, CommandGraphCall):
+            raise SelectError(
+                "Cannot select children of call", name, self._current_node.selectors
+            )
+
+        if name not in self._current_node.children:
+            call_object = self._current_node.call(name)
+            return self.__class__(self._command, current_node=call_object)
+
+        next_node = self._current_node.navigate(name, None)
+        return self.__class__(self._command, current_node=next_node)
+
+    def __getitem__(self, name: str | int) -> AsyncInteractiveCommandClient:
+        """Get the selected element of the currently selected object"""
+        if isinstance(self._current_node, CommandGraphRoot):
+            raise KeyError("Root node has no available items", name, self._current_node.selectors)
+
+        if not isinstance(self._current_node, CommandGraphObject):
+            raise SelectError(
+                "Unable to make selection on current node",
+                str(name),
+                self._current_node.selectors,
+            )
+
+        if self._current_node.selector is not None:
+            raise SelectError("Selection already made", str(name), self._current_node.selectors)
+
+        next_node = self._current_node.parent.navigate(self._current_node.object_type, name)
+        return self.__class__(self._command, current_node=next_node)
+
+
 def _normalize_item(object_type: str | None, item: str) -> str | int:
     if object_type in ["group", "widget", "bar"]:
         return str(item)
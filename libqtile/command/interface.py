@@ -2,10 +2,12 @@
 The interface to execute commands on the command graph
 """
 
+import functools
 import traceback
 import types
 import typing
 from abc import ABCMeta, abstractmethod
+from collections.abc import Callable
 from typing import Any, Literal, Union, get_args, get_origin
 
 from libqtile import hook, ipc
@@ -18,6 +20,11 @@ SUCCESS = 0
 ERROR = 1
 EXCEPTION = 2
 
+# Tag of messages carrying a list of calls to be executed together
+BATCH = "batch"
+
+CallType = tuple[CommandGraphCall, tuple, dict]
+
 
 # these two mask their aliases from elsewhere in the tree (i.e.
 # libqtile.extension.base._Extension, and libqtile.layout.base.Layout
@@ -70,6 +77,28 @@ class CommandInterface(metaclass=ABCMeta):
             The keyword arguments to pass into the command graph call.
         """
 
+    def execute_batch(self, calls: list[CallType]) -> list[tuple[int, Any]]:
+        """Execute the given calls in order, returning the status and result of each
+
+        Interfaces that are able to do so should override this to execute all
+        of the calls at once.
+
+        Parameters
+        ----------
+        calls: list[tuple[CommandGraphCall, tuple, dict]]
+            The calls on the command graph that are to be performed, with
+            their arguments and keyword arguments.
+        """
+        results: list[tuple[int, Any]] = []
+        for call, args, kwargs in calls:
+            try:
+                results.append((SUCCESS, self.execute(call, args, kwargs)))
+            except CommandError as err:
+                results.append((ERROR, err.args[0]))
+            except CommandException as err:
+                results.append((EXCEPTION, err.args[0]))
+        return results
+
     @abstractmethod
     def has_command(self, node: CommandGraphNode, command: str) -> bool:
         """Check if the given command exists
@@ -107,6 +136,39 @@ class CommandInterface(metaclass=ABCMeta):
         """
 
 
+class BatchCommandInterface(CommandInterface):
+    """Record calls so that they can be executed together by another interface"""
+
+    def __init__(self, command: CommandInterface):
+        """A command interface that queues calls until flushed
+
+        Parameters
+        ----------
+        command: CommandInterface
+            The interface used to resolve the queued calls on flush, and to
+            navigate the command graph.
+        """
+        self._command = command
+        self.calls: list[CallType] = []
+        self.results: list[tuple[int, Any]] = []
+
+    def execute(self, call: CommandGraphCall, args: tuple, kwargs: dict) -> None:
+        """Queue the given call, its result is available after the flush"""
+        self.calls.append((call, args, kwargs))
+
+    def flush(self) -> list[tuple[int, Any]]:
+        """Execute the queued calls, returning the status and result of each"""
+        calls, self.calls = self.calls, []
+        self.results = self._command.execute_batch(calls) if calls else []
+        return self.results
+
+    def has_command(self, node: CommandGraphNode, command: str) -> bool:
+        return self._command.has_command(node, command)
+
+    def has_item(self, node: CommandGraphNode, object_type: str, item: str | int) -> bool:
+        return self._command.has_item(node, object_type, item)
+
+
 class QtileCommandInterface(CommandInterface):
     """Execute the commands via the in process running qtile instance"""
 
@@ -235,11 +297,29 @@ class IPCCommandInterface(CommandInterface):
         status, result = self._client.send(
             (call.parent.selectors, call.name, args, kwargs, call.lifted)
         )
-        if status == SUCCESS:
-            return result
-        if status == ERROR:
+        return _call_result(status, result)
+
+    def execute_batch(self, calls: list[CallType]) -> list[tuple[int, Any]]:
+        """Execute the given calls in order, in a single round trip
+
+        Parameters
+        ----------
+        calls: list[tuple[CommandGraphCall, tuple, dict]]
+            The calls on the command graph that are to be performed, with
+            their arguments and keyword arguments.
+        """
+        status, result = self._client.send(
+            (
+                BATCH,
+                [
+                    (call.parent.selectors, call.name, args, kwargs, call.lifted)
+                    for call, args, kwargs in calls
+                ],
+            )
+        )
+        if status != SUCCESS:
             raise CommandError(result)
-        raise CommandException(result)
+        return [(call_status, call_result) for call_status, call_result in result]
 
     def has_command(self, node: CommandGraphNode, command: str) -> bool:
         """Check if the given command exists
@@ -289,16 +369,74 @@ class IPCCommandInterface(CommandInterface):
         return items is not None and item in items
 
 
-def lift_args(cmd, args, kwargs):
-    """
-    Lift args lifts the arguments to the type annotations on cmd's parameters.
+class AsyncIPCCommandInterface:
+    """Execute the resolved commands over IPC from a running event loop
+
+    This mirrors :class:`IPCCommandInterface`, with its methods being
+    coroutines. The calls are sent over the persistent connection of the
+    client, so that any number of them can be awaited concurrently.
     """
 
-    def lift_arg(typ, arg):
-        # for stuff like int | None, allow either
-        if get_origin(typ) in [types.UnionType, Union]:
-            for t in get_args(typ):
-                if t == types.NoneType:
+    def __init__(self, ipc_client: ipc.Client):
+        """Build a command object which resolves commands through IPC calls
+
+        Parameters
+        ----------
+        ipc_client: ipc.Client
+            The client that is to be used to resolve the calls.
+        """
+        self._client = ipc_client
+
+    async def execute(self, call: CommandGraphCall, args: tuple, kwargs: dict) -> Any:
+        """Execute the given call, returning the result of the execution
+
+        Parameters
+        ----------
+        call: CommandGraphCall
+            The call on the command graph that is to be performed.
+        args:
+            The arguments to pass into the command graph call.
+        kwargs:
+            The keyword arguments to pass into the command graph call.
+        """
+        status, result = await self._client.async_send(
+            (call.parent.selectors, call.name, args, kwargs, call.lifted)
+        )
+        return _call_result(status, result)
+
+    async def has_command(self, node: CommandGraphNode, command: str) -> bool:
+        """Check if the given command exists on the given node"""
+        commands = await self.execute(node.call("commands"), (), {})
+        return command in commands
+
+    async def has_item(self, node: CommandGraphNode, object_type: str, item: str | int) -> bool:
+        """Check if the given item exists on the given node"""
+        _, items = await self.execute(node.call("items"), (object_type,), {})
+        return items is not None and item in items
+
+    async def close(self) -> None:
+        """Close the connection of the client"""
+        await self._client.async_close()
+
+
+def _call_result(status: int, result: Any) -> Any:
+    """Return the result of a call, or raise the error it failed with"""
+    if status == SUCCESS:
+        return result
+    if status == ERROR:
+        raise CommandError(result)
+    raise CommandException(result)
+
+
+def _lifter(typ: Any) -> Callable[[Any], Any]:
+    """Build the function that lifts an argument to the given type annotation"""
+    # for stuff like int | None, allow either
+    if get_origin(typ) in [types.UnionType, Union]:
+        lifters = [None if t == types.NoneType else _lifter(t) for t in get_args(typ)]
+
+        def lift_union(arg):
+            for lift in lifters:
+                if lift is None:
                     # special case None? I don't know what this looks like
                     # coming over IPC
                     if arg == "":
@@ -308,57 +446,80 @@ def lift_args(cmd, args, kwargs):
                     continue
 
                 try:
-                    return lift_arg(t, arg)
+                    return lift(arg)
                 except TypeError:
                     pass
             # uh oh, we couldn't lift it to anything
             raise TypeError(f"{arg} is not a {typ}")
 
-        # for literals, check that it is one of the valid strings
-        if get_origin(typ) is Literal:
-            if arg not in get_args(typ):
+        return lift_union
+
+    # for literals, check that it is one of the valid strings
+    if get_origin(typ) is Literal:
+        choices = get_args(typ)
+
+        def lift_literal(arg):
+            if arg not in choices:
                 raise TypeError(f"{arg} is not one of {get_origin(typ)}")
             return arg
 
-        if typ is bool:
-            # >>> bool("False") is True
-            # True
-            # ... but we want it to be false :)
+        return lift_literal
+
+    if typ is bool:
+        # >>> bool("False") is True
+        # True
+        # ... but we want it to be false :)
+        def lift_bool(arg):
             if arg == "True" or arg is True:
                 return True
             if arg == "False" or arg is False:
                 return False
             raise TypeError(f"{arg} is not a bool")
 
-        if typ is Any:
-            # can't do any lifting if we don't know the type
-            return arg
+        return lift_bool
 
-        if typ in [_Extension, Layout]:
-            # these are "complex" objects that can't be created with a
-            # single string argument. we generally don't expect people to
-            # be passing these over the command line, so let's ignore then.
-            return arg
+    if (
+        # can't do any lifting if we don't know the type
+        typ is Any
+        # these are "complex" objects that can't be created with a single
+        # string argument. we generally don't expect people to be passing
+        # these over the command line, so let's ignore then.
+        or typ in [_Extension, Layout]
+        # again, we do not want to be in the business of parsing lists/dicts
+        # of types out of strings; just pass on whatever we got
+        or get_origin(typ) in [list, dict]
+    ):
+        return _unlifted
 
-        if get_origin(typ) in [list, dict]:
-            # again, we do not want to be in the business of parsing
-            # lists/dicts of types out of strings; just pass on whatever we
-            # got
-            return arg
+    return typ
 
-        return typ(arg)
 
-    converted_args = []
-    converted_kwargs = dict()
+def _unlifted(arg: Any) -> Any:
+    return arg
+
 
+@functools.cache
+def _command_lifters(cmd: Callable) -> tuple[list[Callable], dict[str, Callable]]:
+    """The lifters of the annotated parameters of a command, in order and by name
+
+    Resolving the type hints is slow, so this is only done the first time a
+    command is called with lifted arguments.
+    """
     # We use the globals from the command itself to ensure that all types are
     # available. This means that structural types need to imported at run time
     # and not just for typing.
     params = typing.get_type_hints(cmd, globalns=cmd.__globals__)
+    params.pop("return", None)
+    lifters = {param: _lifter(typ) for param, typ in params.items()}
+    return list(lifters.values()), lifters
 
-    non_return_annotated_args = filter(lambda k: k != "return", params.keys())
-    for param, arg in zip(non_return_annotated_args, args):
-        converted_args.append(lift_arg(params[param], arg))
+
+def lift_args(cmd, args, kwargs):
+    """
+    Lift args lifts the arguments to the type annotations on cmd's parameters.
+    """
+    positional, by_name = _command_lifters(getattr(cmd, "__func__", cmd))
+    converted_args = [lift(arg) for lift, arg in zip(positional, args)]
 
     # if not all args were annotated, we need to keep them anyway. note
     # that mixing some annotated and not annotated args will not work well:
@@ -372,10 +533,11 @@ def lift_args(cmd, args, kwargs):
     if len(converted_args) < len(args):
         converted_args.extend(args[len(converted_args) :])
 
+    converted_kwargs = dict()
     for k, v in kwargs.items():
         # if this kwarg has a type annotation, use it
-        if k in params:
-            converted_kwargs[k] = lift_arg(params[k], v)
+        if k in by_name:
+            converted_kwargs[k] = by_name[k](v)
         else:
             converted_kwargs[k] = v
 
@@ -392,31 +554,80 @@ class IPCCommandServer:
         and from the IPCCommandInterface.
         """
         self.qtile = qtile
+        # Bumped whenever the objects the selectors resolve to may have
+        # changed, which drops the resolutions cached by compiled calls
+        self.generation = 0
+
+    def invalidate(self) -> None:
+        """Drop the command resolutions cached by the compiled calls"""
+        self.generation += 1
+
+    def compile(
+        self, selectors: list[SelectorType], name: str, args: tuple, kwargs: dict
+    ) -> "CompiledCall":
+        """Prepare a call that is executed without going through :meth:`call`"""
+        return CompiledCall(self, selectors, name, args, kwargs)
 
     def call(
+        self,
+        data: tuple[list[SelectorType], str, tuple, dict, bool] | tuple[str, list],
+    ) -> tuple[int, Any]:
+        """Receive and parse the given data
+
+        The data is either a single call or a batch of calls, which are
+        executed in order. The result of a batch is the list of the status
+        and result of each call. The group relayouts queued by the calls are
+        run before returning, so that clients see the resulting geometry, and
+        only once per group for a batch.
+        """
+        try:
+            if data[0] == BATCH:
+                _, calls = data
+                return SUCCESS, [self._call(call) for call in calls]
+            return self._call(data)  # type: ignore[arg-type]
+        finally:
+            self.qtile.flush_layouts()
+            self.qtile.core.flush()
+
+    def _call(
         self,
         data: tuple[list[SelectorType], str, tuple, dict, bool],
     ) -> tuple[int, Any]:
-        """Receive and parse the given data"""
+        """Execute a single call"""
         selectors, name, args, kwargs, lifted = data
         try:
-            obj = self.qtile.select(selectors)
-            cmd = obj.command(name)
-        except SelectError as err:
-            sel_string = format_selectors(selectors)
-            return ERROR, f"No object {err.name} in path '{sel_string}'"
-        if not cmd:
-            return ERROR, "No such command"
+            obj, cmd = self._resolve(selectors, name)
+        except CommandError as err:
+            return ERROR, err.args[0]
 
         logger.debug("Command: %s(%s, %s)", name, args, kwargs)
 
         if lifted:
             args, kwargs = lift_args(cmd, args, kwargs)
 
-        # Check if method is bound, if itis, insert magic self
+        # Check if method is bound, if itis, insert magic self. Codecs other
+        # than marshal send the args as a list.
         if not hasattr(cmd, "__self__"):
-            args = (obj,) + args
+            args = (obj, *args)
+
+        return self._run(name, cmd, args, kwargs)
 
+    def _resolve(
+        self, selectors: list[SelectorType], name: str
+    ) -> tuple[CommandObject, Callable]:
+        """Find the object and the command the selectors point to"""
+        try:
+            obj = self.qtile.select(selectors)
+            cmd = obj.command(name)
+        except SelectError as err:
+            sel_string = format_selectors(selectors)
+            raise CommandError(f"No object {err.name} in path '{sel_string}'")
+        if not cmd:
+            raise CommandError("No such command")
+        return obj, cmd
+
+    def _run(self, name: str, cmd: Callable, args: tuple, kwargs: dict) -> tuple[int, Any]:
+        """Run a resolved command, unless the session is locked"""
         if self.qtile.locked and not getattr(cmd, "_allow_when_locked", False):
             return ERROR, f"{name} cannot be called when session is locked."
 
@@ -426,3 +637,44 @@ class IPCCommandServer:
             return ERROR, err.args[0]
         except Exception:
             return EXCEPTION, traceback.format_exc().strip().split("\n")[-1]
+
+
+class CompiledCall:
+    """A call which keeps the command it resolves to between executions
+
+    Selectors like the current window or layout depend on the state of qtile,
+    so the resolution is only reused until the server is invalidated. Whether
+    the session is locked is checked on every execution.
+    """
+
+    def __init__(
+        self,
+        server: IPCCommandServer,
+        selectors: list[SelectorType],
+        name: str,
+        args: tuple,
+        kwargs: dict,
+    ) -> None:
+        self.server = server
+        self.selectors = selectors
+        self.name = name
+        self.args = tuple(args)
+        self.kwargs = kwargs
+        self._generation = -1
+        self._cmd: Callable | None = None
+        self._cmd_args: tuple = ()
+
+    def __call__(self) -> tuple[int, Any]:
+        """Execute the call, returning the status and the result of the command"""
+        server = self.server
+        if self._generation != server.generation or self._cmd is None:
+            try:
+                obj, cmd = server._resolve(self.selectors, self.name)
+            except CommandError as err:
+                return ERROR, err.args[0]
+            self._cmd = cmd
+            self._cmd_args = self.args if hasattr(cmd, "__self__") else (obj, *self.args)
+            self._generation = server.generation
+
+        logger.debug("Command: %s(%s, %s)", self.name, self.args, self.kwargs)
+        return server._run(self.name, self._cmd, self._cmd_args, self.kwargs)
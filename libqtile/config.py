@@ -410,6 +410,8 @@ class Screen(CommandObject):
     rate. 60 would mean that we handle a drag event 60 times per second.
     """
 
+    _cached_items = frozenset({"bar"})
+
     group: _Group
     index: int
     # This is populated in manager.py's _process_screens()
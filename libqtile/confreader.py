@@ -57,6 +57,7 @@ class Config:
     idle_inhibitors: list[IdleInhibitor]
     fake_screens: list[Screen] | None
     generate_screens: Callable[[list[Output]], list[Screen]] | None
+    loop_lag_threshold: float | None
 
     def __init__(self, file_path=None, **settings):
         """Create a Config() object from settings
@@ -6,6 +6,26 @@ from typing import Self
 
 from libqtile.log_utils import logger
 
+# The event loop implementations that can be selected with `qtile start --loop`
+EVENT_LOOPS = ("asyncio", "uvloop")
+
+
+def new_event_loop(name: str = "asyncio") -> asyncio.AbstractEventLoop:
+    """Create an event loop of the named implementation
+
+    Falls back to asyncio's loop when the implementation isn't installed.
+    """
+    if name == "uvloop":
+        try:
+            import uvloop
+        except ImportError:
+            logger.warning("uvloop is not installed, using the asyncio event loop.")
+        else:
+            return uvloop.new_event_loop()
+    elif name != "asyncio":
+        raise ValueError(f"Unknown event loop: {name}")
+    return asyncio.new_event_loop()
+
 
 class LoopContext(contextlib.AbstractAsyncContextManager):
     def __init__(
@@ -31,7 +51,8 @@ class LoopContext(contextlib.AbstractAsyncContextManager):
         await self._cancel_all_tasks()
 
         loop = asyncio.get_running_loop()
-        map(loop.remove_signal_handler, self._signals.keys())
+        for sig in self._signals:
+            loop.remove_signal_handler(sig)
         loop.set_exception_handler(None)
 
     async def _cancel_all_tasks(self) -> None:
@@ -17,10 +17,10 @@ from collections.abc import Callable, Sequence
 from logging.handlers import RotatingFileHandler
 from os import PathLike
 from pathlib import Path
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
 import libqtile
-from libqtile import bar, hook, ipc, utils
+from libqtile import bar, hook, ipc, tracing, utils
 from libqtile.backend import base
 from libqtile.command import interface
 from libqtile.command.base import (
@@ -28,10 +28,11 @@ from libqtile.command.base import (
     CommandException,
     CommandObject,
     ItemT,
+    SelectorCache,
     expose_command,
 )
 from libqtile.command.client import InteractiveCommandClient
-from libqtile.command.interface import IPCCommandServer, QtileCommandInterface
+from libqtile.command.interface import CompiledCall, IPCCommandServer, QtileCommandInterface
 from libqtile.config import (
     Click,
     Drag,
@@ -47,8 +48,10 @@ from libqtile.config import (
 from libqtile.config import ScratchPad as ScratchPadConfig
 from libqtile.confreader import Config
 from libqtile.core.lifecycle import lifecycle
-from libqtile.core.loop import LoopContext
+from libqtile.core.loop import LoopContext, new_event_loop
+from libqtile.core.profiler import SamplingProfiler
 from libqtile.core.state import QtileState
+from libqtile.core.watchdog import LagMonitor
 from libqtile.dgroups import DGroups
 from libqtile.extension.base import _Extension
 from libqtile.group import _Group
@@ -68,10 +71,48 @@ from libqtile.utils import (
 )
 from libqtile.widget.base import _Widget
 
+if TYPE_CHECKING:
+    from libqtile.lazy import LazyCall
+
+# Hooks fired when the objects that selectors such as the current window,
+# layout, group or screen resolve to may have changed
+SELECTION_HOOKS = frozenset(
+    {
+        "addgroup",
+        "delgroup",
+        "changegroup",
+        "setgroup",
+        "focus_change",
+        "client_focus",
+        "client_managed",
+        "client_killed",
+        "group_window_add",
+        "group_window_remove",
+        "layout_change",
+        "screen_change",
+        "screens_reconfigured",
+        "current_screen_change",
+    }
+)
+
+# Hooks fired when the windows, groups, screens or layouts change, which bump
+# the state version
+STATE_HOOKS = SELECTION_HOOKS | {
+    "float_change",
+    "client_name_updated",
+    "client_urgent_hint_changed",
+}
+
+# The number of removed windows or groups remembered for snapshots, older
+# removals are forgotten and clients from before them get a full snapshot
+MAX_REMOVED = 1000
+
 
 class Qtile(CommandObject):
     """This object is the `root` of the command graph"""
 
+    _cached_items = frozenset({"group", "screen", "widget", "window"})
+
     current_screen: Screen
     dgroups: DGroups
     _eventloop: asyncio.AbstractEventLoop
@@ -83,6 +124,7 @@ class Qtile(CommandObject):
         no_spawn: bool = False,
         state: str | None = None,
         socket_path: str | None = None,
+        event_loop: str = "asyncio",
     ) -> None:
         self.core: base.Core = kore
         self.config = config
@@ -102,15 +144,36 @@ class Qtile(CommandObject):
 
         self.keys_map: dict[tuple[int, int], Key | KeyChord] = {}
         self.chord_stack: list[KeyChord] = []
+        self._key_calls: dict[LazyCall, CompiledCall] = {}
 
         self.screens: list[Screen] = []
+        self.selector_cache: SelectorCache = SelectorCache()
+        self.lag_monitor = LagMonitor(describe_event=self._describe_event)
+        self._profiler: SamplingProfiler | None = None
+
+        # Bumped whenever the windows, groups, screens or layouts change, with
+        # the version at which each window, group and the screens last changed.
+        # It starts from the time, in microseconds, so that the versions known
+        # by clients from before a restart are older than any of this process.
+        self.state_version = time.time_ns() // 1000
+        self._oldest_version = self.state_version
+        self._changed_windows: dict[int, int] = {}
+        self._changed_groups: dict[str, int] = {}
+        self._changed_screens = 0
+        self._removed_windows: dict[int, int] = {}
+        self._removed_groups: dict[str, int] = {}
+
+        # groups waiting to be laid out, with their warp and focus arguments
+        self._pending_layouts: dict[_Group, tuple[bool, bool]] = {}
+        self._layout_handle: asyncio.Handle | None = None
 
         libqtile.init(self)
-        libqtile.event_loop = asyncio.new_event_loop()
+        libqtile.event_loop = new_event_loop(event_loop)
 
         self._stopped_event: asyncio.Event = asyncio.Event()
 
         self.server = IPCCommandServer(self)
+        self._ipc_server: ipc.Server | None = None
 
         self.locked = False
         hook.subscribe.locked(self.lock)
@@ -132,6 +195,15 @@ class Qtile(CommandObject):
             logger.exception("Configuration error:")
             send_notification("Configuration error", str(e))
 
+        self.selector_cache.invalidate()
+        self.lag_monitor.threshold = self.config.loop_lag_threshold
+        # everything is recreated, so clients need a full snapshot
+        self.state_version += 1
+        self._oldest_version = self.state_version
+        self._changed_windows.clear()
+        self._changed_groups.clear()
+        self._removed_windows.clear()
+        self._removed_groups.clear()
         self.dgroups = DGroups(self, self.config.groups, self.config.dgroups_key_binder)
 
         _Widget.global_defaults = self.config.widget_defaults
@@ -153,8 +225,10 @@ class Qtile(CommandObject):
         self._process_screens(reloading=not initial)
 
         # Map and Grab keys
+        self._key_calls.clear()
         for key in self.config.keys:
             self.grab_key(key)
+            self._compile_key(key)
 
         for button in self.config.mouse:
             self.grab_button(button)
@@ -209,6 +283,24 @@ class Qtile(CommandObject):
         if initial:
             hook.fire("startup_complete")
 
+        self.server.invalidate()
+
+    def _compile_key(self, key: Key | KeyChord) -> None:
+        """Prepare the commands of the key, and of the keys of a chord, for dispatch"""
+        if isinstance(key, KeyChord):
+            for submapping in key.submappings:
+                self._compile_key(submapping)
+            return
+        for cmd in key.commands:
+            self._key_calls[cmd] = self.server.compile(
+                cmd.selectors, cmd.name, cmd.args, cmd.kwargs
+            )
+
+    def _invalidate_key_calls(self, event: str, args: tuple) -> None:
+        """Drop the cached key command resolutions when the objects they point to change"""
+        if event in SELECTION_HOOKS:
+            self.server.invalidate()
+
     def _prepare_socket_path(
         self,
         socket_path: str | None = None,
@@ -236,6 +328,7 @@ class Qtile(CommandObject):
 
         faulthandler.enable(all_threads=True)
         faulthandler.register(signal.SIGUSR2, all_threads=True)
+        self.lag_monitor.start()
 
         try:
             signals: dict[signal.Signals, Callable]
@@ -250,26 +343,155 @@ class Qtile(CommandObject):
                 # the XWayland X server has initialized (as a workaround). the
                 # x11 backend can just do it here.
                 signals[signal.SIGCHLD] = utils.reap_zombies
-            async with (
-                LoopContext(signals),
-                ipc.Server(
-                    self._prepare_socket_path(self.socket_path),
-                    self.server.call,
-                ),
-            ):
+            self._ipc_server = ipc.Server(
+                self._prepare_socket_path(self.socket_path),
+                self.server.call,
+            )
+            hook.qtile_hooks.add_listener(self._publish_hook)
+            hook.qtile_hooks.add_listener(self._invalidate_key_calls)
+            hook.qtile_hooks.add_listener(self._track_state)
+            async with LoopContext(signals), self._ipc_server:
                 await self._stopped_event.wait()
                 if lifecycle.behavior != lifecycle.behavior.RESTART:
                     await self.graceful_shutdown()
         finally:
+            hook.qtile_hooks.remove_listener(self._publish_hook)
+            hook.qtile_hooks.remove_listener(self._invalidate_key_calls)
+            hook.qtile_hooks.remove_listener(self._track_state)
+            self.lag_monitor.stop()
+            if self._profiler is not None:
+                self._profiler.stop()
             self.finalize()
             self.core.remove_listener()
 
+    def _describe_event(self) -> str | None:
+        """The event the backend is handling, for the stalls of the lag monitor"""
+        event = self.core.current_event
+        if event is None or isinstance(event, str):
+            return event
+        return type(event).__name__
+
+    def _publish_hook(self, event: str, args: tuple) -> None:
+        """Send the fired hook to the IPC clients that subscribed to it"""
+        if self._ipc_server is not None and self._ipc_server.is_subscribed(event):
+            self._ipc_server.publish(event, [self._summarize_hook_arg(arg) for arg in args])
+
+    def _summarize_hook_arg(self, arg: Any) -> Any:
+        """Make a hook argument serializable, identifying qtile objects by name or id"""
+        if arg is None or isinstance(arg, bool | int | float | str):
+            return arg
+        if isinstance(arg, list | tuple | set):
+            return [self._summarize_hook_arg(a) for a in arg]
+        if isinstance(arg, dict):
+            return {str(k): self._summarize_hook_arg(v) for k, v in arg.items()}
+        if isinstance(arg, base.Window):
+            group = arg.group.name if arg.group else None
+            return {"type": "window", "id": arg.wid, "name": arg.name, "group": group}
+        if isinstance(arg, base.Static):
+            return {"type": "window", "id": arg.wid, "name": arg.name, "group": None}
+        if isinstance(arg, _Group):
+            return {"type": "group", "name": arg.name}
+        if isinstance(arg, Layout):
+            group = arg.group.name if arg.group else None
+            return {"type": "layout", "name": arg.name, "group": group}
+        if isinstance(arg, Screen):
+            return {"type": "screen", "index": arg.index}
+        return repr(arg)
+
+    def _track_state(self, event: str, args: tuple) -> None:
+        """Bump the state version for the hooks that change the state"""
+        if event not in STATE_HOOKS:
+            return
+        if event in ("client_killed", "delgroup"):
+            self.mark_removed(args[0])
+        elif event == "addgroup":
+            self._removed_groups.pop(args[0], None)
+            self.mark_changed(self.groups_map.get(args[0]))
+        elif event == "client_managed":
+            # window ids can be reused
+            self._removed_windows.pop(args[0].wid, None)
+            self.mark_changed(args[0])
+        elif any(isinstance(arg, base.WindowType | _Group | Layout | Screen) for arg in args):
+            self.mark_changed(*args)
+        else:
+            # Hooks like setgroup or focus_change don't say what changed, but
+            # it is about what is currently shown
+            shown = [s.group for s in self.screens]
+            self.mark_changed(*self.screens, *shown, self.current_window)
+
+    def mark_changed(self, *objects: Any) -> None:
+        """Bump the state version, recording the given objects as changed
+
+        The objects can be windows, groups, layouts (their group changed) or
+        screens. Other objects are ignored.
+        """
+        self.state_version += 1
+        version = self.state_version
+        for obj in objects:
+            if isinstance(obj, base.Window | base.Static):
+                # hooks still fire for windows while they are being removed
+                if obj.wid not in self._removed_windows:
+                    self._changed_windows[obj.wid] = version
+                if isinstance(obj, base.Window) and obj.group is not None:
+                    self._changed_groups[obj.group.name] = version
+            elif isinstance(obj, _Group):
+                self._changed_groups[obj.name] = version
+            elif isinstance(obj, Layout):
+                if obj.group is not None:
+                    self._changed_groups[obj.group.name] = version
+            elif isinstance(obj, Screen):
+                self._changed_screens = version
+
+    def mark_removed(self, obj: base.WindowType | str) -> None:
+        """Bump the state version, recording the window, or named group, as removed"""
+        self.state_version += 1
+        if isinstance(obj, str):
+            changed: dict = self._changed_groups
+            removed: dict = self._removed_groups
+            key: int | str = obj
+        else:
+            changed = self._changed_windows
+            removed = self._removed_windows
+            key = obj.wid
+            if isinstance(obj, base.Window) and obj.group is not None:
+                self._changed_groups[obj.group.name] = self.state_version
+        changed.pop(key, None)
+        removed.pop(key, None)
+        removed[key] = self.state_version
+        if len(removed) > MAX_REMOVED:
+            for key in list(removed)[: MAX_REMOVED // 2]:
+                self._oldest_version = max(self._oldest_version, removed.pop(key))
+
     def stop(self, exitcode: int = 0) -> None:
         hook.fire("shutdown")
         lifecycle.behavior = lifecycle.behavior.TERMINATE
         lifecycle.exitcode = exitcode
         self._stop()
 
+    def queue_layout(self, group: _Group, warp: bool, focus: bool) -> None:
+        """Lay out the group once the event loop is done with the current callbacks
+
+        The relayouts of a group queued until then are coalesced into one,
+        which warps and focuses if any of them asked to.
+        """
+        prev_warp, prev_focus = self._pending_layouts.get(group, (False, False))
+        self._pending_layouts[group] = (prev_warp or warp, prev_focus or focus)
+        if self._layout_handle is None:
+            self._layout_handle = self.call_soon(self.flush_layouts)
+
+    def flush_layouts(self) -> None:
+        """Lay out the groups with a queued relayout now
+
+        For code that needs the geometry of the windows to be up to date
+        before the queued relayouts are run.
+        """
+        if self._layout_handle is not None:
+            self._layout_handle.cancel()
+            self._layout_handle = None
+        pending, self._pending_layouts = self._pending_layouts, {}
+        for group, (warp, focus) in pending.items():
+            group.layout_all(warp=warp, focus=focus, sync=True)
+
     def normal_windows(self) -> list[base.WindowType]:
         return list(
             filter(lambda w: isinstance(w, base.Window), self.windows_map.copy().values())
@@ -375,6 +597,10 @@ class Qtile(CommandObject):
         hook.clear()
 
     def finalize(self) -> None:
+        if self._layout_handle is not None:
+            self._layout_handle.cancel()
+            self._layout_handle = None
+        self._pending_layouts.clear()
         self._finalize_configurables()
         remove_dbus_rules()
         inhibitor.stop()
@@ -507,6 +733,7 @@ class Qtile(CommandObject):
                 screen.finalize_gaps()
 
         self.screens = new_screens
+        self.selector_cache.invalidate()
 
     @expose_command()
     def reconfigure_screens(self, *_: list[Any], **__: dict[Any, Any]) -> None:
@@ -522,7 +749,7 @@ class Qtile(CommandObject):
         for group in self.groups:
             if group.screen:
                 if group.screen in self.screens:
-                    group.layout_all()
+                    group.layout_all(sync=True)
                 else:
                     group.hide()
 
@@ -547,12 +774,26 @@ class Qtile(CommandObject):
             executed = False
             for cmd in key.commands:
                 if cmd.check(self):
-                    status, val = self.server.call(
-                        (cmd.selectors, cmd.name, cmd.args, cmd.kwargs, False)
+                    call = self._key_calls.get(cmd)
+                    if call is None:
+                        # Bound after the config was loaded, e.g. by dgroups
+                        call = self._key_calls[cmd] = self.server.compile(
+                            cmd.selectors, cmd.name, cmd.args, cmd.kwargs
+                        )
+                    span = (
+                        tracing.begin("process_key_event", "input", {"command": cmd.name})
+                        if tracing.enabled
+                        else None
                     )
+                    status, val = call()
+                    if span is not None:
+                        tracing.end(span)
                     if status in (interface.ERROR, interface.EXCEPTION):
                         logger.error("KB command error %s: %s", cmd.name, val)
                     executed = True
+            # Run the relayouts queued by the commands now, as the IPC server
+            # does, rather than after the backend has sent their other changes
+            self.flush_layouts()
             if self.chord_stack and (not self.chord_stack[-1].mode or key.key == "Escape"):
                 self.ungrab_chord()
             # We never swallow when no commands have been executed,
@@ -678,6 +919,7 @@ class Qtile(CommandObject):
                 layouts = self.config.layouts
             g._configure(layouts, self.config.floating_layout, self)
             self.groups_map[name] = g
+            self.selector_cache.invalidate()
             hook.fire("addgroup", name)
             hook.fire("changegroup")
             self.update_desktops()
@@ -707,6 +949,7 @@ class Qtile(CommandObject):
 
             self.groups.remove(group)
             del self.groups_map[name]
+            self.selector_cache.invalidate()
 
             hook.fire("delgroup", name)
             hook.fire("changegroup")
@@ -742,6 +985,7 @@ class Qtile(CommandObject):
             self.renamed_widgets.append(name)
 
         self.widgets_map[name] = w
+        self.selector_cache.invalidate()
 
     @property
     def current_layout(self) -> Layout:
@@ -792,6 +1036,7 @@ class Qtile(CommandObject):
     def manage(self, win: base.WindowType) -> None:
         if isinstance(win, base.Internal):
             self.windows_map[win.wid] = win
+            self.selector_cache.invalidate()
             return
 
         if win.wid in self.windows_map:
@@ -804,6 +1049,7 @@ class Qtile(CommandObject):
         if win.defunct:
             return
         self.windows_map[win.wid] = win
+        self.selector_cache.invalidate()
         if self.current_screen and isinstance(win, base.Window):
             # Window may have been bound to a group in the hook.
             if not win.group and self.current_screen.group:
@@ -827,6 +1073,7 @@ class Qtile(CommandObject):
                 if c.group:
                     c.group.remove(c)
             del self.windows_map[wid]
+            self.selector_cache.invalidate()
             if isinstance(c, base.Window):
                 self.core.idle_inhibitor_manager.remove_window_inhibitor(c)
 
@@ -1140,16 +1387,30 @@ class Qtile(CommandObject):
         pdb.set_trace()
 
     @expose_command()
-    def get_groups(self) -> dict[str, dict[str, Any]]:
+    def get_groups(
+        self, fields: list[str] | None = None, screen: int | None = None
+    ) -> dict[str, dict[str, Any]]:
         """
         Return a dictionary containing information for all groups
 
+        Parameters
+        ==========
+        fields :
+            Only return these keys of each group's info
+        screen :
+            Only return the group shown on the screen with this index
+
         Examples
         ========
 
             get_groups()
+            get_groups(fields=["name", "windows"])
         """
-        return {i.name: i.info() for i in self.groups}
+        return {
+            i.name: i.info_fields(fields)
+            for i in self.groups
+            if screen is None or (i.screen is not None and i.screen.index == screen)
+        }
 
     @expose_command()
     def display_kb(self) -> str:
@@ -1320,6 +1581,62 @@ class Qtile(CommandObject):
         ]
         return lst
 
+    @expose_command()
+    def snapshot(self, since: int | None = None) -> dict[str, Any]:
+        """
+        Return the windows, groups and screens that changed since a state version
+
+        The state version is bumped whenever windows, groups, screens or
+        layouts change. When nothing changed since the given version, only the
+        version and "unchanged" are returned. Otherwise the reply contains the
+        info of the windows and groups that changed, the screens if any of them
+        changed, and the ids of the windows and names of the groups that were
+        removed. Without a version, or with one that is too old to know what
+        was removed, e.g. from before a restart, everything is returned and
+        "full" is set.
+
+        Parameters
+        ==========
+        since :
+            The "version" of the previous snapshot
+
+        Examples
+        ========
+
+            snapshot()
+            snapshot(since=42)
+        """
+        if since is not None and since == self.state_version:
+            return {"version": self.state_version, "unchanged": True}
+
+        full = since is None or not self._oldest_version <= since <= self.state_version
+        since = 0 if full or since is None else since
+        windows = [
+            win.info()
+            for win in self.windows_map.values()
+            if isinstance(win, base.Window | base.Static)
+            and (full or self._changed_windows.get(win.wid, 0) > since)
+        ]
+        groups = {
+            group.name: group.info()
+            for group in self.groups
+            if full or self._changed_groups.get(group.name, 0) > since
+        }
+        return {
+            "version": self.state_version,
+            "unchanged": False,
+            "full": full,
+            "windows": windows,
+            "groups": groups,
+            "screens": self.get_screens() if full or self._changed_screens > since else None,
+            "removed_windows": [
+                wid for wid, v in self._removed_windows.items() if not full and v > since
+            ],
+            "removed_groups": [
+                name for name, v in self._removed_groups.items() if not full and v > since
+            ],
+        }
+
     @expose_command()
     def simulate_keypress(self, modifiers: list[str], key: str) -> None:
         """Simulates a keypress on the focused window.
@@ -1506,14 +1823,64 @@ class Qtile(CommandObject):
         self.focus_screen((self.screens.index(self.current_screen) - 1) % len(self.screens))
 
     @expose_command()
-    def windows(self) -> list[dict[str, Any]]:
-        """Return info for each client window"""
+    def windows(
+        self,
+        fields: list[str] | None = None,
+        group: str | None = None,
+        screen: int | None = None,
+        wm_class: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Return info for each client window
+
+        Parameters
+        ==========
+        fields :
+            Only return these keys of each window's info
+        group :
+            Only return the windows in the group with this name
+        screen :
+            Only return the windows shown on the screen with this index
+        wm_class :
+            Only return the windows with this class, or instance, name
+
+        Examples
+        ========
+
+            windows()
+            windows(fields=["id", "name", "group"], screen=0)
+        """
         return [
-            i.info()
+            i.info_fields(fields)
             for i in self.windows_map.values()
-            if not isinstance(i, base.Internal | _Widget) and isinstance(i, CommandObject)
+            if not isinstance(i, base.Internal | _Widget)
+            and isinstance(i, CommandObject)
+            and self._window_matches(i, group, screen, wm_class)
         ]
 
+    def _window_matches(
+        self,
+        win: base.Window | base.Static,
+        group: str | None,
+        screen: int | None,
+        wm_class: str | None,
+    ) -> bool:
+        """Whether the window passes the filters of the windows command"""
+        win_group = win.group if isinstance(win, base.Window) else None
+        if group is not None and (win_group is None or win_group.name != group):
+            return False
+        if screen is not None:
+            win_screen: Screen | None
+            if isinstance(win, base.Static):
+                win_screen = win.screen
+            else:
+                win_screen = win_group.screen if win_group is not None else None
+            if win_screen is None or win_screen.index != screen:
+                return False
+        if wm_class is not None and wm_class not in (win.get_wm_class() or []):
+            return False
+        return True
+
     def lookup_client(self, wid: int) -> base.Window | None:
         w = self.windows_map.get(wid)
         if isinstance(w, base.Window):
@@ -1521,13 +1888,36 @@ class Qtile(CommandObject):
         return None
 
     @expose_command()
-    def internal_windows(self) -> list[dict[str, Any]]:
-        """Return info for each internal window (bars, for example)"""
-        return [i.info() for i in self.windows_map.values() if isinstance(i, base.Internal)]
+    def internal_windows(self, fields: list[str] | None = None) -> list[dict[str, Any]]:
+        """
+        Return info for each internal window (bars, for example)
+
+        Parameters
+        ==========
+        fields :
+            Only return these keys of each window's info
+        """
+        return [
+            i.info_fields(fields)
+            for i in self.windows_map.values()
+            if isinstance(i, base.Internal)
+        ]
 
     @expose_command()
-    def qtile_info(self) -> dict:
-        """Returns a dictionary of info on the Qtile instance"""
+    def selector_cache_info(self) -> dict[str, int]:
+        """Return the size and the hit and miss counters of the selector cache"""
+        return self.selector_cache.info()
+
+    @expose_command()
+    def qtile_info(self, fields: list[str] | None = None) -> dict:
+        """
+        Returns a dictionary of info on the Qtile instance
+
+        Parameters
+        ==========
+        fields :
+            Only return these keys of the info
+        """
         config_path = self.config.file_path
         dictionary = {
             "version": VERSION,
@@ -1543,6 +1933,8 @@ class Qtile(CommandObject):
         elif isinstance(config_path, Path):
             dictionary["config_path"] = config_path.as_posix()
 
+        if fields is not None:
+            return {field: dictionary[field] for field in fields if field in dictionary}
         return dictionary
 
     @expose_command()
@@ -1936,6 +2328,133 @@ class Qtile(CommandObject):
         tracemalloc.take_snapshot().dump(malloc_dump)
         return True, malloc_dump
 
+    @expose_command()
+    def loop_lag(self, reset: bool = False) -> dict[str, Any]:
+        """
+        Return the event loop lag statistics
+
+        The lag is how late the event loop runs a callback scheduled every
+        ``interval`` seconds. The histogram is a list of the upper bounds of
+        its buckets in milliseconds (None for the last one) with their counts.
+        The latest stalls, where the lag exceeded ``loop_lag_threshold``, have
+        the event being handled and the stack of the event loop at the time.
+
+        Parameters
+        ==========
+        reset :
+            Clear the statistics, after returning them
+        """
+        info = self.lag_monitor.info()
+        if reset:
+            self.lag_monitor.reset()
+        return info
+
+    @expose_command()
+    def hook_stats(self, enable: bool | None = None, reset: bool = False) -> dict[str, Any]:
+        """
+        Return the statistics of the hook subscribers
+
+        Each hook and subscriber (by qualified name) has its number of calls,
+        cumulative and maximum wall time in seconds, and number of exceptions
+        raised. The time of async subscribers is until their completion.
+        Recording is off by default and is what `qtile top --hooks` uses.
+
+        Parameters
+        ==========
+        enable :
+            Start (True) or stop (False) recording the statistics
+        reset :
+            Clear the statistics recorded so far, after returning them
+        """
+        if enable is not None:
+            hook.enable_stats(enable)
+        stats = hook.get_stats()
+        if reset:
+            hook.reset_stats()
+        return {"enabled": hook.stats_enabled, "stats": stats}
+
+    @expose_command()
+    def profile_start(self, interval: float = 0.005) -> None:
+        """
+        Start sampling the stack of the event loop
+
+        The profiler runs in a separate thread so that qtile runs at full
+        speed while it is sampled. `qtile profile` drives it for a number of
+        seconds.
+
+        Parameters
+        ==========
+        interval :
+            The time between samples, in seconds
+        """
+        if self._profiler is not None:
+            raise CommandError("The profiler is already running")
+        self._profiler = SamplingProfiler(interval)
+        self._profiler.start()
+
+    @expose_command()
+    def profile_stop(self, path: str | None = None) -> dict[str, Any]:
+        """
+        Stop the profiler and write its samples in the collapsed stack format
+
+        Each line is the ``;`` separated frames of a stack, outermost first,
+        and the number of samples it was seen in. The file can be made into
+        a flame graph with e.g. flamegraph.pl or speedscope.
+
+        Parameters
+        ==========
+        path :
+            The file to write, by default qtile_profile.folded in the cache
+            directory
+        """
+        if self._profiler is None:
+            raise CommandError("The profiler is not running")
+        profiler, self._profiler = self._profiler, None
+        profiler.stop()
+        if path is None:
+            path = os.path.join(get_cache_dir(), "qtile_profile.folded")
+        profiler.write(path)
+        return {
+            "path": path,
+            "samples": sum(profiler.samples.values()),
+            "duration": profiler.duration,
+        }
+
+    @expose_command()
+    def trace_start(self, max_events: int = 100_000) -> None:
+        """
+        Start recording tracing spans
+
+        The spans cover the handling of input events, key bindings, group
+        and layout relayouts, window placement and bar drawing. When tracing
+        is off, they only cost a flag check.
+
+        Parameters
+        ==========
+        max_events :
+            The number of spans kept, older ones are dropped
+        """
+        tracing.start(max_events)
+
+    @expose_command()
+    def trace_stop(self, path: str | None = None) -> dict[str, Any]:
+        """
+        Stop recording tracing spans and write them in the Chrome trace format
+
+        The file can be opened in e.g. https://ui.perfetto.dev or
+        chrome://tracing.
+
+        Parameters
+        ==========
+        path :
+            The file to write, by default qtile_trace.json in the cache
+            directory
+        """
+        tracing.stop()
+        if path is None:
+            path = os.path.join(get_cache_dir(), "qtile_trace.json")
+        return {"path": path, "events": tracing.dump(path)}
+
     @expose_command()
     def get_test_data(self) -> Any:
         """
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import collections
+import os
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from types import CodeType, FrameType
+
+
+class SamplingProfiler:
+    """Sample the stack of a thread from a helper thread
+
+    Every ``interval`` seconds, the stack of the thread that started the
+    profiler is recorded. As nothing is traced, the profiled thread runs at
+    full speed. The samples are written in the collapsed stack format, one
+    ``frame;frame;...;frame count`` line per stack from the outermost frame,
+    which flame graph tools (e.g. flamegraph.pl or speedscope) read.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: collections.Counter[tuple[CodeType, ...]] = collections.Counter()
+        self.started = 0.0
+        self.duration = 0.0
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._thread_id = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start sampling the calling thread"""
+        if self.running:
+            return
+        self._thread_id = threading.get_ident()
+        self._stopped.clear()
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._sample, name="qtile-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        self.duration += time.monotonic() - self.started
+
+    def _sample(self) -> None:
+        samples = self.samples
+        thread_id = self._thread_id
+        while not self._stopped.wait(self.interval):
+            frame: FrameType | None = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                samples[tuple(stack)] += 1
+
+    @staticmethod
+    def _label(code: CodeType) -> str:
+        # replace "/path/to/module/file.py" with "module/file.py"
+        filename = os.sep.join(code.co_filename.split(os.sep)[-2:])
+        return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+    def collapsed(self) -> list[str]:
+        """The samples in the collapsed stack format"""
+        labels: dict[CodeType, str] = {}
+        lines = []
+        for stack, count in self.samples.most_common():
+            frames = []
+            for code in stack:
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = self._label(code).replace(";", ",")
+                frames.append(label)
+            lines.append(f"{';'.join(frames)} {count}")
+        return lines
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
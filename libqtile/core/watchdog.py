@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import collections
+import sys
+import threading
+import time
+import traceback
+from typing import TYPE_CHECKING
+
+from libqtile.log_utils import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+
+# Upper bounds, in milliseconds, of the lag histogram buckets. The last
+# bucket counts everything above them.
+LAG_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LagMonitor:
+    """Measure how late the event loop runs its callbacks
+
+    A callback is scheduled every ``interval`` seconds and the time it is run
+    after its due time is added to a histogram. A helper thread checks that
+    the callback keeps running: once it is ``threshold`` seconds late, the
+    loop is considered stalled and the stack of the loop's thread is logged,
+    along with the event being handled as returned by ``describe_event``.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        threshold: float | None = 0.25,
+        describe_event: Callable[[], Any] | None = None,
+        max_stalls: int = 10,
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.describe_event = describe_event
+        self.histogram = [0] * (len(LAG_BUCKETS) + 1)
+        self.samples = 0
+        self.max_lag = 0.0
+        self.stall_count = 0
+        self.stalls: collections.deque[dict[str, Any]] = collections.deque(maxlen=max_stalls)
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._loop_thread_id = 0
+        # When the next callback is due, in time.monotonic() (the loop's clock)
+        self._due = 0.0
+        # The stall of the current callback, once reported by the thread
+        self._stall: dict[str, Any] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._handle is not None
+
+    def start(self) -> None:
+        """Start monitoring the running loop, from its thread"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._schedule()
+        self._thread = threading.Thread(target=self._watch, name="qtile-lag-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histogram = [0] * (len(LAG_BUCKETS) + 1)
+            self.samples = 0
+            self.max_lag = 0.0
+            self.stall_count = 0
+            self.stalls.clear()
+
+    def _schedule(self) -> None:
+        assert self._loop is not None
+        self._due = time.monotonic() + self.interval
+        self._handle = self._loop.call_at(self._loop.time() + self.interval, self._tick)
+
+    def _tick(self) -> None:
+        lag = max(0.0, time.monotonic() - self._due)
+        with self._lock:
+            self.histogram[bisect.bisect_left(LAG_BUCKETS, lag * 1000)] += 1
+            self.samples += 1
+            if lag > self.max_lag:
+                self.max_lag = lag
+            stall, self._stall = self._stall, None
+            if stall is not None:
+                stall["lag"] = lag
+        if stall is not None:
+            logger.warning("The event loop was stalled for %.0f ms", lag * 1000)
+        self._schedule()
+
+    def _watch(self) -> None:
+        """Look for stalls of the loop, from the helper thread"""
+        while not self._stopped.wait(min(self.interval, self.threshold or self.interval)):
+            threshold = self.threshold
+            if threshold is None or self._stall is not None:
+                continue
+            late = time.monotonic() - self._due
+            if late >= threshold:
+                self._report_stall(late)
+
+    def _report_stall(self, late: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        event = None
+        if self.describe_event is not None:
+            try:
+                event = self.describe_event()
+            except Exception:
+                logger.exception("Could not describe the handled event")
+        stall = {"time": time.time(), "lag": late, "event": event, "stack": stack}
+        with self._lock:
+            if self._stall is not None or not self.running:
+                return
+            self._stall = stall
+            self.stall_count += 1
+            self.stalls.append(stall)
+        logger.warning(
+            "The event loop has been stalled for %.0f ms (handling: %s), at:\n%s",
+            late * 1000,
+            event,
+            stack,
+        )
+
+    def info(self) -> dict[str, Any]:
+        """The lag histogram and the latest stalls"""
+        with self._lock:
+            bounds: list[int | None] = [*LAG_BUCKETS, None]
+            return {
+                "running": self.running,
+                "interval": self.interval,
+                "threshold": self.threshold,
+                "samples": self.samples,
+                "max": self.max_lag,
+                "histogram": [[bound, count] for bound, count in zip(bounds, self.histogram)],
+                "stall_count": self.stall_count,
+                "stalls": [dict(stall) for stall in self.stalls],
+            }
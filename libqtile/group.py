@@ -1,4 +1,8 @@
-from libqtile import hook, utils
+from collections.abc import Callable
+from operator import attrgetter
+from typing import Any
+
+from libqtile import hook, tracing, utils
 from libqtile.command.base import CommandObject, ItemT, expose_command
 from libqtile.log_utils import logger
 
@@ -12,6 +16,19 @@ class _Group(CommandObject):
     A group is identified by its name but displayed in GroupBox widget by its label.
     """
 
+    _cached_items = frozenset({"layout"})
+
+    # The keys of info() which can be read without building all of it
+    _info_getters: dict[str, Callable[[Any], Any]] = {
+        "name": attrgetter("name"),
+        "label": attrgetter("label"),
+        "focus": lambda group: group.current_window.name if group.current_window else None,
+        "windows": lambda group: [i.name for i in group.windows],
+        "layout": lambda group: group.layout.name,
+        "layouts": lambda group: [i.name for i in group.layouts],
+        "screen": lambda group: group.screen.index if group.screen else None,
+    }
+
     def __init__(self, name, layout=None, label=None, screen_affinity=None, persist=False):
         self.screen_affinity = screen_affinity
         self.name = name
@@ -107,25 +124,47 @@ class _Group(CommandObject):
     def use_previous_layout(self):
         self.use_layout((self.current_layout - 1) % (len(self.layouts)))
 
-    def layout_all(self, warp=False, focus=True):
+    def layout_all(self, warp=False, focus=True, sync=False):
         """Layout the floating layer, then the current layout.
 
+        The relayout is queued and run once the event loop is done with the
+        current callbacks, so that a burst of changes to the group lays it
+        out only once.
+
         Parameters
         ==========
         focus :
             If we have have a current_window give it focus, optionally moving warp
             to it.
+        sync :
+            Lay out the group now, for callers that need the new geometry of
+            the windows straight away.
         """
+        if not sync and self.qtile is not None:
+            self.qtile.queue_layout(self, warp, focus)
+            return
+        span = (
+            tracing.begin("layout_all", "layout", {"group": self.name})
+            if tracing.enabled
+            else None
+        )
         if self.screen and self.windows:
             with self.qtile.core.masked():
                 normal = [x for x in self.windows if not x.floating]
                 floating = [x for x in self.windows if x.floating and not x.minimized]
                 screen_rect = self.screen.get_rect()
                 if normal:
+                    layout_span = (
+                        tracing.begin("Layout.layout", "layout", {"layout": self.layout.name})
+                        if tracing.enabled
+                        else None
+                    )
                     try:
                         self.layout.layout(normal, screen_rect)
                     except Exception:
                         logger.exception("Exception in layout %s", self.layout.name)
+                    if layout_span is not None:
+                        tracing.end(layout_span)
                 if floating:
                     self.floating_layout.layout(floating, screen_rect)
                 if focus:
@@ -138,6 +177,8 @@ class _Group(CommandObject):
         elif self.screen and not self.windows and self.screen == self.qtile.current_screen:
             # Clear active window when switching to an empty group on the current screen
             self.qtile.core.clear_focus()
+        if span is not None:
+            tracing.end(span)
 
     def set_screen(self, screen, warp=True):
         """Set this group's screen to screen"""
@@ -147,7 +188,9 @@ class _Group(CommandObject):
         if self.screen:
             # move all floating guys offset to new screen
             self.floating_layout.to_screen(self, self.screen)
-            self.layout_all(warp=warp and self.qtile.config.cursor_warp)
+            # Not queued: the windows have to be placed before the screen's
+            # previous group is hidden, or the screen flashes empty
+            self.layout_all(warp=warp and self.qtile.config.cursor_warp, sync=True)
             screen_rect = self.screen.get_rect()
             self.floating_layout.show(screen_rect)
             self.layout.show(screen_rect)
@@ -1,7 +1,10 @@
 import asyncio
 import contextlib
+import functools
 import inspect
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Hashable
+from typing import Any
 
 from libqtile import backend, utils
 from libqtile.log_utils import logger
@@ -11,15 +14,110 @@ HookHandler = Callable[[Callable], Callable]
 
 subscriptions = {}  # type: dict
 
+# The coalesced subscribers of each registry and event
+coalescing: dict[str, dict[str, list["_Coalescer"]]] = {}
+
+# The window, in seconds, used when subscribing with coalesce=True
+DEFAULT_COALESCE = 0.05
+
+# Bumped whenever the subscriptions change, which invalidates the dispatch
+# tables built from them
+_generation = 0
+
+# How subscribers are called by Registry.fire
+_SYNC = 0
+_COROUTINE_FUNCTION = 1
+_COROUTINE = 2
+_COALESCED = 3
+
+# The calls, cumulative and maximum wall time, and exceptions of each
+# (hook, subscriber), recorded while stats_enabled is set
+stats_enabled = False
+_stats: dict[tuple[str, str], list] = {}
+
 
 def clear():
+    global _generation
     subscriptions.clear()
+    for registry in coalescing.values():
+        for coalescers in registry.values():
+            for coalescer in coalescers:
+                coalescer.cancel()
+    coalescing.clear()
+    _generation += 1
+
+
+def enable_stats(enabled: bool = True) -> None:
+    """Start or stop recording the hook subscriber statistics"""
+    global stats_enabled
+    stats_enabled = enabled
+
+
+def reset_stats() -> None:
+    _stats.clear()
+
+
+def get_stats() -> list[dict[str, Any]]:
+    """The recorded subscriber statistics, by descending cumulative time"""
+    return [
+        {
+            "hook": event,
+            "subscriber": name,
+            "calls": calls,
+            "total": total,
+            "max": longest,
+            "errors": errors,
+        }
+        for (event, name), (calls, total, longest, errors) in sorted(
+            _stats.items(), key=lambda item: item[1][1], reverse=True
+        )
+    ]
+
+
+def _subscriber_name(func: Any) -> str:
+    name = getattr(func, "__qualname__", None)
+    if name is None:
+        # e.g. functools.partial
+        name = getattr(getattr(func, "func", None), "__qualname__", type(func).__qualname__)
+    return str(name)
+
+
+def _record(key: tuple[str, str], elapsed: float, failed: bool) -> None:
+    entry = _stats.get(key)
+    if entry is None:
+        _stats[key] = [1, elapsed, elapsed, int(failed)]
+        return
+    entry[0] += 1
+    entry[1] += elapsed
+    if elapsed > entry[2]:
+        entry[2] = elapsed
+    if failed:
+        entry[3] += 1
+
+
+def _dispatch_kind(func: Any) -> int:
+    if inspect.iscoroutinefunction(func):
+        return _COROUTINE_FUNCTION
+    if asyncio.iscoroutine(func):
+        return _COROUTINE
+    return _SYNC
+
+
+def _fire_async_event(co, unsubscribe, record=None):
+    """
+    Run the coroutine of a subscriber, unsubscribing it if it returns True.
 
-
-def _fire_async_event(co, unsubscribe):
+    If record, a (hook, subscriber) key, is given, the time until the
+    coroutine completes is recorded under it.
+    """
     from libqtile.utils import create_task
 
+    start = time.perf_counter()
+
     def finish_task(task):
+        if record is not None:
+            failed = task.cancelled() or task.exception() is not None
+            _record(record, time.perf_counter() - start, failed)
         if task.result() is True:
             unsubscribe()
 
@@ -28,7 +126,14 @@ def _fire_async_event(co, unsubscribe):
         loop = asyncio.get_running_loop()
 
     if loop is None:
-        result = asyncio.run(co)
+        try:
+            result = asyncio.run(co)
+        except:  # noqa: E722
+            if record is not None:
+                _record(record, time.perf_counter() - start, True)
+            raise
+        if record is not None:
+            _record(record, time.perf_counter() - start, False)
         if result is True:
             unsubscribe()
     else:
@@ -36,6 +141,89 @@ def _fire_async_event(co, unsubscribe):
         task.add_done_callback(finish_task)
 
 
+class _Coalescer:
+    """
+    Collapses the calls of a subscriber made in a burst of fired hooks.
+
+    The first call for a key is made on the next loop iteration, with the
+    arguments of the latest fire by then. Any fires within the following
+    window are collapsed into a single call with their latest arguments at
+    the end of the window.
+    """
+
+    def __init__(
+        self,
+        event: str,
+        func: Callable,
+        window: float,
+        key: Callable[..., Hashable] | None,
+    ) -> None:
+        self.event = event
+        self.func = func
+        self.window = window
+        self.key = key
+        self.unsubscribe: Callable[[], None] | None = None
+        # The latest arguments not yet delivered (or None) and the pending
+        # timer of each key
+        self._pending: dict[Hashable, list[Any]] = {}
+
+    def fire(self, args: tuple, kwargs: dict) -> None:
+        key = None if self.key is None else self.key(*args, **kwargs)
+        entry = self._pending.get(key)
+        if entry is not None:
+            entry[0] = (args, kwargs)
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # There is no loop to defer to, e.g. before qtile has started
+            self._call(args, kwargs)
+            return
+
+        self._pending[key] = [(args, kwargs), loop.call_soon(self._deliver, key)]
+
+    def _deliver(self, key: Hashable) -> None:
+        entry = self._pending[key]
+        args, kwargs = entry[0]
+        if self.window > 0:
+            entry[0] = None
+            entry[1] = asyncio.get_running_loop().call_later(self.window, self._expire, key)
+        else:
+            del self._pending[key]
+        self._call(args, kwargs)
+
+    def _expire(self, key: Hashable) -> None:
+        if self._pending[key][0] is None:
+            del self._pending[key]
+        else:
+            self._deliver(key)
+
+    def _call(self, args: tuple, kwargs: dict) -> None:
+        unsubscribe = self.unsubscribe or (lambda: None)
+        record = (self.event, _subscriber_name(self.func)) if stats_enabled else None
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(self.func):
+                _fire_async_event(self.func(*args, **kwargs), unsubscribe, record)
+                return
+            result = self.func(*args, **kwargs)
+        except:  # noqa: E722
+            if record is not None:
+                _record(record, time.perf_counter() - start, True)
+            logger.exception("Error in hook %s", self.event)
+            return
+        if record is not None:
+            _record(record, time.perf_counter() - start, False)
+        if result is True:
+            unsubscribe()
+
+    def cancel(self) -> None:
+        for entry in self._pending.values():
+            entry[1].cancel()
+        self._pending.clear()
+
+
 # Custom hook functions receive a single argument, "self", which will refer to the
 # Subscribe/Unsubscribe classes.
 
@@ -58,11 +246,11 @@ def _suspend_func(self):
 
 def _user_hook_func(self):
     def wrapper(hook_name):
-        def f(func):
+        def f(func, **kwargs):
             name = f"user_{hook_name}"
             if name not in self.hooks:
                 self.hooks[name] = None
-            return self._subscribe(name, func)
+            return self._subscribe(name, func, **kwargs)
 
         return f
 
@@ -91,8 +279,12 @@ class HookHandlerCollection:
         return self.hooks[name]
 
     def _register(self, hook: Hook) -> None:
-        def _hook_func(func):
-            return self._subscribe(hook.name, func)
+        def _hook_func(func=None, **kwargs):
+            if func is None:
+                # Used as a decorator with options, e.g.
+                # @hook.subscribe.client_name_updated(coalesce=True)
+                return functools.partial(self._subscribe, hook.name, **kwargs)
+            return self._subscribe(hook.name, func, **kwargs)
 
         hooked = _hook_func if hook.func is None else hook.func(self)
         hooked.__doc__ = hook.doc
@@ -101,11 +293,40 @@ class HookHandlerCollection:
 
 
 class Subscribe(HookHandlerCollection):
-    def _subscribe(self, event: str, func: Callable) -> Callable:
+    def _subscribe(
+        self,
+        event: str,
+        func: Callable,
+        coalesce: float | bool | None = None,
+        coalesce_key: Callable[..., Hashable] | None = None,
+    ) -> Callable:
+        """
+        Subscribe func to the event.
+
+        Parameters
+        ----------
+        coalesce:
+            Collapse bursts of the event into a single call with the latest
+            arguments, made on the next loop iteration and then at most once
+            per this many seconds. ``True`` uses ``DEFAULT_COALESCE``.
+        coalesce_key:
+            Called with the arguments of the event to return the key bursts
+            are collapsed by, e.g. the window for per-window updates. By
+            default, all calls are collapsed together.
+        """
+        global _generation
         registry = subscriptions.setdefault(self.registry_name, dict())
         lst = registry.setdefault(event, [])
         if func not in lst:
+            if coalesce is not None and coalesce is not False:
+                if asyncio.iscoroutine(func):
+                    raise ValueError("Coroutine objects cannot be coalesced")
+                window = DEFAULT_COALESCE if coalesce is True else float(coalesce)
+                coalescing.setdefault(self.registry_name, {}).setdefault(event, []).append(
+                    _Coalescer(event, func, window, coalesce_key)
+                )
             lst.append(func)
+            _generation += 1
         return func
 
 
@@ -116,10 +337,18 @@ class Unsubscribe(HookHandlerCollection):
     """
 
     def _subscribe(self, event: str, func: Callable) -> None:
+        global _generation
         registry = subscriptions.setdefault(self.registry_name, dict())
         lst = registry.setdefault(event, [])
+        coalescers = coalescing.get(self.registry_name, {}).get(event, [])
+        for coalescer in coalescers:
+            if coalescer.func == func:
+                coalescer.cancel()
+                coalescers.remove(coalescer)
+                break
         try:
             lst.remove(func)
+            _generation += 1
         except ValueError:
             logger.warning(
                 f"Tried to unsubscribe a hook ({event}) that was not currently subscribed."
@@ -131,9 +360,23 @@ class Registry:
         self.name = name
         self.subscribe = Subscribe(name)
         self.unsubscribe = Unsubscribe(name, check_name=False)
+        # Listeners are called with the name and arguments of every fired
+        # event. Unlike subscriptions, they are kept when the config is reloaded.
+        self.listeners: list[Callable[[str, tuple], None]] = []
+        # The subscribers of each event with how they are called, along with
+        # the subscriptions and their generation the table was built from
+        self._dispatch: dict[str, tuple[list | None, int, tuple[tuple[Any, int], ...]]] = {}
         for hook in hooks:
             self.register_hook(hook)
 
+    def add_listener(self, listener: Callable[[str, tuple], None]) -> None:
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, tuple], None]) -> None:
+        with contextlib.suppress(ValueError):
+            self.listeners.remove(listener)
+
     def register_hook(self, hook: Hook) -> None:
         if hook.name in self.subscribe.hooks:
             raise utils.QtileError(
@@ -144,12 +387,70 @@ class Registry:
         self.subscribe._register(hook)
         self.unsubscribe._register(hook)
 
+    def _dispatch_table(self, event: str) -> tuple[tuple[Any, int], ...]:
+        """The subscribers of the event, classified by how they are called"""
+        lst = subscriptions[self.name].get(event)
+        cached = self._dispatch.get(event)
+        # the lists can also be replaced or deleted from outside of the registry
+        if cached is not None and cached[0] is lst and cached[1] == _generation:
+            return cached[2]
+        coalescers = coalescing.get(self.name, {}).get(event)
+        entries: list[tuple[Any, int]] = []
+        for func in lst or ():
+            for coalescer in coalescers or ():
+                if coalescer.func == func:
+                    coalescer.unsubscribe = functools.partial(self._unsubscribe, event, func)
+                    entries.append((coalescer, _COALESCED))
+                    break
+            else:
+                entries.append((func, _dispatch_kind(func)))
+        table = tuple(entries)
+        self._dispatch[event] = (lst, _generation, table)
+        return table
+
+    def _unsubscribe(self, event: str, func: Callable) -> None:
+        getattr(self.unsubscribe, event)(func)
+
+    def _fire_recorded(
+        self, event: str, table: tuple[tuple[Any, int], ...], args: tuple, kwargs: dict
+    ) -> list[Callable] | None:
+        """Call the subscribers as fire does, recording their statistics"""
+        to_unsubscribe: list[Callable] | None = None
+        for func, kind in table:
+            if kind == _COALESCED:
+                # recorded when the call is actually made
+                func.fire(args, kwargs)
+                continue
+            record = (event, _subscriber_name(func))
+            start = time.perf_counter()
+            try:
+                if kind == _SYNC:
+                    result = func(*args, **kwargs)
+                    _record(record, time.perf_counter() - start, False)
+                    if result is True:
+                        if to_unsubscribe is None:
+                            to_unsubscribe = [func]
+                        else:
+                            to_unsubscribe.append(func)
+                else:
+                    co = func(*args, **kwargs) if kind == _COROUTINE_FUNCTION else func
+                    _fire_async_event(
+                        co, functools.partial(self._unsubscribe, event, func), record
+                    )
+            except:  # noqa: E722
+                if kind == _SYNC:
+                    _record(record, time.perf_counter() - start, True)
+                logger.exception("Error in hook %s", event)
+        return to_unsubscribe
+
     def fire(self, event, *args, **kwargs):
         if event not in self.subscribe.hooks:
             raise utils.QtileError(f"Unknown event: {event}")
         # Do not fire for Internal windows
-        if any(isinstance(arg, backend.base.window.Internal) for arg in args):
-            return
+        internal = backend.base.window.Internal
+        for arg in args:
+            if isinstance(arg, internal):
+                return
         # We should check if the registry name is in the subscriptions dict
         # A name can disappear if the config is reloaded (which clears subscriptions)
         # but there are no hook subscriptions. This is not an issue for qtile core but
@@ -157,31 +458,44 @@ class Registry:
         if self.name not in subscriptions:
             subscriptions[self.name] = dict()
 
-        # Handlers for transient hooks
-        def unsubscribe_func(event, func):
-            def _wrapper():
-                getattr(self.unsubscribe, event)(func)
-
-            return _wrapper
-
-        to_unsubscribe = []
-
-        for i in subscriptions[self.name].get(event, []):
+        table = self._dispatch_table(event)
+        if stats_enabled:
+            to_unsubscribe = self._fire_recorded(event, table, args, kwargs)
+        else:
+            # Transient sync subscribers are only unsubscribed once all have
+            # been called
+            to_unsubscribe = None
+
+            for func, kind in table:
+                try:
+                    if kind == _SYNC:
+                        if func(*args, **kwargs) is True:
+                            if to_unsubscribe is None:
+                                to_unsubscribe = [func]
+                            else:
+                                to_unsubscribe.append(func)
+                    elif kind == _COALESCED:
+                        func.fire(args, kwargs)
+                    elif kind == _COROUTINE_FUNCTION:
+                        _fire_async_event(
+                            func(*args, **kwargs),
+                            functools.partial(self._unsubscribe, event, func),
+                        )
+                    else:
+                        _fire_async_event(func, functools.partial(self._unsubscribe, event, func))
+
+                except:  # noqa: E722
+                    logger.exception("Error in hook %s", event)
+
+        if to_unsubscribe is not None:
+            for func in to_unsubscribe:
+                self._unsubscribe(event, func)
+
+        for listener in self.listeners:
             try:
-                if inspect.iscoroutinefunction(i):
-                    _fire_async_event(i(*args, **kwargs), unsubscribe_func(event, i))
-                elif asyncio.iscoroutine(i):
-                    _fire_async_event(i, unsubscribe_func(event, i))
-                else:
-                    result = i(*args, **kwargs)
-                    if result is True:
-                        to_unsubscribe.append(unsubscribe_func(event, i))
-
+                listener(event, args)
             except:  # noqa: E722
-                logger.exception("Error in hook %s", event)
-
-        for f in to_unsubscribe:
-            f()
+                logger.exception("Error in hook listener for %s", event)
 
 
 hooks: list[Hook] = [
@@ -14,7 +14,7 @@ class QshKernel(Kernel):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         socket_path = ipc.find_sockfile()
-        ipc_client = ipc.Client(socket_path)
+        ipc_client = ipc.Client(socket_path, persistent=True)
         cmd_object = command.interface.IPCCommandInterface(ipc_client)
         self.qsh = sh.QSh(cmd_object)
 
@@ -3,16 +3,38 @@ A simple IPC mechanism for communicating between two local processes. We
 use marshal to serialize data - this means that both client and server must
 run the same Python version, and that clients must be trusted (as
 un-marshalling untrusted data can result in arbitrary code execution).
+Clients may also use json or, over persistent connections and if msgpack is
+installed, msgpack, which do not depend on the Python version.
+
+Two connection modes are supported. In the one-shot mode, the client sends a
+single message, half-closes the socket and reads the reply until EOF. In the
+persistent mode, the client opens the connection with a handshake and then
+exchanges length-prefixed frames tagged with a request id, so that a single
+connection can carry many (and possibly pipelined) requests.
+
+A persistent connection can also subscribe to the hooks fired by the server,
+which are then pushed to the client as frames tagged with the id of the
+subscribe request.
 """
 
 import asyncio
+import collections
 import fcntl
 import json
 import marshal
 import os.path
+import select
 import socket
 import struct
-from typing import Any, Self
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Literal, Self
+
+try:
+    import msgpack
+
+    has_msgpack = True
+except ImportError:
+    has_msgpack = False
 
 from libqtile.log_utils import logger
 from libqtile.utils import get_cache_dir
@@ -20,6 +42,29 @@ from libqtile.utils import get_cache_dir
 HDRFORMAT = "!L"
 HDRLEN = struct.calcsize(HDRFORMAT)
 
+# Persistent connections start with MAGIC, the protocol version and a byte
+# naming the codec the client would like to use, and the server acknowledges
+# with the codec it will use. The first byte can never start a one-shot
+# message: it is neither valid json nor the high byte of the size of a sane
+# marshal message.
+MAGIC = b"QIPC"
+PROTOCOL_VERSION = 1
+CODEC_MARSHAL = b"m"
+CODEC_JSON = b"j"
+CODEC_MSGPACK = b"b"
+CODECS = (CODEC_MARSHAL, CODEC_JSON, CODEC_MSGPACK)
+HANDSHAKELEN = len(MAGIC) + 2
+
+# Each frame is prefixed with the request id and the payload size
+FRAMEFORMAT = "!LL"
+FRAMELEN = struct.calcsize(FRAMEFORMAT)
+
+# Tag of the message subscribing a persistent connection to hook events
+SUBSCRIBE = "subscribe"
+OverflowPolicy = Literal["drop_oldest", "drop_newest", "disconnect"]
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+DEFAULT_QUEUE_SIZE = 256
+
 SOCKBASE = "qtilesocket.%s"
 
 
@@ -27,6 +72,10 @@ class IPCError(Exception):
     pass
 
 
+class _HandshakeError(IPCError):
+    """The server does not accept persistent connections"""
+
+
 def find_sockfile(display: str | None = None):
     """
     Finds the appropriate socket file for the given display.
@@ -78,8 +127,10 @@ class _IPC:
         data: bytes
             The incoming message to unpack
         is_json: bool | None
-            If the message should be unpacked as json.  By default, try to
-            unpack json and fallback gracefully to marshalled bytes.
+            If the message should be unpacked as json.  By default, unpack
+            marshalled bytes if the message starts with their size header, and
+            otherwise try to unpack json and fallback gracefully to marshalled
+            bytes.
 
         Returns
         -------
@@ -88,6 +139,11 @@ class _IPC:
             message was deserialized using json.  If True, the return message
             should be packed as json.
         """
+        # the size header of any message under 16MB starts with a null byte,
+        # which can never start a json message
+        if is_json is None and data[:1] == b"\x00":
+            is_json = False
+
         if is_json is None or is_json:
             try:
                 return json.loads(data.decode()), True
@@ -114,6 +170,65 @@ class _IPC:
         size = struct.pack(HDRFORMAT, len(msg_bytes))
         return size + msg_bytes
 
+    @staticmethod
+    def codec(is_json: bool) -> bytes:
+        """The preferred codec of a client"""
+        if is_json:
+            return CODEC_JSON
+        return CODEC_MSGPACK if has_msgpack else CODEC_MARSHAL
+
+    @staticmethod
+    def loads(data: bytes, *, codec: bytes) -> Any:
+        """Decode the payload of a frame sent over a persistent connection"""
+        try:
+            if codec == CODEC_MSGPACK:
+                return msgpack.unpackb(data, strict_map_key=False)
+            if codec == CODEC_JSON:
+                return json.loads(data.decode())
+            return marshal.loads(data)
+        except _DECODE_ERRORS as e:
+            raise IPCError("Unable to decode frame") from e
+
+    @staticmethod
+    def dumps(msg: Any, *, codec: bytes) -> bytes:
+        """Encode the payload of a frame sent over a persistent connection"""
+        if codec == CODEC_MSGPACK:
+            return msgpack.packb(msg, default=_IPC._msgpack_encoder)
+        if codec == CODEC_JSON:
+            return json.dumps(msg, default=_IPC._json_encoder).encode()
+        return marshal.dumps(msg)
+
+    @staticmethod
+    def frame(request_id: int, payload: bytes) -> bytes:
+        """Prefix the payload with the frame header"""
+        return struct.pack(FRAMEFORMAT, request_id, len(payload)) + payload
+
+    @staticmethod
+    def handshake(codec: bytes) -> bytes:
+        """Build the handshake that opens a persistent connection"""
+        return MAGIC + bytes([PROTOCOL_VERSION]) + codec
+
+    @staticmethod
+    def negotiated_codec(codec: bytes, ack: bytes) -> bytes:
+        """Check the server's acknowledgement of the handshake, returning the codec to use
+
+        The server may only replace msgpack, which it may not have installed,
+        with marshal.
+        """
+        if ack[:-1] != _IPC.handshake(codec)[:-1]:
+            raise _HandshakeError("Server does not support persistent connections")
+        accepted = ack[-1:]
+        if accepted != codec and (codec, accepted) != (CODEC_MSGPACK, CODEC_MARSHAL):
+            raise _HandshakeError("Server does not support the requested codec")
+        return accepted
+
+    @staticmethod
+    def _msgpack_encoder(field: Any) -> Any:
+        """Convert non-serializable types to ones understood by msgpack"""
+        if isinstance(field, set):
+            return list(field)
+        raise TypeError(f"Tried to msgpack serialize unsupported type {type(field)}: {field}")
+
     @staticmethod
     def _json_encoder(field: Any) -> Any:
         """Convert non-serializable types to ones understood by stdlib json module"""
@@ -122,8 +237,224 @@ class _IPC:
         raise ValueError(f"Tried to JSON serialize unsupported type {type(field)}: {field}")
 
 
+_DECODE_ERRORS: tuple[type[Exception], ...] = (ValueError, EOFError, TypeError)
+if has_msgpack:
+    _DECODE_ERRORS += (msgpack.UnpackException,)
+
+
+class _Connection:
+    """A blocking, persistent connection to the IPC server
+
+    Requests are tagged with an id, so several of them can be submitted before
+    any reply is collected.
+    """
+
+    def __init__(self, socket_path: str, codec: bytes) -> None:
+        self._next_id = 1
+        self._replies: dict[int, Any] = {}
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM, 0)
+        self.sock.settimeout(3)
+        try:
+            self.sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            self.sock.close()
+            raise IPCError(f"Could not open {socket_path}")
+
+        try:
+            self.sock.sendall(_IPC.handshake(codec))
+            self.codec = _IPC.negotiated_codec(codec, self._recv_exactly(HANDSHAKELEN))
+        except _HandshakeError:
+            self.sock.close()
+            raise
+        except (OSError, IPCError):
+            self.sock.close()
+            raise _HandshakeError("Server does not support persistent connections")
+        self.sock.settimeout(10)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the connection has been closed, by either end"""
+        if self.sock.fileno() == -1:
+            return True
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            # the server never writes unprompted, so readable means EOF
+            return bool(readable) and self.sock.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
+
+    def _recv_exactly(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise IPCError("Connection closed by server")
+            data += chunk
+        return bytes(data)
+
+    def submit(self, msg: Any) -> int:
+        """Send the message without waiting for the reply, returning its id"""
+        request_id = self._next_id
+        self._next_id = (self._next_id % 0xFFFFFFFF) + 1
+        try:
+            self.sock.sendall(_IPC.frame(request_id, _IPC.dumps(msg, codec=self.codec)))
+        except OSError as e:
+            self.close()
+            raise IPCError("Connection to server lost") from e
+        return request_id
+
+    def result(self, request_id: int) -> Any:
+        """Wait for and return the reply to the given request"""
+        try:
+            while request_id not in self._replies:
+                reply_id, size = struct.unpack(FRAMEFORMAT, self._recv_exactly(FRAMELEN))
+                self._replies[reply_id] = _IPC.loads(self._recv_exactly(size), codec=self.codec)
+        except TimeoutError:
+            # a late reply would be read as the reply to the next request
+            self.close()
+            raise IPCError("Server not responding")
+        except (OSError, IPCError) as e:
+            self.close()
+            raise IPCError("Connection to server lost") from e
+        return self._replies.pop(request_id)
+
+    def send(self, msg: Any) -> Any:
+        return self.result(self.submit(msg))
+
+    def stream(self, msg: Any) -> Iterator[Any]:
+        """Send the message and yield every frame sent back for it"""
+        request_id = self.submit(msg)
+        self.sock.settimeout(None)
+        while True:
+            yield self.result(request_id)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class _AsyncConnection:
+    """A persistent connection to the IPC server, bound to an event loop
+
+    Replies are dispatched to the waiting callers by their request id, so any
+    number of requests can be in flight at the same time.
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, codec: bytes
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.codec = codec
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+        self._next_id = 1
+        self._pending: dict[int, asyncio.Future] = {}
+        self._streams: dict[int, asyncio.Queue] = {}
+        self._reader_task = self.loop.create_task(self._read_replies())
+
+    @classmethod
+    async def open(cls, socket_path: str, codec: bytes) -> Self:
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(path=socket_path), timeout=3
+            )
+        except (ConnectionRefusedError, FileNotFoundError):
+            raise IPCError(f"Could not open {socket_path}")
+
+        try:
+            writer.write(_IPC.handshake(codec))
+            ack = await asyncio.wait_for(reader.readexactly(HANDSHAKELEN), timeout=3)
+            codec = _IPC.negotiated_codec(codec, ack)
+        except _HandshakeError:
+            writer.close()
+            raise
+        except (OSError, TimeoutError, asyncio.IncompleteReadError, IPCError):
+            writer.close()
+            raise _HandshakeError("Server does not support persistent connections")
+
+        return cls(reader, writer, codec)
+
+    async def _read_replies(self) -> None:
+        try:
+            while True:
+                header = await self.reader.readexactly(FRAMELEN)
+                request_id, size = struct.unpack(FRAMEFORMAT, header)
+                data = _IPC.loads(await self.reader.readexactly(size), codec=self.codec)
+                if request_id in self._streams:
+                    self._streams[request_id].put_nowait(data)
+                    continue
+                future = self._pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(data)
+        except (OSError, asyncio.IncompleteReadError, IPCError):
+            pass
+        finally:
+            self.closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(IPCError("Connection to server lost"))
+            self._pending.clear()
+            for queue in self._streams.values():
+                queue.put_nowait(None)
+
+    def _request_id(self) -> int:
+        request_id = self._next_id
+        self._next_id = (self._next_id % 0xFFFFFFFF) + 1
+        return request_id
+
+    async def stream(self, msg: Any) -> AsyncIterator[Any]:
+        """Send the message and yield every frame sent back for it"""
+        if self.closed:
+            raise IPCError("Connection to server lost")
+
+        request_id = self._request_id()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._streams[request_id] = queue
+        try:
+            self.writer.write(_IPC.frame(request_id, _IPC.dumps(msg, codec=self.codec)))
+            await self.writer.drain()
+            while True:
+                data = await queue.get()
+                # None is put on the queue when the connection is lost
+                if data is None and self.closed:
+                    raise IPCError("Connection to server lost")
+                yield data
+        except OSError as e:
+            raise IPCError("Connection to server lost") from e
+        finally:
+            self._streams.pop(request_id, None)
+
+    async def send(self, msg: Any) -> Any:
+        if self.closed:
+            raise IPCError("Connection to server lost")
+
+        request_id = self._request_id()
+        future = self.loop.create_future()
+        self._pending[request_id] = future
+        try:
+            self.writer.write(_IPC.frame(request_id, _IPC.dumps(msg, codec=self.codec)))
+            await self.writer.drain()
+            return await asyncio.wait_for(future, timeout=10)
+        except TimeoutError:
+            raise IPCError("Server not responding")
+        except OSError as e:
+            raise IPCError("Connection to server lost") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self) -> None:
+        self.closed = True
+        self._reader_task.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+
 class Client:
-    def __init__(self, socket_path: str, is_json=False) -> None:
+    def __init__(self, socket_path: str, is_json=False, persistent=False) -> None:
         """Create a new IPC client
 
         Parameters
@@ -132,10 +463,27 @@ class Client:
             The file path to the file that is used to open the connection to
             the running IPC server.
         is_json: bool
-            Pack and unpack messages as json
+            Pack and unpack messages as json. Otherwise, persistent
+            connections use msgpack if it is installed on both ends, and
+            marshal if not.
+        persistent: bool
+            Keep the connection to the server open and reuse it for all
+            messages, instead of opening a new connection for each message.
+            Falls back to one connection per message if the server does not
+            support persistent connections.
         """
         self.socket_path = socket_path
         self.is_json = is_json
+        self.persistent = persistent
+        self.codec = _IPC.codec(is_json)
+        self._connection: _Connection | None = None
+        self._async_connection: asyncio.Task[_AsyncConnection | None] | None = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, _exc_type, _exc_value, _tb) -> None:
+        self.close()
 
     def call(self, data: Any) -> Any:
         return self.send(data)
@@ -146,14 +494,52 @@ class Client:
         If any exception is raised by the server, that will propogate out of
         this call.
         """
+        if self.persistent:
+            connection = self._get_connection()
+            if connection is not None:
+                return connection.send(msg)
         return asyncio.run(self.async_send(msg))
 
+    def _get_connection(self) -> _Connection | None:
+        """Get the persistent connection, (re)connecting if required"""
+        if self._connection is None or self._connection.closed:
+            try:
+                self._connection = _Connection(self.socket_path, self.codec)
+            except _HandshakeError:
+                logger.debug("Persistent connection refused, falling back to one-shot")
+                self.persistent = False
+                self._connection = None
+        return self._connection
+
+    async def _get_async_connection(self) -> _AsyncConnection | None:
+        """Get the persistent connection for the running loop, (re)connecting if required"""
+        task = self._async_connection
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = self._async_connection = asyncio.create_task(self._async_connect())
+        elif task.done() and (task.exception() or task.result().closed):  # type: ignore[union-attr]
+            task = self._async_connection = asyncio.create_task(self._async_connect())
+        # concurrent callers share the same connection attempt
+        return await asyncio.shield(task)
+
+    async def _async_connect(self) -> _AsyncConnection | None:
+        try:
+            return await _AsyncConnection.open(self.socket_path, self.codec)
+        except _HandshakeError:
+            logger.debug("Persistent connection refused, falling back to one-shot")
+            self.persistent = False
+            return None
+
     async def async_send(self, msg: Any) -> Any:
         """Send the message to the server
 
         Connect to the server, then pack and send the message to the server,
         then wait for and return the response from the server.
         """
+        if self.persistent:
+            connection = await self._get_async_connection()
+            if connection is not None:
+                return await connection.send(msg)
+
         try:
             reader, writer = await asyncio.wait_for(
                 asyncio.open_unix_connection(path=self.socket_path), timeout=3
@@ -178,12 +564,180 @@ class Client:
 
         return data
 
+    def subscribe(
+        self,
+        hooks: list[str] | None = None,
+        *,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        overflow: OverflowPolicy = "drop_oldest",
+    ) -> Iterator[dict[str, Any]]:
+        """Subscribe to the hooks fired by the server
+
+        A dedicated connection is opened for the subscription, which is in
+        place when this returns. The returned iterator yields the events as
+        they are fired, and closes the connection when it is closed. Each
+        event is a dict with the name of the hook (``event``), a summary of
+        its arguments (``args``) and the number of events that were dropped
+        since the previous one was sent (``dropped``).
+
+        Parameters
+        ----------
+        hooks: list[str] | None
+            The names of the hooks to subscribe to, or None for all of them.
+        queue_size: int
+            The number of events the server queues for this client when it
+            does not keep up.
+        overflow: str
+            What the server does when the queue is full: drop the oldest
+            queued event (``"drop_oldest"``), drop the new event
+            (``"drop_newest"``), or close the connection (``"disconnect"``).
+        """
+        connection = _Connection(self.socket_path, self.codec)
+        try:
+            events = connection.stream(_subscribe_message(hooks, queue_size, overflow))
+            _check_subscribed(next(events))
+        except BaseException:
+            connection.close()
+            raise
+
+        def iterate() -> Iterator[dict[str, Any]]:
+            try:
+                yield from events
+            finally:
+                connection.close()
+
+        return iterate()
+
+    async def async_subscribe(
+        self,
+        hooks: list[str] | None = None,
+        *,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        overflow: OverflowPolicy = "drop_oldest",
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Subscribe to the hooks fired by the server
+
+        See ``subscribe()``.
+        """
+        connection = await _AsyncConnection.open(self.socket_path, self.codec)
+        try:
+            events = connection.stream(_subscribe_message(hooks, queue_size, overflow))
+            _check_subscribed(await anext(events))
+        except BaseException:
+            await connection.close()
+            raise
+
+        async def iterate() -> AsyncIterator[dict[str, Any]]:
+            try:
+                async for event in events:
+                    yield event
+            finally:
+                await connection.close()
+
+        return iterate()
+
+    def close(self) -> None:
+        """Close the persistent connection, if any"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def async_close(self) -> None:
+        """Close the persistent connections, if any"""
+        self.close()
+        task, self._async_connection = self._async_connection, None
+        if task is not None and task.done() and not task.exception():
+            connection = task.result()
+            if connection is not None:
+                await connection.close()
+
+
+def _subscribe_message(
+    hooks: list[str] | None, queue_size: int, overflow: OverflowPolicy
+) -> tuple[str, list[str] | None, dict[str, Any]]:
+    return SUBSCRIBE, hooks, {"queue_size": queue_size, "overflow": overflow}
+
+
+def _check_subscribed(reply: Any) -> None:
+    """Check the server's reply to a subscribe message"""
+    if not isinstance(reply, dict) or "error" in reply:
+        error = reply.get("error") if isinstance(reply, dict) else reply
+        raise IPCError(f"Unable to subscribe: {error}")
+
+
+class _Subscription:
+    """The hooks a persistent connection subscribed to, and the events queued for it"""
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        request_id: int,
+        codec: bytes,
+        hooks: list[str] | None,
+        queue_size: int,
+        overflow: OverflowPolicy,
+    ) -> None:
+        self.writer = writer
+        self.request_id = request_id
+        self.codec = codec
+        self.hooks = None if hooks is None else set(hooks)
+        self.overflow = overflow
+        self.queue: collections.deque[dict[str, Any]] = collections.deque()
+        self.queue_size = queue_size
+        self.dropped = 0
+        # Set once the subscriber is disconnected, until the server drops it
+        self.closed = False
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._send_events())
+
+    def wants(self, event: str) -> bool:
+        return not self.closed and (self.hooks is None or event in self.hooks)
+
+    def put(self, event: str, args: list[Any]) -> None:
+        """Queue the event, never blocking the caller"""
+        if self.closed:
+            return
+        if len(self.queue) >= self.queue_size:
+            self.dropped += 1
+            if self.overflow == "disconnect":
+                logger.warning("Hook subscriber is not keeping up, closing connection")
+                self.writer.close()
+                self.close()
+                return
+            if self.overflow == "drop_newest":
+                return
+            self.queue.popleft()
+        self.queue.append({"event": event, "args": args})
+        self._ready.set()
+
+    async def _send_events(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while self.queue:
+                    event = self.queue.popleft()
+                    event["dropped"], self.dropped = self.dropped, 0
+                    payload = _IPC.dumps(event, codec=self.codec)
+                    self.writer.write(_IPC.frame(self.request_id, payload))
+                    # only this subscriber waits for a slow reader
+                    await self.writer.drain()
+        except ConnectionError:
+            logger.debug("Hook subscriber disconnected")
+
+    def close(self) -> None:
+        self.closed = True
+        self.queue.clear()
+        self._task.cancel()
+
 
 class Server:
     def __init__(self, socket_path: str, handler) -> None:
         self.socket_path = socket_path
         self.handler = handler
         self.server = None  # type: asyncio.AbstractServer | None
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._subscriptions: list[_Subscription] = []
 
         if os.path.exists(socket_path):
             os.unlink(socket_path)
@@ -203,11 +757,22 @@ class Server:
         """Callback when a connection is made to the server
 
         Read the data sent from the client, execute the requested command, and
-        send the reply back to the client.
+        send the reply back to the client. If the client opens the connection
+        with the persistent connection handshake, keep serving its requests
+        until it disconnects.
         """
         try:
             logger.debug("Connection made to server")
-            data = await reader.read()
+            try:
+                prefix = await reader.readexactly(len(MAGIC))
+            except asyncio.IncompleteReadError as e:
+                prefix = e.partial
+
+            if prefix == MAGIC:
+                await self._serve_persistent(reader, writer)
+                return
+
+            data = prefix + await reader.read()
             logger.debug("EOF received by server")
 
             req, is_json = _IPC.unpack(data)
@@ -226,6 +791,89 @@ class Server:
             writer.close()
             await writer.wait_closed()
 
+    async def _serve_persistent(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve framed requests until the client closes the connection"""
+        try:
+            version, requested = await reader.readexactly(2)
+        except asyncio.IncompleteReadError:
+            return
+        codec = bytes([requested])
+        if version != PROTOCOL_VERSION or codec not in CODECS:
+            logger.warning("Unsupported persistent connection requested, closing connection")
+            return
+        if codec == CODEC_MSGPACK and not has_msgpack:
+            codec = CODEC_MARSHAL
+
+        writer.write(_IPC.handshake(codec))
+        self._connections.add(writer)
+        logger.debug("Persistent connection established")
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(FRAMELEN)
+                    request_id, size = struct.unpack(FRAMEFORMAT, header)
+                    req = _IPC.loads(await reader.readexactly(size), codec=codec)
+                except asyncio.IncompleteReadError:
+                    logger.debug("Persistent connection closed by client")
+                    break
+                except IPCError:
+                    logger.warning("Invalid data received, closing connection")
+                    break
+
+                if isinstance(req, list | tuple) and req and req[0] == SUBSCRIBE:
+                    rep = self._subscribe(writer, request_id, codec, req)
+                else:
+                    rep = self.handler(req)
+
+                writer.write(_IPC.frame(request_id, _IPC.dumps(rep, codec=codec)))
+                await writer.drain()
+        except ConnectionError:
+            logger.debug("Persistent connection lost")
+        finally:
+            self._connections.discard(writer)
+            for subscription in [s for s in self._subscriptions if s.writer is writer]:
+                subscription.close()
+                self._subscriptions.remove(subscription)
+
+    def _subscribe(
+        self, writer: asyncio.StreamWriter, request_id: int, codec: bytes, req: Any
+    ) -> dict[str, Any]:
+        """Subscribe the connection to the given hooks, returning the reply"""
+        try:
+            _, hooks, options = req
+            queue_size = int(options.get("queue_size", DEFAULT_QUEUE_SIZE))
+            overflow = options.get("overflow", "drop_oldest")
+            if hooks is not None and not all(isinstance(h, str) for h in hooks):
+                raise ValueError("hooks must be a list of hook names")
+            if queue_size < 1:
+                raise ValueError("queue_size must be positive")
+            if overflow not in OVERFLOW_POLICIES:
+                raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}")
+        except (ValueError, TypeError, AttributeError) as e:
+            return {"error": str(e)}
+
+        self._subscriptions.append(
+            _Subscription(writer, request_id, codec, hooks, queue_size, overflow)
+        )
+        logger.debug("Subscription to hooks: %s", hooks or "all")
+        return {"hooks": hooks, "queue_size": queue_size, "overflow": overflow}
+
+    def is_subscribed(self, event: str) -> bool:
+        """Whether any client subscribed to the given hook"""
+        return any(subscription.wants(event) for subscription in self._subscriptions)
+
+    def publish(self, event: str, args: list[Any]) -> None:
+        """Queue the hook for the clients that subscribed to it
+
+        The arguments are sent to the clients as they are, so they must be
+        serializable with json.
+        """
+        for subscription in self._subscriptions:
+            if subscription.wants(event):
+                subscription.put(event, args)
+
     async def __aenter__(self) -> Self:
         """Start and return the server"""
         await self.start()
@@ -249,6 +897,12 @@ class Server:
 
         logger.debug("Stopping server on close")
         self.server.close()
+        # persistent connections would otherwise keep wait_closed() waiting
+        for subscription in self._subscriptions:
+            subscription.close()
+        self._subscriptions.clear()
+        for writer in list(self._connections):
+            writer.close()
         await self.server.wait_closed()
 
         self.server = None
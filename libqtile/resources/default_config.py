@@ -212,6 +212,10 @@ wl_xcursor_size = 24
 idle_timers = []  # type: list
 idle_inhibitors = []  # type: list
 
+# Log the stack of the event loop when it is stalled for longer than this many
+# seconds (None disables it)
+loop_lag_threshold = 0.25
+
 # XXX: Gasp! We're lying here. In fact, nobody really uses or cares about this
 # string besides java UI toolkits; you can see several discussions on the
 # mailing lists, GitHub issues, and other WM documentation that suggest setting
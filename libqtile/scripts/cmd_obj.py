@@ -7,13 +7,15 @@ This can be used standalone or in other shell scripts.
 import argparse
 import itertools
 import json
+import shlex
 import sys
 import textwrap
+from collections.abc import Iterable
 
 from libqtile.command.base import CommandError, CommandException, SelectError
 from libqtile.command.client import CommandClient
 from libqtile.command.graph import CommandGraphRoot
-from libqtile.command.interface import IPCCommandInterface
+from libqtile.command.interface import SUCCESS, IPCCommandInterface
 from libqtile.ipc import Client, find_sockfile
 
 
@@ -141,6 +143,32 @@ def run_function(
     return ret
 
 
+def run_batch(client: CommandClient, lines: Iterable[str]) -> None:
+    "Run the calls given one per line together, and print their results."
+    parser = argparse.ArgumentParser(prog="qtile cmd-obj --batch")
+    add_call_arguments(parser)
+
+    functions = []
+    with client.batch() as batch:
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            call = parser.parse_args(shlex.split(line))
+            run_function(get_object(batch, call.obj_spec), call.function, call.args, call.kwargs)
+            functions.append(call.function)
+
+    failed = False
+    for funcname, (status, ret) in zip(functions, batch.results):
+        if status != SUCCESS:
+            print(f"error: Command '{funcname}' returned error: {ret}")
+            failed = True
+        elif ret is not None:
+            print(json.dumps(ret, indent=2, default=set_to_list))
+    if failed:
+        sys.exit(1)
+
+
 def print_base_objects() -> None:
     """Prints access objects of Client, use cmd for commands."""
     root = CommandGraphRoot()
@@ -152,9 +180,14 @@ def print_base_objects() -> None:
 def cmd_obj(args) -> None:
     "Runs tool according to specified arguments."
 
-    if args.obj_spec:
+    if args.batch:
+        sock_file = args.socket or find_sockfile()
+        ipc_client = Client(sock_file, persistent=True)
+        cmd_client = CommandClient(IPCCommandInterface(ipc_client))
+        run_batch(cmd_client, sys.stdin)
+    elif args.obj_spec:
         sock_file = args.socket or find_sockfile()
-        ipc_client = Client(sock_file)
+        ipc_client = Client(sock_file, persistent=True)
         cmd_object = IPCCommandInterface(ipc_client)
         cmd_client = CommandClient(cmd_object)
         obj = get_object(cmd_client, args.obj_spec)
@@ -181,27 +214,8 @@ def cmd_obj(args) -> None:
         sys.exit(1)
 
 
-def add_subcommand(subparsers, parents):
-    epilog = textwrap.dedent(
-        """\
-    Examples:
-     qtile cmd-obj
-     qtile cmd-obj -o root # same as above
-     qtile cmd-obj -o root -f prev_layout -a 3 # prev_layout on group 3
-     qtile cmd-obj -o group 3 -f focus_back
-     qtile cmd-obj -o root -f restart # restart qtile
-    The graph traversal recurses:
-     qtile cmd-obj -o screen 0 bar bottom screen group window -f info
-     """
-    )
-    description = "Access the command interface from a shell."
-    parser = subparsers.add_parser(
-        "cmd-obj",
-        help=description,
-        parents=parents,
-        epilog=epilog,
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-    )
+def add_call_arguments(parser: argparse.ArgumentParser) -> None:
+    "Add the arguments describing a call to the parser."
     parser.add_argument(
         "--object",
         "-o",
@@ -225,6 +239,39 @@ def add_subcommand(subparsers, parents):
         action=KeyValDictAdd,
         help="Set keyword arguments as key=value pairs.",
     )
+
+
+def add_subcommand(subparsers, parents):
+    epilog = textwrap.dedent(
+        """\
+    Examples:
+     qtile cmd-obj
+     qtile cmd-obj -o root # same as above
+     qtile cmd-obj -o root -f prev_layout -a 3 # prev_layout on group 3
+     qtile cmd-obj -o group 3 -f focus_back
+     qtile cmd-obj -o root -f restart # restart qtile
+    The graph traversal recurses:
+     qtile cmd-obj -o screen 0 bar bottom screen group window -f info
+    Several calls can be executed together, one per line on stdin:
+     printf '%s\\n' '-o group b -f toscreen' '-f next_layout' | qtile cmd-obj --batch
+     """
+    )
+    description = "Access the command interface from a shell."
+    parser = subparsers.add_parser(
+        "cmd-obj",
+        help=description,
+        parents=parents,
+        epilog=epilog,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    add_call_arguments(parser)
+    parser.add_argument(
+        "--batch",
+        "-b",
+        action="store_true",
+        help="Read calls from stdin, one per line using the --object, --function, "
+        "--args and --kwargs arguments, and execute them together.",
+    )
     parser.add_argument(
         "--info",
         "-i",
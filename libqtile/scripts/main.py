@@ -9,6 +9,7 @@ from libqtile.scripts import (
     cmd_obj,
     launch,
     migrate,
+    profile,
     repl,
     run_cmd,
     shell,
@@ -53,6 +54,7 @@ def main():
     start.add_subcommand(subparsers, [parent_parser])
     shell.add_subcommand(subparsers, [parent_parser])
     top.add_subcommand(subparsers, [parent_parser])
+    profile.add_subcommand(subparsers, [parent_parser])
     run_cmd.add_subcommand(subparsers, [parent_parser])
     cmd_obj.add_subcommand(subparsers, [parent_parser])
     check.add_subcommand(subparsers, [parent_parser])
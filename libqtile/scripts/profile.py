@@ -0,0 +1,80 @@
+"""
+Sample what qtile is doing for a number of seconds
+"""
+
+import os
+import sys
+import time
+
+from libqtile import ipc
+from libqtile.command import client, interface
+from libqtile.command.base import CommandError
+
+
+def profile(opts):
+    if opts.socket is None:
+        socket = ipc.find_sockfile()
+    else:
+        socket = opts.socket
+    c = client.InteractiveCommandClient(
+        interface.IPCCommandInterface(
+            ipc.Client(socket, persistent=True),
+        ),
+    )
+    # the path is opened by qtile, which may have another working directory
+    path = os.path.abspath(opts.output) if opts.output else None
+
+    try:
+        c.profile_start(interval=opts.interval)
+    except CommandError as e:
+        print(f"Could not start the profiler: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        time.sleep(opts.seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        result = c.profile_stop(path=path)
+
+    print(
+        "Wrote {} samples over {:.1f}s to {}".format(
+            result["samples"], result["duration"], result["path"]
+        )
+    )
+
+
+def add_subcommand(subparsers, parents):
+    parser = subparsers.add_parser(
+        "profile",
+        parents=parents,
+        help="Sample the stack of qtile, for flame graphs.",
+    )
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        dest="seconds",
+        default=10,
+        help="How long to sample for (default: 10).",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        dest="interval",
+        default=0.005,
+        help="Time between samples, in seconds (default: 0.005).",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        dest="output",
+        default=None,
+        help="File to write the collapsed stacks to "
+        "(default: qtile_profile.folded in qtile's cache directory).",
+    )
+    parser.add_argument(
+        "-s", "--socket", type=str, dest="socket", help="Use specified socket for IPC."
+    )
+    parser.set_defaults(func=profile)
@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING
 
 import libqtile.backend
 from libqtile import confreader, pangocffi, qtile
+from libqtile.core.loop import EVENT_LOOPS
 from libqtile.log_utils import logger
 from libqtile.utils import VERSION, get_config_file
 
@@ -76,6 +77,7 @@ def make_qtile(options) -> Qtile | None:
         no_spawn=options.no_spawn,
         state=options.state,
         socket_path=options.socket,
+        event_loop=options.event_loop,
     )
 
 
@@ -153,4 +155,11 @@ def add_subcommand(subparsers, parents):
         choices=libqtile.backend.CORES.keys(),
         help="Use specified backend.",
     )
+    parser.add_argument(
+        "--loop",
+        default="asyncio",
+        dest="event_loop",
+        choices=EVENT_LOOPS,
+        help="Use the specified event loop implementation, if installed.",
+    )
     parser.set_defaults(func=start)
@@ -118,8 +118,81 @@ def raw_stats(c, group_by="lineno", limit=10):
     print(f"Total allocated size: {total / 1024.0:.1f} KiB")
 
 
+def format_hook_stat(index, stat):
+    return "{:<3} {:<24.24} {:<40.40} {:>8} {:>10.1f} {:>8.1f} {:>6}".format(
+        index,
+        stat["hook"],
+        stat["subscriber"],
+        stat["calls"],
+        stat["total"] * 1000,
+        stat["max"] * 1000,
+        stat["errors"],
+    )
+
+
+HOOK_STATS_HEADER = "{:<3} {:<24} {:<40} {:>8} {:>10} {:>8} {:>6}".format(
+    "#", "Hook", "Subscriber", "Calls", "Total ms", "Max ms", "Errors"
+)
+
+
+def get_hook_stats(scr, c, limit=10, seconds=1.5):
+    (max_y, max_x) = scr.getmaxyx()
+    while True:
+        stats = c.hook_stats()["stats"]
+        scr.addstr(0, 0, f"Qtile - Top {limit} hook subscribers")
+        scr.addstr(
+            1,
+            0,
+            HOOK_STATS_HEADER + " " * max(0, max_x - len(HOOK_STATS_HEADER) - 1),
+            curses.A_BOLD | curses.A_REVERSE,
+        )
+        for index, stat in enumerate(stats[:limit], 1):
+            scr.addstr(index + 1, 0, format_hook_stat(index, stat))
+
+        total = sum(stat["total"] for stat in stats) * 1000
+        scr.addstr(min(limit, len(stats)) + 3, 0, f"Total time: {total:.1f} ms", curses.A_BOLD)
+
+        scr.move(max_y - 2, max_y - 2)
+        scr.refresh()
+        time.sleep(seconds)
+        scr.erase()
+
+
+def raw_hook_stats(c, limit=10):
+    stats = c.hook_stats()["stats"]
+    print(f"Qtile - Top {limit} hook subscribers")
+    print(HOOK_STATS_HEADER)
+    for index, stat in enumerate(stats[:limit], 1):
+        print(format_hook_stat(index, stat))
+    total = sum(stat["total"] for stat in stats) * 1000
+    print(f"Total time: {total:.1f} ms")
+
+
+def top_hooks(c, opts):
+    # Unless it was already on, recording is only on while this is running
+    enabled = c.hook_stats()["enabled"]
+    if not enabled:
+        c.hook_stats(enable=True)
+    try:
+        if not opts.raw:
+            curses.wrapper(get_hook_stats, c, limit=opts.lines, seconds=opts.seconds)
+        else:
+            if not enabled:
+                # nothing has been recorded yet
+                time.sleep(opts.seconds)
+            raw_hook_stats(c, limit=opts.lines)
+    except KeyboardInterrupt:
+        sys.exit(1)
+    except curses.error:
+        print("Terminal too small for curses interface.")
+        raw_hook_stats(c, limit=opts.lines)
+    finally:
+        if not enabled:
+            c.hook_stats(enable=False)
+
+
 def top(opts):
-    if not ENABLED:
+    if not ENABLED and not opts.hooks:
         raise Exception("Could not import tracemalloc")
     lines = opts.lines
     seconds = opts.seconds
@@ -129,10 +202,14 @@ def top(opts):
         socket = opts.socket
     c = client.InteractiveCommandClient(
         interface.IPCCommandInterface(
-            ipc.Client(socket),
+            ipc.Client(socket, persistent=True),
         ),
     )
 
+    if opts.hooks:
+        top_hooks(c, opts)
+        return
+
     try:
         if not opts.raw:
             curses.wrapper(get_stats, c, limit=lines, seconds=seconds)
@@ -173,4 +250,11 @@ def add_subcommand(subparsers, parents):
     parser.add_argument(
         "-s", "--socket", type=str, dest="socket", help="Use specified socket for IPC."
     )
+    parser.add_argument(
+        "--hooks",
+        dest="hooks",
+        action="store_true",
+        default=False,
+        help="Show the time spent in hook subscribers instead of memory usage.",
+    )
     parser.set_defaults(func=top)
@@ -0,0 +1,75 @@
+"""
+Spans of what qtile does, from input events to drawing, for trace viewers
+
+Tracing is off by default. The call sites check :data:`enabled` before
+starting a span, so that it costs nothing else when off:
+
+.. code-block:: python
+
+    span = tracing.begin("layout_all", "layout") if tracing.enabled else None
+    ...
+    if span is not None:
+        tracing.end(span)
+
+The spans are exported in the Chrome trace event format, which can be
+opened in e.g. Perfetto (https://ui.perfetto.dev) or chrome://tracing.
+"""
+
+from __future__ import annotations
+
+import collections
+import json
+import os
+import time
+from typing import Any
+
+enabled = False
+
+# The complete ("X") trace events of the ended spans
+_events: collections.deque[dict[str, Any]] = collections.deque(maxlen=100_000)
+
+Span = tuple[str, str, dict[str, Any] | None, int]
+
+
+def start(max_events: int = 100_000) -> None:
+    """Start recording spans, dropping any recorded before"""
+    global enabled, _events
+    _events = collections.deque(maxlen=max_events)
+    enabled = True
+
+
+def stop() -> None:
+    global enabled
+    enabled = False
+
+
+def begin(name: str, category: str, args: dict[str, Any] | None = None) -> Span:
+    return name, category, args, time.perf_counter_ns()
+
+
+def end(span: Span) -> None:
+    name, category, args, started = span
+    event: dict[str, Any] = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": started / 1000,
+        "dur": (time.perf_counter_ns() - started) / 1000,
+        "pid": os.getpid(),
+        "tid": 1,
+    }
+    if args:
+        event["args"] = args
+    _events.append(event)
+
+
+def events() -> list[dict[str, Any]]:
+    return list(_events)
+
+
+def dump(path: str) -> int:
+    """Write the recorded spans as a Chrome trace JSON file, returning their number"""
+    recorded = events()
+    with open(path, "w") as f:
+        json.dump({"traceEvents": recorded, "displayTimeUnit": "ms"}, f)
+    return len(recorded)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import copy
+import functools
 import inspect
 import math
 import subprocess
@@ -202,11 +203,8 @@ class _Widget(CommandObject, configurable.Configurable):
         # Timers are added to futures list so they can be cancelled if the `finalize` method is
         # called before the timers have fired.
         if not self.configured:
-            timer = self.qtile.call_soon(self.timer_setup)
-            async_timer = self.qtile.call_soon(asyncio.create_task, self._config_async())
-
-            # Add these to our list of futures so they can be cancelled.
-            self._futures.extend([timer, async_timer])
+            self._schedule(self.qtile.call_soon, self.timer_setup)
+            self._schedule(self.qtile.call_soon, asyncio.create_task, self._config_async())
             if hasattr(self, "force_update"):
                 hook.subscribe.resume(self.force_update)
 
@@ -333,10 +331,26 @@ class _Widget(CommandObject, configurable.Configurable):
         if self.finalized:
             return
 
-        future = self.qtile.call_later(seconds, self._wrapper, method, *method_args)
+        return self._schedule(
+            functools.partial(self.qtile.call_later, seconds), self._wrapper, method, *method_args
+        )
+
+    def _schedule(self, schedule, callback, *args):
+        """
+        Schedule a callback with ``schedule`` (e.g. ``qtile.call_soon``),
+        keeping its handle in ``self._futures`` until it has run.
+        """
+
+        def run():
+            try:
+                self._futures.remove(handle)
+            except ValueError:
+                pass
+            callback(*args)
 
-        self._futures.append(future)
-        return future
+        handle = schedule(run)
+        self._futures.append(handle)
+        return handle
 
     def call_process(self, command, **kwargs):
         """
@@ -347,29 +361,8 @@ class _Widget(CommandObject, configurable.Configurable):
         return subprocess.check_output(command, **kwargs, encoding="utf-8")
 
     def _remove_dead_timers(self):
-        """Remove completed and cancelled timers from the list."""
-
-        def is_ready(timer):
-            return timer in self.qtile._eventloop._ready
-
-        self._futures = [
-            timer
-            for timer in self._futures
-            # Filter out certain handles...
-            if not (
-                timer.cancelled()
-                # Once a scheduled timer is ready to be run its _scheduled flag is set to False
-                # and it's added to the loop's `_ready` queue
-                or (
-                    isinstance(timer, asyncio.TimerHandle)
-                    and not timer._scheduled
-                    and not is_ready(timer)
-                )
-                # Callbacks scheduled via `call_soon` are put into the loop's `_ready` queue
-                # and are removed once they've been executed
-                or (isinstance(timer, asyncio.Handle) and not is_ready(timer))
-            )
-        ]
+        """Remove cancelled timers from the list, those that have run remove themselves."""
+        self._futures = [timer for timer in self._futures if not timer.cancelled()]
 
     def _wrapper(self, method, *method_args):
         self._remove_dead_timers()
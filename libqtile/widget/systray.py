@@ -58,6 +58,7 @@ class Icon(window._Window):
     def handle_DestroyNotify(self, event):  # noqa: N802
         wid = event.window
         icon = self.qtile.windows_map.pop(wid)
+        self.qtile.selector_cache.invalidate()
         self.systray.tray_icons.remove(icon)
         self.systray.bar.draw()
         return False
@@ -124,6 +125,7 @@ class Systray(base._Widget, window._Window):
         win = conn.create_window(-1, -1, 1, 1)
         window._Window.__init__(self, window.XWindow(conn, win.wid), qtile)
         qtile.windows_map[win.wid] = self
+        qtile.selector_cache.invalidate()
 
         # window._Window.__init__ overwrites the widget name so we need to restore it
         self.name = self._name
@@ -193,6 +195,7 @@ class Systray(base._Widget, window._Window):
                 self.tray_icons.append(icon)
                 self.tray_icons.sort(key=lambda icon: icon.name)
                 self.qtile.windows_map[wid] = icon
+                self.qtile.selector_cache.invalidate()
 
             self.conn.conn.core.ChangeSaveSet(SetMode.Insert, wid)
             self.conn.conn.core.ReparentWindow(wid, parent.wid, 0, 0)
@@ -264,6 +267,7 @@ class Systray(base._Widget, window._Window):
             self.hidden = True  # Usually set in self.hide()
 
         del self.qtile.windows_map[self.wid]
+        self.qtile.selector_cache.invalidate()
         Systray._instances -= 1
 
     def info(self):
@@ -408,7 +408,10 @@ class TaskList(base._Widget, base.PaddingMixin, base.MarginMixin):
         self.update(window)
 
     def setup_hooks(self):
-        hook.subscribe.client_name_updated(self.update)
+        # Some clients rename their windows many times a second
+        hook.subscribe.client_name_updated(
+            self.update, coalesce=True, coalesce_key=lambda window: window
+        )
         hook.subscribe.focus_change(self.update)
         hook.subscribe.float_change(self.update)
         hook.subscribe.client_urgent_hint_changed(self.update)
@@ -40,7 +40,8 @@ class WindowName(base._TextBox):
 
     def _configure(self, qtile, bar):
         base._TextBox._configure(self, qtile, bar)
-        hook.subscribe.client_name_updated(self.hook_response)
+        # Some clients rename their windows many times a second
+        hook.subscribe.client_name_updated(self.hook_response, coalesce=True)
         hook.subscribe.focus_change(self.hook_response)
         hook.subscribe.float_change(self.hook_response)
         hook.subscribe.current_screen_change(self.hook_response_current_screen)
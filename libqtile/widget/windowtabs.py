@@ -31,7 +31,8 @@ class WindowTabs(base._TextBox):
 
     def _configure(self, qtile, bar):
         base._TextBox._configure(self, qtile, bar)
-        hook.subscribe.client_name_updated(self.update)
+        # Some clients rename their windows many times a second
+        hook.subscribe.client_name_updated(self.update, coalesce=True)
         hook.subscribe.focus_change(self.update)
         hook.subscribe.float_change(self.update)
         self.add_callbacks({"Button1": self.bar.screen.group.next_window})
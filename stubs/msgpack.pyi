@@ -0,0 +1,7 @@
+from collections.abc import Callable
+from typing import Any
+
+class UnpackException(Exception): ...
+
+def packb(o: Any, *, default: Callable[[Any], Any] | None = ..., **kwargs: Any) -> bytes: ...
+def unpackb(packed: bytes, *, strict_map_key: bool = ..., **kwargs: Any) -> Any: ...
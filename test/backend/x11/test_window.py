@@ -881,3 +881,32 @@ def test_multiple_wm_types(xmanager):
     kde_override = conn.atoms["_KDE_NET_WM_WINDOW_TYPE_OVERRIDE"]
     w.set_property("_NET_WM_WINDOW_TYPE", [kde_override, normal])
     assert w.get_wm_type() == "normal"
+
+
+@manager_config
+def test_place_skips_unchanged_geometry(xmanager, conn):
+    xmanager.test_window("one")
+    wid = xmanager.c.window.info()["id"]
+    xmanager.c.core.request_stats(reset=True)
+
+    # nothing changed, so nothing is sent again
+    xmanager.c.eval("self.current_group.layout_all(sync=True)")
+    stats = xmanager.c.core.request_stats(reset=True)
+    assert stats["configure_skipped"] == 1
+    assert stats["paint_borders_skipped"] == 1
+    assert stats["configure_notify_skipped"] == 1
+
+    # but changes still are
+    for x in (50, 60):
+        xmanager.c.window.set_position_floating(x, 50)
+        geometry = conn.conn.core.GetGeometry(wid).reply()
+        assert (geometry.x, geometry.y) == (x, 50)
+
+
+@manager_config
+def test_manage_prefetches_properties(xmanager):
+    xmanager.c.core.request_stats(reset=True)
+    xmanager.test_window("one")
+    stats = xmanager.c.core.request_stats()
+    assert stats["round_trips_prefetched"] + stats["get_property_cached"] > 5
+    assert xmanager.c.window.info()["name"] == "one"
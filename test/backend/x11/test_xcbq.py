@@ -1,6 +1,7 @@
 import pytest
 import xcffib
 import xcffib.testing
+from xcffib.xproto import EventMask
 
 from libqtile.backend.x11 import window, xcbq
 
@@ -18,6 +19,88 @@ def test_new_window(conn):
         win.get_geometry()
 
 
+def test_prefetch(conn):
+    win = conn.create_window(1, 2, 640, 480)
+    win.set_property("_NET_WM_NAME", "one")
+    window.prefetch([win])
+
+    # _NET_WM_VISIBLE_NAME, then _NET_WM_NAME and the geometry
+    assert win.get_name() == "one"
+    assert win.get_geometry().width == 640
+    assert conn.stats["get_property_cached"] == 2
+    assert conn.stats["round_trips_prefetched"] == 1
+
+    # the properties that are changed are fetched again
+    win.set_property("_NET_WM_NAME", "two")
+    assert win.get_name() == "two"
+
+    assert win.get_attributes().your_event_mask == EventMask.PropertyChange
+    win.clear_prefetched()
+    assert win.get_geometry().width == 640
+    assert conn.stats["round_trips_prefetched"] == 1
+    # the events are only kept for the windows that are managed
+    assert win.get_attributes().your_event_mask == EventMask.NoEvent
+
+    managed = conn.create_window(1, 2, 640, 480)
+    window.prefetch([managed])
+    managed.enable_property_cache()
+    managed.clear_prefetched()
+    assert managed.get_attributes().your_event_mask == EventMask.PropertyChange
+
+
+def test_property_cache(conn):
+    win = conn.create_window(1, 2, 640, 480)
+    win.enable_property_cache()
+    win.set_property("_NET_WM_NAME", "one")
+    assert win.get_name() == "one"
+    assert conn.stats["get_property_cached"] == 0
+    assert win.get_name() == "one"
+    assert conn.stats["get_property_cached"] == 2
+
+    # kept once the prefetched replies are cleared
+    win.clear_prefetched()
+    assert win.get_name() == "one"
+    assert conn.stats["get_property_cached"] == 4
+
+    # e.g. on a PropertyNotify event
+    win.invalidate_property(conn.atoms["_NET_WM_NAME"])
+    assert win.get_name() == "one"
+    assert conn.stats["get_property_cached"] == 5
+
+
+def test_color_pixel_cache(conn):
+    conn.prefetch_colors(["red", "#00ff00", "#00ff00", "00f"])
+    assert conn.stats["alloc_color_skipped"] == 0
+    assert conn.color_pixel("#00ff00") == 0xFF00FF00
+    assert conn.color_pixel("red") == 0xFFFF0000
+    assert conn.color_pixel("00f") == 0xFF0000FF
+    assert conn.stats["alloc_color_skipped"] == 3
+
+    # colors that weren't prefetched are allocated on first use
+    assert conn.color_pixel("#ffffff") == 0xFFFFFFFF
+    assert conn.stats["alloc_color_skipped"] == 3
+
+
+def test_border_pixmap_cache(conn):
+    win = conn.create_window(1, 2, 640, 480)
+    depth = win.get_geometry().depth
+    focused = ["#ff0000", "#00ff00"]
+    unfocused = ["#0000ff", "#00ff00"]
+
+    # e.g. when the focus goes back and forth
+    win.paint_borders(depth, focused, 4, 640, 480)
+    win.paint_borders(depth, unfocused, 4, 640, 480)
+    win.paint_borders(depth, focused, 4, 640, 480)
+    assert conn.stats["border_pixmaps_reused"] == 1
+
+    assert len(conn._border_pixmaps) == 2
+
+    # the pixmaps of the previous size are freed once resized
+    win.paint_borders(depth, focused, 4, 320, 480)
+    assert conn.stats["border_pixmaps_reused"] == 1
+    assert list(conn._border_pixmaps) == [(depth, tuple(focused), 4, 320, 480)]
+
+
 def test_masks():
     cfgmasks = xcbq.ConfigureMasks
     d = {"x": 1, "y": 2, "width": 640, "height": 480}
@@ -65,3 +65,44 @@ def test_clear_focus_empty_group(xmanager, conn):
 
     active = conn.default_screen.root.get_property("_NET_ACTIVE_WINDOW", unpack=int)
     assert active[0] == 0
+
+
+def test_valid_timestamp(xmanager):
+    # no event told the time since the focus changed
+    xmanager.c.eval("self.core.conn.timestamp = 0")
+    xmanager.c.core.request_stats(reset=True)
+    timestamp = int(xmanager.c.eval("self.core.get_valid_timestamp()"))
+    assert timestamp != 0
+    assert xmanager.c.core.request_stats().get("timestamp_round_trips_skipped", 0) == 0
+
+    # then the time told by the auxiliary connection is used again
+    assert int(xmanager.c.eval("self.core.get_valid_timestamp()")) == timestamp
+    assert xmanager.c.core.request_stats()["timestamp_round_trips_skipped"] == 1
+
+
+@pytest.mark.parametrize("xmanager", [ManagerConfig], indirect=True)
+def test_net_client_list_stacking(xmanager, conn):
+    root = conn.default_screen.root
+
+    def assert_stacking():
+        stacked = root.get_property("_NET_CLIENT_LIST_STACKING", unpack=int)
+        # the tracked stacking order matches the server's
+        assert stacked == [wid for wid in root.query_tree() if wid in stacked]
+        return stacked
+
+    xmanager.test_window("one")
+    xmanager.test_window("two")
+    xmanager.c.window.toggle_floating()
+    three = xmanager.test_window("three")
+    xmanager.c.window.toggle_floating()
+    assert len(assert_stacking()) == 3
+
+    wid = xmanager.c.window.info()["id"]
+    before = assert_stacking()
+    xmanager.c.window.move_to_bottom()
+    assert assert_stacking().index(wid) < before.index(wid)
+    xmanager.c.window.move_to_top()
+    assert assert_stacking()[-1] == wid
+
+    xmanager.kill_window(three)
+    assert len(assert_stacking()) == 2
@@ -0,0 +1,66 @@
+import asyncio
+import importlib.util
+import sys
+
+import pytest
+
+from libqtile.core.loop import EVENT_LOOPS, new_event_loop
+from libqtile.ipc import Client, Server
+
+LOOPS = [
+    pytest.param(
+        name,
+        marks=pytest.mark.skipif(
+            name != "asyncio" and importlib.util.find_spec(name) is None,
+            reason=f"{name} is not installed",
+        ),
+    )
+    for name in EVENT_LOOPS
+]
+
+
+def test_new_event_loop():
+    loop = new_event_loop()
+    assert isinstance(loop, asyncio.AbstractEventLoop)
+    loop.close()
+
+    with pytest.raises(ValueError):
+        new_event_loop("tokio")
+
+
+def test_new_event_loop_fallback(monkeypatch, caplog):
+    # makes `import uvloop` raise an ImportError
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    loop = new_event_loop("uvloop")
+    assert isinstance(loop, asyncio.BaseEventLoop)
+    loop.close()
+    assert "uvloop is not installed" in caplog.text
+
+
+@pytest.mark.parametrize("name", LOOPS)
+def test_loop_timers_and_ipc(name, tmp_path):
+    sockfile = str(tmp_path / "qtilesocket")
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        ticks = []
+
+        def tick():
+            ticks.append(len(ticks))
+            if len(ticks) < 10:
+                loop.call_later(0, tick)
+            else:
+                done.set_result(None)
+
+        loop.call_later(0, tick)
+        await done
+        assert ticks == list(range(10))
+
+        async with Server(sockfile, lambda req: ["echo", req]):
+            client = Client(sockfile, persistent=True)
+            replies = [await client.async_send(i) for i in range(10)]
+            await client.async_close()
+        assert replies == [["echo", i] for i in range(10)]
+
+    asyncio.run(main(), loop_factory=lambda: new_event_loop(name))
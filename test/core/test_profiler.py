@@ -0,0 +1,35 @@
+import time
+
+from libqtile.core.profiler import SamplingProfiler
+
+
+def busy_widget_poll():
+    end = time.monotonic() + 0.2
+    while time.monotonic() < end:
+        pass
+
+
+def test_sampling_profiler(tmp_path):
+    profiler = SamplingProfiler(interval=0.002)
+    profiler.start()
+    assert profiler.running
+    busy_widget_poll()
+    profiler.stop()
+    assert not profiler.running
+    assert profiler.duration >= 0.2
+
+    samples = sum(profiler.samples.values())
+    assert samples > 10
+
+    path = tmp_path / "profile.folded"
+    profiler.write(str(path))
+    lines = path.read_text().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == samples
+    # the stacks go from the outermost frame to the sampled one
+    busy = [line for line in lines if "busy_widget_poll" in line]
+    assert busy
+    assert all(
+        line.rsplit(" ", 1)[0].endswith("busy_widget_poll (core/test_profiler.py:6)")
+        for line in busy
+    )
+    assert "test_sampling_profiler" in busy[0].split(";busy_widget_poll")[0]
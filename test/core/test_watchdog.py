@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from libqtile.core.watchdog import LAG_BUCKETS, LagMonitor
+from libqtile.log_utils import init_log
+
+
+def blocking_poll():
+    time.sleep(0.4)
+
+
+@pytest.fixture
+def monitor():
+    init_log()
+    yield LagMonitor(interval=0.02, threshold=0.1, describe_event=lambda: "ButtonPressEvent")
+
+
+def test_lag_histogram(monitor):
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.2)
+        monitor.stop()
+
+    asyncio.run(run())
+
+    info = monitor.info()
+    assert not info["running"]
+    assert info["samples"] >= 5
+    assert sum(count for _, count in info["histogram"]) == info["samples"]
+    assert [bound for bound, _ in info["histogram"]] == [*LAG_BUCKETS, None]
+    assert info["stall_count"] == 0
+
+    monitor.reset()
+    assert monitor.info()["samples"] == 0
+
+
+def test_stall_capture(monitor, caplog):
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        blocking_poll()
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(run())
+
+    info = monitor.info()
+    assert info["stall_count"] == 1
+    assert info["max"] >= 0.3
+    (stall,) = info["stalls"]
+    assert stall["event"] == "ButtonPressEvent"
+    assert "blocking_poll" in stall["stack"]
+    # updated with the whole duration once the loop resumed
+    assert stall["lag"] >= 0.3
+    assert "The event loop has been stalled" in caplog.text
+    assert "The event loop was stalled" in caplog.text
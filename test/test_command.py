@@ -1,4 +1,5 @@
 import asyncio
+from typing import Literal
 
 import pytest
 
@@ -8,9 +9,29 @@ import libqtile.confreader
 import libqtile.layout
 import libqtile.log_utils
 import libqtile.widget
-from libqtile.command.base import CommandError, CommandException, CommandObject, expose_command
-from libqtile.command.client import CommandClient
-from libqtile.command.interface import IPCCommandInterface
+from libqtile.command import interface
+from libqtile.command.base import (
+    CommandError,
+    CommandException,
+    CommandObject,
+    SelectError,
+    SelectorCache,
+    expose_command,
+)
+from libqtile.command.client import (
+    AsyncCommandClient,
+    AsyncInteractiveCommandClient,
+    CommandClient,
+)
+from libqtile.command.interface import (
+    ERROR,
+    EXCEPTION,
+    SUCCESS,
+    AsyncIPCCommandInterface,
+    IPCCommandInterface,
+    IPCCommandServer,
+    lift_args,
+)
 from libqtile.confreader import Config
 from libqtile.ipc import Client, IPCError
 from libqtile.lazy import lazy
@@ -30,6 +51,11 @@ class CallConfig(Config):
             "k",
             lazy.layout.up(),
         ),
+        libqtile.config.Key(
+            ["control"],
+            "f",
+            lazy.window.toggle_floating(),
+        ),
     ]
     mouse = []
     groups = [
@@ -69,6 +95,28 @@ def test_layout_filter(manager):
     assert manager.c.get_groups()["a"]["focus"] == "two"
 
 
+@call_config
+def test_key_dispatch_follows_focus(manager):
+    manager.test_window("one")
+    manager.test_window("two")
+    manager.c.simulate_keypress(["control"], "f")
+    assert manager.c.window.info()["name"] == "two"
+    assert manager.c.window.info()["floating"]
+
+    # the window the key was resolved to is not reused once focus moves
+    manager.c.group.focus_by_name("one")
+    manager.c.simulate_keypress(["control"], "f")
+    assert manager.c.window.info()["name"] == "one"
+    assert manager.c.window.info()["floating"]
+
+    # and neither is the group once another one is shown
+    manager.c.group["b"].toscreen()
+    manager.test_window("three")
+    manager.c.simulate_keypress(["control"], "f")
+    assert manager.c.window.info()["name"] == "three"
+    assert manager.c.window.info()["floating"]
+
+
 @call_config
 def test_param_hoisting(manager):
     manager.test_window("two")
@@ -96,6 +144,57 @@ def test_param_hoisting(manager):
     cmd_client.navigate("widget", "textbox").call("set_font", fontsize=12, lifted=True)
 
 
+@call_config
+def test_batch(manager):
+    manager.test_window("one")
+    manager.test_window("two")
+
+    cmd_client = CommandClient(IPCCommandInterface(Client(manager.sockfile, persistent=True)))
+    with cmd_client.batch() as batch:
+        for wid in manager.c.group["a"].info()["windows"]:
+            batch.navigate("window", wid).call("togroup", "b")
+        batch.navigate("group", "b").call("toscreen")
+        batch.call("next_layout")
+        batch.call("eval", "raise Exception")
+        batch.call("status")
+        # the calls are only executed when the block exits
+        assert manager.c.group.info()["name"] == "a"
+        with pytest.raises(SelectError):
+            batch.call("zomg")
+
+    assert [status for status, _ in batch.results] == [SUCCESS] * 4 + [EXCEPTION, SUCCESS]
+    assert batch.results[-1] == (SUCCESS, "OK")
+    assert manager.c.group.info()["name"] == "b"
+    assert len(manager.c.group.info()["windows"]) == 2
+    assert manager.c.layout.info()["name"] == "max"
+
+
+@call_config
+@pytest.mark.asyncio
+async def test_async_clients(manager):
+    manager.test_window("one")
+    manager.test_window("two")
+
+    interface = AsyncIPCCommandInterface(Client(manager.sockfile, persistent=True))
+    client = AsyncCommandClient(interface)
+    assert await client.call("status") == "OK"
+    group = await client.navigate("group", "b")
+    await group.call("toscreen")
+    assert manager.c.group.info()["name"] == "b"
+    with pytest.raises(SelectError):
+        await client.navigate("group", "nonexistent")
+
+    c = AsyncInteractiveCommandClient(interface)
+    await c.group["a"].toscreen()
+    wids = [w["id"] for w in await c.windows(fields=["id"])]
+    infos = await asyncio.gather(*(c.window[wid].info() for wid in wids))
+    assert sorted(info["name"] for info in infos) == ["one", "two"]
+    with pytest.raises(CommandError):
+        await c.group["nonexistent"].info()
+
+    await interface.close()
+
+
 class FakeCommandObject(CommandObject):
     @staticmethod
     @expose_command()
@@ -140,6 +239,109 @@ def test_command():
     assert not c.command("nonexistent")
 
 
+def test_command_table():
+    c = FakeCommandObject()
+    # the table is built once for the class and shared by its instances
+    assert FakeCommandObject().command("one") is c.command("one")
+    assert c.commands() is not c.commands()
+    c.doc("three")
+    assert FakeCommandObject._command_docs["three"] == c.doc("three")
+    with pytest.raises(CommandError):
+        c.doc("nonexistent")
+
+
+def lifted(a: int, b: bool | None = None, c: Literal["x", "y"] = "x", d=None):
+    pass
+
+
+def test_lift_args():
+    assert lift_args(lifted, ("1", "True", "y", "d"), {}) == ((1, True, "y", "d"), {})
+    assert lift_args(lifted, ("1",), {"b": "", "d": "1"}) == ((1,), {"b": None, "d": "1"})
+    with pytest.raises(TypeError):
+        lift_args(lifted, (), {"c": "z"})
+
+
+def test_lift_args_cached():
+    # the lifters are built by the first call, the following ones only look
+    # them up
+    interface._command_lifters.cache_clear()
+    lift_args(lifted, ("1",), {"b": "True"})
+    lift_args(lifted, ("2",), {"c": "y"})
+    info = interface._command_lifters.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+
+class FakeQtile:
+    locked = False
+
+    def __init__(self):
+        self.selections = 0
+
+    def select(self, selectors):
+        self.selections += 1
+        if selectors:
+            raise SelectError("Not found", selectors[0][0], selectors)
+        return FakeCommandObject()
+
+
+def test_compiled_call():
+    qtile = FakeQtile()
+    server = IPCCommandServer(qtile)
+    call = server.compile([], "three", (1,), {"b": 2})
+    assert call() == (SUCCESS, None)
+    assert call() == (SUCCESS, None)
+    assert qtile.selections == 1
+
+    server.invalidate()
+    assert call() == (SUCCESS, None)
+    assert qtile.selections == 2
+
+    qtile.locked = True
+    assert call() == (ERROR, "three cannot be called when session is locked.")
+    qtile.locked = False
+
+    assert server.compile([], "zomg", (), {})() == (ERROR, "No such command")
+    call = server.compile([("window", 1)], "kill", (), {})
+    assert call() == (ERROR, "No object window in path 'window[1]'")
+
+
+class FakeRoot(FakeCommandObject):
+    _cached_items = frozenset({"child"})
+
+    def __init__(self):
+        self.selections = 0
+        self.selector_cache = SelectorCache()
+
+    def _items(self, name):
+        if name in ("child", "current"):
+            return True, [1, 2]
+        return None
+
+    def _select(self, name, sel):
+        self.selections += 1
+        return FakeCommandObject()
+
+
+def test_selector_cache():
+    root = FakeRoot()
+    child = root.select([("child", 1)])
+    assert root.select([("child", 1)]) is child
+    assert root.select([["child", 1]]) is child
+    assert root.selections == 1
+    assert root.selector_cache.info() == {"size": 1, "hits": 2, "misses": 1}
+
+    # selections of the current item, or of other item classes, are not cached
+    root.select([("child", None)])
+    root.select([("current", 1)])
+    root.select([("current", 1)])
+    assert root.selections == 4
+
+    root.selector_cache.invalidate()
+    assert root.select([("child", 1)]) is not child
+    with pytest.raises(SelectError):
+        root.select([("child", 3)])
+
+
 class DecoratedTextBox(libqtile.widget.TextBox):
     @expose_command("mapped")
     def exposed(self):
@@ -407,6 +609,26 @@ def test_select_widget(manager):
         widget.bar["bottom"]
 
 
+@server_config
+def test_select_cached(manager):
+    one = manager.test_window("one")
+    wid = manager.c.window.info()["id"]
+    assert manager.c.window[wid].info()["name"] == "one"
+    info = manager.c.selector_cache_info()
+    assert info["size"] == 1
+    assert manager.c.window[wid].info()["name"] == "one"
+    assert manager.c.selector_cache_info()["hits"] == info["hits"] + 1
+
+    # the selections of the current objects are never cached
+    manager.c.window.info()
+    manager.c.group.layout.info()
+    assert manager.c.selector_cache_info()["size"] == 1
+
+    # and the cache is dropped once the window is unmanaged
+    manager.kill_window(one)
+    assert manager.c.selector_cache_info()["size"] == 0
+
+
 def test_core_node(manager, backend_name):
     assert manager.c.core.info()["backend"] == backend_name
 
@@ -1,4 +1,5 @@
 import asyncio
+import time
 from multiprocessing import Value
 
 import pytest
@@ -6,6 +7,7 @@ import pytest
 import libqtile.log_utils
 import libqtile.utils
 from libqtile import hook, layout
+from libqtile.ipc import Client
 from libqtile.resources import default_config
 from test.conftest import BareConfig, dualmonitor
 from test.helpers import Retry
@@ -111,6 +113,186 @@ def test_can_unsubscribe_from_hook():
     assert test.val == 3
 
 
+@pytest.mark.usefixtures("hook_fixture")
+def test_hook_listener():
+    fired = []
+
+    def listener(event, args):
+        fired.append((event, args))
+
+    hook.qtile_hooks.add_listener(listener)
+    try:
+        hook.fire("group_window_add", 8)
+        # listeners are kept when the config is reloaded
+        hook.clear()
+        hook.fire("group_window_add", 9)
+    finally:
+        hook.qtile_hooks.remove_listener(listener)
+    hook.fire("group_window_add", 10)
+
+    assert fired == [("group_window_add", (8,)), ("group_window_add", (9,))]
+
+
+@pytest.mark.usefixtures("hook_fixture")
+def test_hook_dispatch_table():
+    first = Call(0)
+    second = Call(0)
+
+    hook.subscribe.group_window_add(first)
+    hook.fire("group_window_add", 1)
+    assert first.val == 1
+
+    # the table is rebuilt when subscribing and unsubscribing
+    hook.subscribe.group_window_add(second)
+    hook.fire("group_window_add", 2)
+    assert (first.val, second.val) == (2, 2)
+
+    hook.unsubscribe.group_window_add(first)
+    hook.fire("group_window_add", 3)
+    assert (first.val, second.val) == (2, 3)
+
+    # and when the subscriptions are removed from under the registry
+    del hook.subscriptions["qtile"]["group_window_add"]
+    hook.fire("group_window_add", 4)
+    assert (first.val, second.val) == (2, 3)
+
+    hook.clear()
+    hook.fire("group_window_add", 5)
+    assert (first.val, second.val) == (2, 3)
+
+
+@pytest.mark.usefixtures("hook_fixture")
+def test_hook_coalesce():
+    calls = []
+    per_window = []
+
+    async def t():
+        hook.subscribe.client_name_updated(calls.append, coalesce=0.2)
+        hook.subscribe.client_name_updated(
+            per_window.append, coalesce=0, coalesce_key=lambda window: window % 2
+        )
+
+        # a burst is delivered on the next iteration with the latest arguments
+        for i in range(5):
+            hook.fire("client_name_updated", i)
+        assert calls == []
+        await asyncio.sleep(0)
+        assert calls == [4]
+        assert per_window == [4, 3]
+
+        # and then at most once per window
+        for i in range(5, 10):
+            hook.fire("client_name_updated", i)
+        await asyncio.sleep(0)
+        assert calls == [4]
+        await asyncio.sleep(0.3)
+        assert calls == [4, 9]
+        assert per_window == [4, 3, 9, 8]
+
+        # pending calls are dropped when unsubscribing
+        hook.fire("client_name_updated", 10)
+        hook.unsubscribe.client_name_updated(calls.append)
+        await asyncio.sleep(0.3)
+        assert calls == [4, 9]
+
+    asyncio.run(t())
+
+
+@pytest.fixture
+def hook_stats():
+    hook.enable_stats()
+    yield
+    hook.enable_stats(False)
+    hook.reset_stats()
+
+
+@pytest.mark.usefixtures("hook_fixture", "hook_stats")
+def test_hook_stats():
+    def slow(window):
+        time.sleep(0.01)
+
+    def broken(window):
+        raise ValueError
+
+    async def later(window):
+        await asyncio.sleep(0.02)
+
+    async def t():
+        hook.subscribe.client_name_updated(slow)
+        hook.subscribe.client_name_updated(broken)
+        hook.subscribe.client_name_updated(later)
+        hook.subscribe.focus_change(NoArgCall(0), coalesce=0)
+        for i in range(3):
+            hook.fire("client_name_updated", i)
+            hook.fire("focus_change")
+        await asyncio.sleep(0.1)
+
+    asyncio.run(t())
+
+    stats = {(s["hook"], s["subscriber"]): s for s in hook.get_stats()}
+    assert set(stats) == {
+        ("client_name_updated", "test_hook_stats.<locals>.slow"),
+        ("client_name_updated", "test_hook_stats.<locals>.broken"),
+        ("client_name_updated", "test_hook_stats.<locals>.later"),
+        ("focus_change", "NoArgCall"),
+    }
+
+    slow_stats = stats[("client_name_updated", "test_hook_stats.<locals>.slow")]
+    assert slow_stats["calls"] == 3
+    assert slow_stats["total"] >= 0.03
+    assert slow_stats["max"] >= 0.01
+    assert slow_stats["errors"] == 0
+    assert stats[("client_name_updated", "test_hook_stats.<locals>.broken")]["errors"] == 3
+    # async subscribers are timed until they complete
+    assert stats[("client_name_updated", "test_hook_stats.<locals>.later")]["max"] >= 0.02
+    # coalesced subscribers are recorded when they are actually called
+    assert stats[("focus_change", "NoArgCall")]["calls"] == 1
+
+    # nothing is recorded once disabled
+    hook.enable_stats(False)
+    hook.fire("client_name_updated", 4)
+    assert {(s["hook"], s["subscriber"]): s for s in hook.get_stats()} == stats
+
+
+def test_hook_stats_command(manager):
+    assert manager.c.hook_stats() == {"enabled": False, "stats": []}
+    try:
+        assert manager.c.hook_stats(enable=True)["enabled"]
+        manager.c.group["b"].toscreen()
+        stats = manager.c.hook_stats(reset=True)["stats"]
+        setgroup = {stat["subscriber"]: stat for stat in stats if stat["hook"] == "setgroup"}
+        assert setgroup["Qtile.update_desktops"]["calls"] >= 1
+        assert manager.c.hook_stats()["stats"] == []
+    finally:
+        manager.c.hook_stats(enable=False, reset=True)
+
+
+@pytest.mark.usefixtures("hook_fixture")
+def test_hook_fire_all_subscribers():
+    received = [[] for _ in range(5)]
+    for events in received:
+        hook.subscribe.group_window_add(events.append)
+
+    for i in range(100):
+        hook.fire("group_window_add", i)
+
+    assert received == [list(range(100))] * 5
+
+
+def test_hook_subscription_over_ipc(manager):
+    events = Client(manager.sockfile).subscribe(["client_managed"])
+    manager.test_window("one")
+    event = next(events)
+    events.close()
+
+    assert event["event"] == "client_managed"
+    assert event["dropped"] == 0
+    window = event["args"][0]
+    assert window["type"] == "window"
+    assert window["group"] == "a"
+    assert window["id"] == manager.c.window.info()["id"]
+
+
 def test_can_subscribe_to_startup_hooks(manager_nospawn):
     config = BareConfig
     for attr in dir(default_config):
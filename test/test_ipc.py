@@ -1,6 +1,18 @@
+import asyncio
+import threading
+
 import pytest
 
-from libqtile.ipc import _IPC
+from libqtile.ipc import (
+    _IPC,
+    CODEC_JSON,
+    CODEC_MARSHAL,
+    CODEC_MSGPACK,
+    Client,
+    IPCError,
+    Server,
+)
+from test.helpers import Retry
 
 
 def test_ipc_json_encoder_supports_sets():
@@ -27,3 +39,195 @@ def test_ipc_marshall_error_on_unsupported_field():
 
     with pytest.raises(ValueError, match="unmarshallable object"):
         _IPC.pack({"foo": NonSerializableType()})
+
+
+@pytest.fixture
+def ipc_server(tmp_path):
+    """Run an echo server on its own event loop, in a separate thread"""
+    sockfile = str(tmp_path / "qtilesocket")
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    stopped = asyncio.Event()
+
+    server = Server(sockfile, lambda req: ["echo", req])
+
+    async def run():
+        async with server:
+            started.set()
+            await stopped.wait()
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),))
+    thread.start()
+    started.wait()
+    yield sockfile, server, loop
+    loop.call_soon_threadsafe(stopped.set)
+    thread.join()
+    loop.close()
+
+
+def test_ipc_one_shot_client(ipc_server):
+    sockfile, server, _ = ipc_server
+    assert Client(sockfile).send(("status",)) == ["echo", ("status",)]
+    assert Client(sockfile, is_json=True).send(["status"]) == ["echo", ["status"]]
+    assert not server._connections
+
+
+@pytest.mark.parametrize("is_json", [False, True])
+def test_ipc_persistent_client_reuses_connection(ipc_server, is_json):
+    sockfile, server, _ = ipc_server
+    with Client(sockfile, is_json=is_json, persistent=True) as client:
+        assert client.send([1]) == ["echo", [1]]
+        connection = client._connection
+        assert client.send([2]) == ["echo", [2]]
+        assert client._connection is connection
+        assert len(server._connections) == 1
+
+
+def test_ipc_persistent_client_pipelining(ipc_server):
+    sockfile, _, _ = ipc_server
+    with Client(sockfile, persistent=True) as client:
+        connection = client._get_connection()
+        ids = [connection.submit(i) for i in range(10)]
+        assert len(set(ids)) == 10
+        assert [connection.result(i) for i in reversed(ids)] == [
+            ["echo", i] for i in reversed(range(10))
+        ]
+
+
+def test_ipc_persistent_client_reconnects(ipc_server):
+    sockfile, server, loop = ipc_server
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_closed(connection):
+        assert connection.closed
+
+    with Client(sockfile, persistent=True) as client:
+        assert client.send(1) == ["echo", 1]
+        # the server dropping the connection (e.g. on restart) is transparent
+        for writer in list(server._connections):
+            loop.call_soon_threadsafe(writer.close)
+        assert_closed(client._connection)
+        assert client.send(2) == ["echo", 2]
+
+
+def test_ipc_persistent_client_timeout(ipc_server):
+    sockfile, _, _ = ipc_server
+    with Client(sockfile, persistent=True) as client:
+        connection = client._get_connection()
+        connection.sock.settimeout(0.1)
+        # no reply ever comes for a request that wasn't sent
+        with pytest.raises(IPCError, match="not responding"):
+            connection.result(connection.submit(1) + 1)
+        # the reply arriving late can't be taken for the next one's
+        assert connection.closed
+        assert client.send(2) == ["echo", 2]
+
+
+@pytest.mark.asyncio
+async def test_ipc_persistent_async_client(tmp_path):
+    sockfile = str(tmp_path / "qtilesocket")
+    async with Server(sockfile, lambda req: req * 2) as server:
+        client = Client(sockfile, persistent=True)
+        results = await asyncio.gather(*(client.async_send(i) for i in range(50)))
+        assert results == [i * 2 for i in range(50)]
+        assert len(server._connections) == 1
+        await client.async_close()
+
+
+def test_ipc_subscribe(ipc_server):
+    sockfile, server, loop = ipc_server
+    events = Client(sockfile).subscribe(["focus_change"])
+    assert server.is_subscribed("focus_change")
+    assert not server.is_subscribed("client_new")
+
+    loop.call_soon_threadsafe(server.publish, "client_new", [1])
+    loop.call_soon_threadsafe(server.publish, "focus_change", [{"type": "window", "id": 1}])
+    assert next(events) == {
+        "event": "focus_change",
+        "args": [{"type": "window", "id": 1}],
+        "dropped": 0,
+    }
+
+    events.close()
+
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_unsubscribed():
+        assert not server.is_subscribed("focus_change")
+
+    assert_unsubscribed()
+
+
+def test_ipc_subscribe_invalid(ipc_server):
+    sockfile, _, _ = ipc_server
+    with pytest.raises(IPCError, match="overflow must be one of"):
+        Client(sockfile).subscribe(overflow="zomg")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "overflow,expected",
+    [
+        ("drop_oldest", [([3], 3), ([4], 0)]),
+        ("drop_newest", [([0], 3), ([1], 0)]),
+    ],
+)
+async def test_ipc_subscribe_overflow(tmp_path, overflow, expected):
+    sockfile = str(tmp_path / "qtilesocket")
+    async with Server(sockfile, lambda req: req) as server:
+        events = await Client(sockfile).async_subscribe(queue_size=2, overflow=overflow)
+        # the events are queued before the subscriber gets a chance to read them
+        for i in range(5):
+            server.publish("hook", [i])
+        for args, dropped in expected:
+            assert await anext(events) == {"event": "hook", "args": args, "dropped": dropped}
+        await events.aclose()
+
+
+@pytest.mark.asyncio
+async def test_ipc_subscribe_overflow_disconnect(tmp_path, caplog):
+    sockfile = str(tmp_path / "qtilesocket")
+    async with Server(sockfile, lambda req: req) as server:
+        events = await Client(sockfile).async_subscribe(queue_size=1, overflow="disconnect")
+        for i in range(5):
+            server.publish("hook", [i])
+        # the subscriber is only closed once
+        assert caplog.text.count("not keeping up") == 1
+        with pytest.raises(IPCError):
+            await anext(events)
+        assert not server.is_subscribed("hook")
+
+
+def test_ipc_unpack_marshal_without_json_probe(monkeypatch):
+    def fail(_):
+        raise AssertionError("json was probed")
+
+    monkeypatch.setattr("libqtile.ipc.json.loads", fail)
+    assert _IPC.unpack(_IPC.pack(("status",))) == (("status",), False)
+
+
+def test_ipc_msgpack_codec():
+    pytest.importorskip("msgpack")
+    msg = {"windows": [{"id": 1, "name": "one"}], "flags": {1}, 2: (3, 4)}
+    payload = _IPC.dumps(msg, codec=CODEC_MSGPACK)
+    assert len(payload) < len(_IPC.dumps(msg, codec=CODEC_JSON))
+    assert _IPC.loads(payload, codec=CODEC_MSGPACK) == {
+        "windows": [{"id": 1, "name": "one"}],
+        "flags": [1],
+        2: [3, 4],
+    }
+
+
+def test_ipc_codec_negotiation(ipc_server, monkeypatch):
+    pytest.importorskip("msgpack")
+    sockfile, _, _ = ipc_server
+    with Client(sockfile, persistent=True) as client:
+        assert client.send([1]) == ["echo", [1]]
+        assert client._connection.codec == CODEC_MSGPACK
+
+    # a server without msgpack falls back to marshal
+    monkeypatch.setattr("libqtile.ipc.has_msgpack", False)
+    with Client(sockfile, persistent=True) as client:
+        assert client.codec == CODEC_MARSHAL
+        client.codec = CODEC_MSGPACK
+        assert client.send((1,)) == ["echo", (1,)]
+        assert client._connection.codec == CODEC_MARSHAL
@@ -1,4 +1,7 @@
+import ast
+import json
 import logging
+import textwrap
 from pathlib import Path
 
 import pytest
@@ -463,6 +466,44 @@ def test_regression_groupswitch(manager):
     assert manager.c.get_groups()["c"]["screen"] is None
 
 
+class GroupKeysConfig(ManagerConfig):
+    keys = [
+        libqtile.config.Key(["control"], "b", lazy.group["b"].toscreen()),
+    ]
+
+
+@pytest.mark.parametrize("manager", [GroupKeysConfig], indirect=True)
+def test_groupswitch_key_order(manager):
+    manager.test_window("one")
+    manager.c.group["b"].toscreen()
+    manager.test_window("two")
+    manager.c.group["a"].toscreen()
+    manager.c.eval(
+        textwrap.dedent(
+            """
+        import functools
+
+        def record(order, name, action, method, *args, **kwargs):
+            order.append((name, action))
+            return method(*args, **kwargs)
+
+        self.placement_order = []
+        for win in self.windows_map.values():
+            if getattr(win, "name", None) in ("one", "two"):
+                for action in ("place", "hide"):
+                    setattr(win, action, functools.partial(
+                        record, self.placement_order, win.name, action, getattr(win, action)
+                    ))
+    """
+        )
+    )
+    manager.c.simulate_keypress(["control"], "b")
+    assert manager.c.get_groups()["b"]["screen"] == 0
+    order = ast.literal_eval(manager.c.eval("self.placement_order"))
+    # the new group's windows are placed before the old group's are hidden
+    assert order.index(("two", "place")) < order.index(("one", "hide"))
+
+
 @manager_config
 def test_next_layout(manager):
     manager.test_window("one")
@@ -1259,6 +1300,92 @@ def test_windows_from_commands(manager):
     assert "TestWindow" in windows[0]["wm_class"]
 
 
+@dualmonitor
+@manager_config
+def test_info_fields_and_filters(manager):
+    manager.test_window("one")
+    manager.c.to_screen(1)
+    manager.test_window("two")
+
+    windows = manager.c.windows(fields=["name", "group", "nonexistent"])
+    assert sorted(windows, key=lambda w: w["name"]) == [
+        {"name": "one", "group": "a"},
+        {"name": "two", "group": "b"},
+    ]
+    assert [w["name"] for w in manager.c.windows(group="b")] == ["two"]
+    assert [w["name"] for w in manager.c.windows(screen=0)] == ["one"]
+    assert len(manager.c.windows(wm_class="TestWindow", fields=["name", "floating"])) == 2
+    assert manager.c.windows(wm_class="nonexistent") == []
+
+    assert manager.c.get_groups(fields=["windows"], screen=1) == {"b": {"windows": ["two"]}}
+    assert set(manager.c.get_groups(fields=["screen", "floating_info"])["a"]) == {
+        "screen",
+        "floating_info",
+    }
+    assert all(set(w) == {"id"} for w in manager.c.internal_windows(fields=["id"]))
+    assert set(manager.c.qtile_info(fields=["version"])) == {"version"}
+
+    # the keys are those of info(), whichever way they are read
+    manager.c.window.static()
+    full = {w["id"]: w for w in manager.c.windows()}
+    for fields in (["id", "opacity"], ["id", "opacity", "floating_info"]):
+        for win in manager.c.windows(fields=fields):
+            assert set(win) == {field for field in fields if field in full[win["id"]]}
+
+
+@manager_config
+def test_snapshot(manager):
+    snapshot = manager.c.snapshot()
+    assert snapshot["full"]
+    version = snapshot["version"]
+    assert manager.c.snapshot(since=version) == {"version": version, "unchanged": True}
+
+    one = manager.test_window("one")
+    snapshot = manager.c.snapshot(since=version)
+    assert not snapshot["full"]
+    assert snapshot["version"] > version
+    assert [w["name"] for w in snapshot["windows"]] == ["one"]
+    assert set(snapshot["groups"]) == {"a"}
+
+    manager.kill_window(one)
+    snapshot = manager.c.snapshot(since=snapshot["version"])
+    assert snapshot["windows"] == []
+    assert len(snapshot["removed_windows"]) == 1
+
+    manager.c.group["b"].toscreen()
+    snapshot = manager.c.snapshot(since=snapshot["version"])
+    assert {"a", "b"} <= set(snapshot["groups"])
+    assert snapshot["screens"][0]["group"] == "b"
+
+    # moving a floating window doesn't lay out the group
+    manager.test_window("two")
+    manager.c.window.enable_floating()
+    version = manager.c.snapshot()["version"]
+    manager.c.window.move_floating(10, 20)
+    snapshot = manager.c.snapshot(since=version)
+    assert [w["name"] for w in snapshot["windows"]] == ["two"]
+
+    # relayouts and focus changes don't list the windows that didn't move,
+    # only the focused one
+    manager.c.group["c"].toscreen()
+    manager.c.group.setlayout("tile")
+    manager.test_window("three")
+    manager.test_window("four")
+    version = manager.c.snapshot()["version"]
+    manager.c.group.setlayout("tile")
+    snapshot = manager.c.snapshot(since=version)
+    assert [w["name"] for w in snapshot["windows"]] == ["four"]
+    assert set(snapshot["groups"]) == {"c"}
+    manager.c.group.next_window()
+    snapshot = manager.c.snapshot(since=snapshot["version"])
+    assert [w["name"] for w in snapshot["windows"]] == [manager.c.window.info()["name"]]
+
+    # a version the server doesn't know about gets everything, as do the
+    # versions from before a restart
+    assert manager.c.snapshot(since=snapshot["version"] + 1)["full"]
+    assert manager.c.snapshot(since=5)["full"]
+
+
 class DuplicateWidgetsConfig(ManagerConfig):
     screens = [
         libqtile.config.Screen(
@@ -1325,3 +1452,73 @@ def test_widget_duplicate_warnings(manager):
 
     # Check this message level was info
     assert all([r.startswith("INFO") for r in records])
+
+
+@manager_config
+def test_loop_lag(manager):
+    @Retry(ignore_exceptions=(AssertionError,))
+    def assert_sampled():
+        info = manager.c.loop_lag()
+        assert info["running"]
+        assert info["samples"] > 0
+        return info
+
+    info = assert_sampled()
+    assert info["threshold"] == 0.25
+    assert sum(count for _, count in info["histogram"]) == info["samples"]
+
+
+@manager_config
+def test_profile(manager, tmp_path):
+    with pytest.raises(CommandError):
+        manager.c.profile_stop()
+
+    manager.c.profile_start(interval=0.001)
+    with pytest.raises(CommandError):
+        manager.c.profile_start()
+    for _ in range(10):
+        manager.c.get_groups()
+    result = manager.c.profile_stop(path=str(tmp_path / "qtile.folded"))
+
+    assert result["path"] == str(tmp_path / "qtile.folded")
+    assert result["samples"] > 0
+    lines = (tmp_path / "qtile.folded").read_text().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == result["samples"]
+    assert any("run_forever" in line for line in lines)
+
+
+@manager_config
+def test_tracing(manager, tmp_path):
+    manager.c.trace_start()
+    manager.test_window("one")
+    manager.c.group["b"].toscreen()
+    manager.c.group["a"].toscreen()
+    result = manager.c.trace_stop(path=str(tmp_path / "trace.json"))
+
+    assert result["path"] == str(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert len(events) == result["events"]
+    names = {event["name"] for event in events}
+    assert {"layout_all", "Layout.layout", "Window.place"} <= names
+
+    # nothing is recorded once stopped
+    manager.c.group["b"].toscreen()
+    assert manager.c.trace_stop(path=str(tmp_path / "trace.json"))["events"] == len(events)
+
+
+@manager_config
+def test_coalesced_layout(manager, tmp_path):
+    def layout_passes():
+        manager.c.trace_stop(path=str(tmp_path / "trace.json"))
+        events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+        return sum(event["name"] == "layout_all" for event in events)
+
+    manager.test_window("one")
+    manager.c.trace_start()
+    manager.c.eval("[self.current_group.layout_all() for _ in range(5)]")
+    # the queued relayouts are run once, before the command returns
+    assert layout_passes() == 1
+
+    manager.c.trace_start()
+    manager.c.eval("[self.current_group.layout_all(sync=True) for _ in range(2)]")
+    assert layout_passes() == 2
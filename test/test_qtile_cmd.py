@@ -189,3 +189,21 @@ def test_cmd_obj_kwarg(manager):
 
     # This confirms that value has correctly been converted to int
     assert result["value"] == 2
+
+
+@server_config
+def test_cmd_obj_batch(manager):
+    manager.test_window("foo")
+    cmd = os.path.join(os.path.dirname(__file__), "..", "libqtile", "scripts", "main.py")
+    argv = [sys.executable, cmd, "cmd-obj", "-s", manager.sockfile, "--batch"]
+    calls = "\n".join(
+        [
+            "-o group b -f toscreen",
+            "# comments and blank lines are ignored",
+            "",
+            "-o widget kwargwidget -f test_kwargs -k a=2",
+        ]
+    )
+    output = subprocess.run(argv, input=calls.encode(), stdout=subprocess.PIPE, check=True)
+    assert json.loads(output.stdout.decode()) == {"value": 2}
+    assert manager.c.group.info()["name"] == "b"
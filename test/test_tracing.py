@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from libqtile import tracing
+
+
+@pytest.fixture
+def traced():
+    tracing.start()
+    yield
+    tracing.stop()
+
+
+@pytest.mark.usefixtures("traced")
+def test_spans(tmp_path):
+    outer = tracing.begin("layout_all", "layout", {"group": "a"})
+    inner = tracing.begin("Window.place", "x11")
+    tracing.end(inner)
+    tracing.end(outer)
+
+    place, layout_all = tracing.events()
+    assert place["name"] == "Window.place"
+    assert "args" not in place
+    assert layout_all["args"] == {"group": "a"}
+    assert layout_all["ph"] == "X"
+    # the inner span is nested in the outer one
+    assert layout_all["ts"] <= place["ts"]
+    assert place["ts"] + place["dur"] <= layout_all["ts"] + layout_all["dur"]
+
+    path = tmp_path / "trace.json"
+    assert tracing.dump(str(path)) == 2
+    assert json.loads(path.read_text())["traceEvents"] == [place, layout_all]
+
+
+def test_max_events():
+    tracing.start(max_events=3)
+    try:
+        for i in range(5):
+            tracing.end(tracing.begin(str(i), "test"))
+    finally:
+        tracing.stop()
+    assert [event["name"] for event in tracing.events()] == ["2", "3", "4"]
+
+    # starting again drops the spans recorded before
+    tracing.start()
+    tracing.stop()
+    assert tracing.events() == []
+    assert not tracing.enabled